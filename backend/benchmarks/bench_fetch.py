@@ -0,0 +1,93 @@
+"""Benchmark match scraping throughput against a local stub of vlr.gg.
+
+Serves the pages in test/fixtures with an artificial per-request latency and
+reports matches/sec for the blocking Scraper.parse_match path and for
+Scraper.parse_matches running on the pooled Fetcher.
+
+Run from backend/:
+    python -m benchmarks.bench_fetch [--matches 40] [--latency 0.05]
+"""
+import argparse
+import asyncio
+import pathlib
+import threading
+import time
+from unittest.mock import patch
+
+from aiohttp import web
+
+import fantasyVCT.scraper as scraper
+from fantasyVCT.fetch import Fetcher
+from fantasyVCT.scraper import Scraper
+
+FIXTURES = pathlib.Path(__file__).resolve().parent.parent / "test" / "fixtures"
+MATCH_IDS = ("25206", "301000")
+
+
+def start_stub_server(latency):
+	"""Start the stub server in a background thread and return its base url."""
+	pages = {p.stem: p.read_text() for p in FIXTURES.glob("match_*.html")}
+	started = threading.Event()
+	info = dict()
+
+	async def match_page(request):
+		await asyncio.sleep(latency)
+		tab = "performance" if request.query.get("tab") == "performance" else "summary"
+		return web.Response(text=pages[f"match_{request.match_info['match_id']}_{tab}"], content_type="text/html")
+
+	def run():
+		loop = asyncio.new_event_loop()
+		app = web.Application()
+		app.router.add_get("/{match_id}/", match_page)
+		runner = web.AppRunner(app)
+		loop.run_until_complete(runner.setup())
+		site = web.TCPSite(runner, "127.0.0.1", 0)
+		loop.run_until_complete(site.start())
+		info["port"] = site._server.sockets[0].getsockname()[1]
+		started.set()
+		loop.run_forever()
+
+	threading.Thread(target=run, daemon=True).start()
+	started.wait()
+	return f"http://127.0.0.1:{info['port']}"
+
+
+def bench_blocking(ids):
+	start = time.perf_counter()
+	for match_id in ids:
+		Scraper.parse_match(match_id)
+	return time.perf_counter() - start
+
+
+def bench_async(ids, workers):
+	async def run():
+		async with Fetcher() as fetcher:
+			await Scraper(fetcher).parse_matches(ids, workers=workers)
+
+	start = time.perf_counter()
+	asyncio.run(run())
+	return time.perf_counter() - start
+
+
+def main():
+	parser = argparse.ArgumentParser()
+	parser.add_argument("--matches", type=int, default=40)
+	parser.add_argument("--latency", type=float, default=0.05, help="seconds of server latency per request")
+	parser.add_argument("--workers", type=int, default=4, help="matches in flight for parse_matches")
+	args = parser.parse_args()
+
+	base = start_stub_server(args.latency)
+	ids = [MATCH_IDS[i % len(MATCH_IDS)] for i in range(args.matches)]
+
+	with patch.object(scraper, "vlr_summary", base + "/{}/?game=all"), \
+		patch.object(scraper, "vlr_performance", base + "/{}/?game=all&tab=performance"):
+		before = bench_blocking(ids)
+		after = bench_async(ids, args.workers)
+
+	print(f"{args.matches} matches, {args.latency * 1000:.0f}ms latency per request")
+	print(f"blocking parse_match:      {args.matches / before:8.2f} matches/sec ({before:.2f}s)")
+	print(f"async parse_matches ({args.workers}):   {args.matches / after:8.2f} matches/sec ({after:.2f}s)")
+
+
+if __name__ == "__main__":
+	main()
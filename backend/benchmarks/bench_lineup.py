@@ -0,0 +1,80 @@
+"""Benchmark the optimal lineup search used by standings.
+
+For leagues of 10 to 1000 fantasy teams with full 10 player rosters, reports
+the time to find every team's optimal lineup with the captain-by-captain
+greedy search standings used before, and with lineup.optimal_lineup. The two
+agree whenever no player has negative points; the greedy search always fills
+every active slot, so it can undercount rosters with negative players.
+
+Run from backend/:
+    python -m benchmarks.bench_lineup [--repeat 5]
+"""
+import argparse
+import random
+import time
+
+from fantasyVCT.lineup import optimal_lineup
+
+LEAGUES = (10, 100, 1000)
+ROSTER = 10
+
+
+def greedy(players):
+	"""Optimal score the way standings computed it before optimal_lineup."""
+	players = [(points, team_id) for _, points, team_id in players]
+	if not players:
+		return 0.0
+	players.sort(reverse=True)
+	best = 0.0
+	for i, (cap_score, _) in enumerate(players):
+		active, used_teams = [], set()
+		for j, (score, team_id) in enumerate(players):
+			if j == i or team_id in used_teams:
+				continue
+			active.append(score)
+			used_teams.add(team_id)
+			if len(active) == 5:
+				break
+		total = round(cap_score * 1.2 + sum(active), 1)
+		if total > best:
+			best = total
+	return best
+
+
+def make_league(teams, seed=0):
+	rng = random.Random(seed)
+	return [
+		[(f"t{t}p{p}", round(rng.uniform(0, 400), 1), rng.randrange(12)) for p in range(ROSTER)]
+		for t in range(teams)
+	]
+
+
+def best_of(fn, repeat):
+	"""Return (result of the last call, fastest time in seconds)."""
+	best = float("inf")
+	for _ in range(repeat):
+		start = time.perf_counter()
+		rv = fn()
+		best = min(best, time.perf_counter() - start)
+	return rv, best
+
+
+def main():
+	parser = argparse.ArgumentParser()
+	parser.add_argument("--repeat", type=int, default=5)
+	args = parser.parse_args()
+
+	for teams in LEAGUES:
+		league = make_league(teams)
+		old, old_time = best_of(lambda: [greedy(roster) for roster in league], args.repeat)
+		new, new_time = best_of(lambda: [optimal_lineup(roster)[0] for roster in league], args.repeat)
+		assert old == new
+
+		print(
+			f"{teams:>5} teams  greedy {old_time * 1000:8.2f} ms  "
+			f"optimal_lineup {new_time * 1000:8.2f} ms  speedup {old_time / new_time:4.1f}x"
+		)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,73 @@
+"""Benchmark match page parsing over the saved pages in test/fixtures.
+
+For every installed parser backend, reports the mean time and peak traced
+memory to build a db.Match from both tabs of each fixture match, once with
+a full-page tree and once with the targeted vm-stats-game tree that
+Scraper._build_match uses.
+
+Run from backend/:
+    python -m benchmarks.bench_parse [--repeat 10]
+"""
+import argparse
+import pathlib
+import time
+import tracemalloc
+
+import fantasyVCT.database as db
+import fantasyVCT.scraper as scraper
+from fantasyVCT.scraper import Scraper, PARSER_BACKENDS
+
+FIXTURES = pathlib.Path(__file__).resolve().parent.parent / "test" / "fixtures"
+MATCH_IDS = ("25206", "301000")
+
+
+def load_pages():
+	return [
+		(match_id, (FIXTURES / f"match_{match_id}_summary.html").read_text(), (FIXTURES / f"match_{match_id}_performance.html").read_text())
+		for match_id in MATCH_IDS
+	]
+
+
+def build_full(match_id, summary, performance):
+	"""Parse the way the scraper did before targeted parsing."""
+	match = db.Match(match_id=match_id)
+	Scraper._parse_match_summary(match, scraper.make_soup(summary))
+	Scraper._parse_match_performance(match, scraper.make_soup(performance))
+	return match
+
+
+def bench(build, pages, repeat):
+	"""Return (seconds per match, peak bytes for one match)."""
+	start = time.perf_counter()
+	for _ in range(repeat):
+		for page in pages:
+			build(*page)
+	elapsed = (time.perf_counter() - start) / (repeat * len(pages))
+
+	peak = 0
+	for page in pages:
+		tracemalloc.start()
+		build(*page)
+		peak = max(peak, tracemalloc.get_traced_memory()[1])
+		tracemalloc.stop()
+	return elapsed, peak
+
+
+def main():
+	parser = argparse.ArgumentParser()
+	parser.add_argument("--repeat", type=int, default=10)
+	args = parser.parse_args()
+
+	pages = load_pages()
+	for backend in PARSER_BACKENDS:
+		if not scraper._backend_available(backend):
+			print(f"{backend:12} not installed")
+			continue
+		scraper.set_parser(backend)
+		for mode, build in (("full", build_full), ("targeted", Scraper._build_match)):
+			elapsed, peak = bench(build, pages, args.repeat)
+			print(f"{backend:12} {mode:9} {elapsed * 1000:8.1f} ms/match {peak / 2**20:8.1f} MiB peak")
+
+
+if __name__ == "__main__":
+	main()
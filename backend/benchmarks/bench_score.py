@@ -0,0 +1,109 @@
+"""Benchmark batch scoring against the per-result PointCalculator.score loop.
+
+For 1k, 10k and 100k synthetic results, reports the time to score every
+result one at a time with score(), the time to pack them into a stats block
+with stats_block(), and the time for score_batch() on that block. Packing ORM
+objects costs about as much as scoring them, so the same results are also
+stored in an in-memory sqlite database and scored end to end: loading Result
+objects and looping over score(), against rows of just the scored columns
+packed and passed to score_batch(), as rebuild_scores() reads them. Every path is checked to produce identical scores.
+
+Run from backend/:
+    python -m benchmarks.bench_score [--repeat 5]
+"""
+import argparse
+import random
+import time
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from fantasyVCT.database import Base, Player, Result
+from fantasyVCT.scoring import PointCalculator, STAT_COLUMNS, WEIGHTS
+
+SIZES = (1_000, 10_000, 100_000)
+
+
+def make_results(n, seed=0):
+	rng = random.Random(seed)
+	return [
+		Result(
+			player_acs=rng.randint(50, 400), player_kills=rng.randint(0, 35),
+			player_deaths=rng.randint(0, 25), player_assists=rng.randint(0, 15),
+			player_2k=rng.randint(0, 8), player_3k=rng.randint(0, 4), player_4k=rng.randint(0, 2),
+			player_5k=rng.randint(0, 1), player_clutch_v2=rng.randint(0, 2), player_clutch_v3=rng.randint(0, 1),
+			player_clutch_v4=rng.randint(0, 1), player_clutch_v5=rng.randint(0, 1),
+		)
+		for _ in range(n)
+	]
+
+
+def make_engine(results):
+	engine = create_engine("sqlite:///:memory:")
+	Base.metadata.create_all(engine)
+	session = Session(engine)
+	session.add(Player(id=1, name="bench"))
+	session.add_all(
+		Result(map="Bind", game_id=i, match_id=i, event_id=1, player_id=1, agent="Sova",
+			**{key: getattr(result, key) for key in STAT_COLUMNS})
+		for i, result in enumerate(results)
+	)
+	session.commit()
+	session.close()
+	return engine
+
+
+def score_orm(engine):
+	with Session(engine) as session:
+		return [PointCalculator.score(r) for r in session.scalars(select(Result).order_by(Result.id))]
+
+
+def score_rows(engine):
+	with Session(engine) as session:
+		rows = session.execute(select(*(column for column, _ in WEIGHTS)).order_by(Result.id)).all()
+	return PointCalculator.score_batch(PointCalculator.stats_block(rows))
+
+
+def best_of(fn, repeat):
+	"""Return (result of the last call, fastest time in seconds)."""
+	best = float("inf")
+	for _ in range(repeat):
+		start = time.perf_counter()
+		rv = fn()
+		best = min(best, time.perf_counter() - start)
+	return rv, best
+
+
+def main():
+	parser = argparse.ArgumentParser()
+	parser.add_argument("--repeat", type=int, default=5)
+	args = parser.parse_args()
+
+	for n in SIZES:
+		results = make_results(n)
+		scalar, scalar_time = best_of(lambda: [PointCalculator.score(r) for r in results], args.repeat)
+		block, pack_time = best_of(lambda: PointCalculator.stats_block(results), args.repeat)
+		batch, batch_time = best_of(lambda: PointCalculator.score_batch(block), args.repeat)
+		assert batch.tolist() == scalar
+
+		print(
+			f"{n:>7} results  score() {scalar_time * 1000:8.2f} ms  "
+			f"stats_block {pack_time * 1000:8.2f} ms  score_batch {batch_time * 1000:7.2f} ms  "
+			f"speedup {scalar_time / batch_time:6.1f}x ({scalar_time / (pack_time + batch_time):4.1f}x incl. packing)"
+		)
+
+	for n in SIZES:
+		engine = make_engine(make_results(n))
+		scalar, scalar_time = best_of(lambda: score_orm(engine), args.repeat)
+		batch, batch_time = best_of(lambda: score_rows(engine), args.repeat)
+		assert batch.tolist() == scalar
+		engine.dispose()
+
+		print(
+			f"{n:>7} results from sqlite  orm + score() {scalar_time * 1000:8.2f} ms  "
+			f"rows + score_batch {batch_time * 1000:8.2f} ms  speedup {scalar_time / batch_time:4.1f}x"
+		)
+
+
+if __name__ == "__main__":
+	main()
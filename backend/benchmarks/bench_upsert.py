@@ -0,0 +1,116 @@
+"""Benchmark database round trips when storing a parsed match.
+
+Stores each fixture match into a fresh in-memory sqlite database, once with
+the row-by-row logic upload used before set-based ingestion and once with
+ingest.store_match, and reports the number of statements sent to the
+database and the time taken. Each match is stored cold (no players known
+yet) and warm (players already present). Teams are always seeded, since the
+models declare teams.region NOT NULL and upload does not scrape a region.
+
+Run from backend/:
+    python -m benchmarks.bench_upsert [--repeat 20]
+"""
+import argparse
+import pathlib
+import time
+
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import Session
+
+import fantasyVCT.database as db
+from fantasyVCT.ingest import store_match
+from fantasyVCT.scraper import Scraper
+
+FIXTURES = pathlib.Path(__file__).resolve().parent.parent / "test" / "fixtures"
+MATCH_IDS = ("25206", "301000")
+
+
+def build(match_id):
+	return Scraper._build_match(
+		match_id,
+		(FIXTURES / f"match_{match_id}_summary.html").read_text(),
+		(FIXTURES / f"match_{match_id}_performance.html").read_text(),
+	)
+
+
+def store_match_rowwise(session, match, event_id):
+	"""Store a match the way upload did before set-based ingestion."""
+	for map_scraped in match.maps:
+		for team_scraped in (map_scraped.team1, map_scraped.team2):
+			team = session.execute(select(db.Team).filter_by(name=team_scraped.name)).scalar_one_or_none()
+			if not team:
+				team = db.Team(name=team_scraped.name, abbrev=team_scraped.abbrev)
+				session.add(team)
+				session.flush()
+
+			for player_scraped in team_scraped.players:
+				player = session.execute(select(db.Player).filter_by(name=player_scraped.name)).scalar_one_or_none()
+				if not player:
+					player = db.Player(name=player_scraped.name)
+					session.add(player)
+					session.flush()
+
+				if not player.team:
+					player.team = team
+
+				result = player_scraped.results[0]
+				result.player = player
+				result.event_id = event_id
+				session.add(result)
+			session.flush()
+
+
+def make_engine():
+	engine = create_engine("sqlite:///:memory:")
+	db.Base.metadata.create_all(engine)
+	return engine
+
+
+def run(store, match_id, warm):
+	"""Return (statements, seconds) for storing one match."""
+	engine = make_engine()
+	with Session(engine) as session:
+		for map_scraped in build(match_id).maps[:1]:
+			for team_scraped in (map_scraped.team1, map_scraped.team2):
+				session.add(db.Team(name=team_scraped.name, abbrev=team_scraped.abbrev, region="na"))
+		session.commit()
+	if warm:
+		# an earlier match of the same players, with its own game ids
+		earlier = build(match_id)
+		for map_scraped in earlier.maps:
+			for team_scraped in (map_scraped.team1, map_scraped.team2):
+				for player_scraped in team_scraped.players:
+					player_scraped.results[0].game_id += 1_000_000
+		with Session(engine) as session:
+			store_match(session, earlier, event_id=1)
+			session.commit()
+
+	match = build(match_id)
+	statements = list()
+	event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+	start = time.perf_counter()
+	with Session(engine) as session:
+		store(session, match, 1)
+		session.commit()
+	elapsed = time.perf_counter() - start
+	engine.dispose()
+	return len(statements), elapsed
+
+
+def main():
+	parser = argparse.ArgumentParser()
+	parser.add_argument("--repeat", type=int, default=20)
+	args = parser.parse_args()
+
+	for match_id in MATCH_IDS:
+		for warm in (False, True):
+			for name, store in (("rowwise", store_match_rowwise), ("set-based", store_match)):
+				runs = [run(store, match_id, warm) for _ in range(args.repeat)]
+				statements = runs[0][0]
+				elapsed = sum(seconds for _, seconds in runs) / len(runs)
+				state = "warm" if warm else "cold"
+				print(f"match {match_id} {state:5} {name:10} {statements:4} statements {elapsed * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+	main()
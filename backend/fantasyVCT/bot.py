@@ -1,8 +1,19 @@
 from fantasyVCT.database import DatabaseManager
-from fantasyVCT.scraper import Scraper
-from fantasyVCT.scoring import Cache
+from fantasyVCT.fetch import Fetcher
+from fantasyVCT.http_cache import ResponseCache
+from fantasyVCT.log import log
+from fantasyVCT.names import NameIndex
+from fantasyVCT.query_cache import POINTS, QueryCache
+from fantasyVCT.ratelimit import RateLimiter
+from fantasyVCT.rescore import Rescorer
+from fantasyVCT.scraper import Scraper, set_response_cache, set_rate_limiter
+from fantasyVCT.scoring import Cache, PointCalculator
+from fantasyVCT.standings import Standings
+from fantasyVCT.transactions import backfill
 from fantasyVCT.draft_state import DraftState
 
+import asyncio
+
 from discord.ext import commands
 from discord import Intents
 
@@ -11,21 +22,110 @@ class FantasyValBot(commands.Bot):
 	def __init__(self, command_prefix):
 		super().__init__(command_prefix, intents=Intents.all())
 		self.db_manager = None
-		self.scraper = Scraper()
+		self.fetcher = Fetcher()
+		self.scraper = Scraper(self.fetcher)
 		self.cache = Cache()
 		self.draft_state = DraftState()
+		# scoring profile version commands read scores from, set by sync_scores
+		self.scoring = None
+		self.rescore_task = None
+		self.standings = Standings()
+		self.names = NameIndex()
+		self.queries = QueryCache()
 		# there are several more fields here added by argparse
 		# skip_draft
 		# num_rounds
 		# sub_slots
 		# prod
+		# offline
+		# vlr_rate
+		# score_cache_entries
+		# score_cache_mb
+		# query_cache_ttl
+		# query_cache_entries
 
 	def configure_db(self, db_user, db_password, db_dev, db_prod, db_type="mysql", db_host="127.0.0.1"):
 		if self.prod:
 			self.db_manager = DatabaseManager(db_type, db_user, db_password, db_prod, host=db_host)
 		else:
 			self.db_manager = DatabaseManager(db_type, db_user, db_password, db_dev, host=db_host)
-		
+
+	def sync_scores(self):
+		"""materialize scores of the selected scoring profile for any results the
+		player_scores table is missing, so standings and rankings read precomputed
+		totals straight after a restart, log rosters that predate the roster
+		transaction log, then score with that profile and load the standings snapshot
+		"""
+		with self.db_manager.create_session() as session:
+			profile = PointCalculator.selected_profile(session)
+			rebuilt = PointCalculator.ensure_scores(session, profile)
+			if rebuilt:
+				log("rebuilt materialized player scores for", profile)
+			PointCalculator.prune_scores(session, profile)
+			logged = backfill(session)
+			if logged:
+				log("logged", logged, "rostered player(s) missing from the roster transaction log")
+			self.standings.load(session, profile, rebuild=rebuilt or logged > 0)
+			session.commit()
+			session.refresh(profile)
+			session.expunge(profile)
+		self.set_scoring(profile)
+
+	def load_names(self):
+		"""read every pro player and team name into the name index, so commands
+		resolve names without querying the database
+		"""
+		with self.db_manager.create_session() as session:
+			self.names.load(session)
+
+	def set_scoring(self, profile):
+		"""read scores of a scoring profile version, dropping cached scores and
+		command replies of any other
+		"""
+		self.scoring = profile
+		self.cache.set_version(profile.id)
+		self.queries.invalidate(POINTS)
+
+	def rescore(self, profile_id):
+		"""recompute the scores of a newly selected scoring profile version in the
+		background, replacing any recomputation still running
+		"""
+		if self.rescore_task is not None and not self.rescore_task.done():
+			self.rescore_task.cancel()
+		self.rescore_task = asyncio.create_task(Rescorer(self).run(profile_id))
+		return self.rescore_task
+
+	def configure_rate_limit(self, rate, burst=None):
+		"""share one requests/sec budget between every outbound vlr request
+		"""
+		limiter = RateLimiter(rate=rate, burst=burst)
+		self.fetcher.limiter = limiter
+		set_rate_limiter(limiter)
+
+	def configure_score_cache(self, max_entries, max_mb):
+		"""bound the in-memory score cache to an entry and memory budget
+		"""
+		self.cache = Cache(max_entries=max_entries, max_bytes=int(max_mb * 2**20))
+		if self.scoring is not None:
+			self.cache.set_version(self.scoring.id)
+
+	def configure_query_cache(self, ttl, max_entries):
+		"""bound how long and how many replies of read-only commands are cached
+		"""
+		self.queries = QueryCache(ttl=ttl, max_entries=max_entries)
+
+	def configure_cache(self, cache_dir, ttl=3600.0, max_bytes=256 * 2**20):
+		"""cache vlr pages on disk for every fetch, blocking or async
+		"""
+		cache = ResponseCache(cache_dir, ttl=ttl, max_bytes=max_bytes, offline=self.offline)
+		self.fetcher.cache = cache
+		set_response_cache(cache)
+
+	async def close(self):
+		"""release pooled http connections before shutting down
+		"""
+		await self.fetcher.close()
+		await super().close()
 
 	async def on_ready(self):
 		"""perform startup procedure
@@ -1,9 +1,11 @@
+from datetime import datetime
 from enum import Enum
 from typing import List
 
-from sqlalchemy import create_engine
-from sqlalchemy import String, ForeignKey
+from sqlalchemy import create_engine, false, select
+from sqlalchemy import String, ForeignKey, Double, UniqueConstraint, DateTime, Index
 from sqlalchemy.orm import Session
+from sqlalchemy.orm import joinedload, selectinload
 from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import mapped_column
@@ -38,6 +40,20 @@ class DatabaseManager:
 
 		return Session(self._engine, autoflush=autoflush)
 
+	def migrate(self, delete_duplicates=False):
+		"""
+		Apply any schema migrations this database is missing.
+		"""
+		from fantasyVCT.migrations import migrate
+		return migrate(self._engine, delete_duplicates)
+
+	def check_schema(self):
+		"""
+		List the differences between the database and the models.
+		"""
+		from fantasyVCT.schema import check_schema
+		return check_schema(self._engine)
+
 
 ######################################
 ## Mapped Classes
@@ -48,9 +64,9 @@ class Team(Base):
 
 	# mapped fields
 	id: Mapped[int] = mapped_column(primary_key=True)
-	name: Mapped[str] = mapped_column(String(50), nullable=False)
-	abbrev: Mapped[str] = mapped_column(String(10), nullable=False)
-	region: Mapped[str] = mapped_column(String(10))
+	name: Mapped[str] = mapped_column(String(50), nullable=False, unique=True)
+	abbrev: Mapped[str] = mapped_column(String(10), nullable=False, unique=True)
+	region: Mapped[str] = mapped_column(String(10), nullable=True)
 
 	# relationship fields
 	players: Mapped[List["Player"]] = relationship(back_populates="team")
@@ -117,8 +133,8 @@ class Player(Base):
 
 	# mapped fields
 	id: Mapped[int] = mapped_column(primary_key=True)
-	name: Mapped[str] = mapped_column(String(50), nullable=False)
-	team_id = mapped_column(ForeignKey("teams.id"))
+	name: Mapped[str] = mapped_column(String(50), nullable=False, unique=True)
+	team_id = mapped_column(ForeignKey("teams.id", ondelete="SET NULL", onupdate="CASCADE"))
 	
 	# relationship fields
 	team: Mapped[Team] = relationship(back_populates="players")
@@ -151,14 +167,20 @@ class Event(Base):
 
 class Result(Base):
 	__tablename__ = "results"
+	__table_args__ = (
+		# a player plays a game once; also serves lookups by player_id
+		Index("uq_results_player_game", "player_id", "game_id", unique=True),
+		Index("ix_results_match", "match_id"),
+		Index("ix_results_event", "event_id"),
+	)
 
 	# mapped fields
 	id: Mapped[int] = mapped_column(primary_key=True)
 	map: Mapped[str] = mapped_column(String(20), nullable=False)
 	game_id: Mapped[int] = mapped_column(nullable=False)
 	match_id: Mapped[int] = mapped_column(nullable=False)
-	event_id: Mapped[int]
-	player_id: Mapped[int] = mapped_column(ForeignKey("players.id"), nullable=False)
+	event_id: Mapped[int] = mapped_column(ForeignKey("events.id", ondelete="CASCADE", onupdate="CASCADE"), nullable=True)
+	player_id: Mapped[int] = mapped_column(ForeignKey("players.id", ondelete="CASCADE", onupdate="CASCADE"), nullable=False)
 	player_acs: Mapped[float]
 	player_kills: Mapped[int]
 	player_deaths: Mapped[int]
@@ -171,7 +193,7 @@ class Result(Base):
 	player_clutch_v3: Mapped[int]
 	player_clutch_v4: Mapped[int]
 	player_clutch_v5: Mapped[int]
-	agent: Mapped[str] = mapped_column(String(20))
+	agent: Mapped[str] = mapped_column(String(20), nullable=True)
 
 	# relationship fields
 	player: Mapped[Player] = relationship(back_populates="results")
@@ -208,14 +230,80 @@ class Result(Base):
 		return line
 	
 
+class ScoringProfile(Base):
+	__tablename__ = "scoring_profiles"
+	__table_args__ = (UniqueConstraint("name", "version"),)
+
+	# each row is one immutable version of a named set of stat weights
+	id: Mapped[int] = mapped_column(primary_key=True)
+	name: Mapped[str] = mapped_column(String(50), nullable=False)
+	version: Mapped[int] = mapped_column(nullable=False)
+	# the version this league has chosen to score with
+	selected: Mapped[bool] = mapped_column(default=False, server_default=false(), nullable=False)
+	# player_scores and player_totals are complete for this version
+	ready: Mapped[bool] = mapped_column(default=False, server_default=false(), nullable=False)
+	acs: Mapped[float] = mapped_column(Double, nullable=False)
+	kills: Mapped[float] = mapped_column(Double, nullable=False)
+	deaths: Mapped[float] = mapped_column(Double, nullable=False)
+	assists: Mapped[float] = mapped_column(Double, nullable=False)
+	kills2: Mapped[float] = mapped_column(Double, nullable=False)
+	kills3: Mapped[float] = mapped_column(Double, nullable=False)
+	kills4: Mapped[float] = mapped_column(Double, nullable=False)
+	kills5: Mapped[float] = mapped_column(Double, nullable=False)
+	clutch_v2: Mapped[float] = mapped_column(Double, nullable=False)
+	clutch_v3: Mapped[float] = mapped_column(Double, nullable=False)
+	clutch_v4: Mapped[float] = mapped_column(Double, nullable=False)
+	clutch_v5: Mapped[float] = mapped_column(Double, nullable=False)
+
+	def __repr__(self) -> str:
+		return f"ScoringProfile(id={self.id!r}, name={self.name!r}, version={self.version!r}, selected={self.selected!r}, ready={self.ready!r})"
+
+	def __str__(self) -> str:
+		return f"{self.name} v{self.version}"
+
+
+class PlayerScore(Base):
+	__tablename__ = "player_scores"
+	__table_args__ = (UniqueConstraint("profile_id", "player_id", "game_id"),)
+
+	# materialized fantasy points of one player in one game under one scoring profile version
+	id: Mapped[int] = mapped_column(primary_key=True)
+	profile_id: Mapped[int] = mapped_column(ForeignKey("scoring_profiles.id", ondelete="CASCADE", onupdate="CASCADE"), nullable=False)
+	player_id: Mapped[int] = mapped_column(ForeignKey("players.id", ondelete="CASCADE", onupdate="CASCADE"), nullable=False)
+	game_id: Mapped[int] = mapped_column(nullable=False)
+	points: Mapped[float] = mapped_column(Double, nullable=False)
+
+	def __repr__(self) -> str:
+		return (
+			f"PlayerScore(profile_id={self.profile_id!r}, player_id={self.player_id!r}, "
+			f"game_id={self.game_id!r}, points={self.points!r})"
+		)
+
+
+class PlayerTotal(Base):
+	__tablename__ = "player_totals"
+
+	# running total of a player's materialized scores under one scoring profile version
+	profile_id: Mapped[int] = mapped_column(ForeignKey("scoring_profiles.id", ondelete="CASCADE", onupdate="CASCADE"), primary_key=True)
+	player_id: Mapped[int] = mapped_column(ForeignKey("players.id", ondelete="CASCADE", onupdate="CASCADE"), primary_key=True)
+	points: Mapped[float] = mapped_column(Double, nullable=False)
+	games: Mapped[int] = mapped_column(nullable=False)
+
+	def __repr__(self) -> str:
+		return (
+			f"PlayerTotal(profile_id={self.profile_id!r}, player_id={self.player_id!r}, "
+			f"points={self.points!r}, games={self.games!r})"
+		)
+
+
 class FantasyTeam(Base):
 	__tablename__ = "fantasy_teams"
 
 	points: int = 0
 
 	id: Mapped[int] = mapped_column(primary_key=True)
-	name: Mapped[str] = mapped_column(String(50), nullable=False)
-	abbrev: Mapped[str] = mapped_column(String(10), nullable=False)
+	name: Mapped[str] = mapped_column(String(50), nullable=False, unique=True)
+	abbrev: Mapped[str] = mapped_column(String(10), nullable=False, unique=True)
 
 	user: Mapped["User"] = relationship(back_populates="fantasyteam")
 	fantasyplayers: Mapped[List["FantasyPlayer"]] = relationship(back_populates="fantasyteam")
@@ -228,7 +316,7 @@ class User(Base):
 	__tablename__ = "users"
 
 	discord_id: Mapped[str] = mapped_column(String(18), primary_key=True)
-	fantasy_team_id = mapped_column(ForeignKey("fantasy_teams.id"))
+	fantasy_team_id = mapped_column(ForeignKey("fantasy_teams.id", ondelete="SET NULL", onupdate="CASCADE"), unique=True)
 
 	fantasyteam: Mapped[FantasyTeam] = relationship(back_populates="user")
 
@@ -239,8 +327,8 @@ class User(Base):
 class Position(Base):
 	__tablename__ = "positions"
 
-	id: Mapped[int] = mapped_column(primary_key=True)
-	position: Mapped[str] = mapped_column(String(20), nullable=False)
+	id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+	position: Mapped[str] = mapped_column(String(20), nullable=False, unique=True)
 
 	def __repr__(self) -> str:
 		return f"Position(position={self.position!r})"
@@ -250,9 +338,9 @@ class FantasyPlayer(Base):
 	__tablename__ = "fantasy_players"
 
 	id: Mapped[int] = mapped_column(primary_key=True)
-	player_id = mapped_column(ForeignKey("players.id"))
-	fantasy_team_id = mapped_column(ForeignKey("fantasy_teams.id"))
-	position = mapped_column(ForeignKey("positions.id"))
+	player_id = mapped_column(ForeignKey("players.id", ondelete="CASCADE", onupdate="CASCADE"), nullable=False, unique=True)
+	fantasy_team_id = mapped_column(ForeignKey("fantasy_teams.id", ondelete="SET NULL", onupdate="CASCADE"))
+	position = mapped_column(ForeignKey("positions.id", ondelete="SET NULL", onupdate="CASCADE"))
 
 	player: Mapped[Player] = relationship(back_populates="fantasyplayer")
 	fantasyteam: Mapped[FantasyTeam] = relationship(back_populates="fantasyplayers")
@@ -260,6 +348,82 @@ class FantasyPlayer(Base):
 	def __repr__(self) -> str:
 		return f"FantasyPlayer(id={self.id!r}, player_id={self.player_id!r}, fantasy_team_id={self.fantasy_team_id!r}, position={self.position!r})"
 
+class Standing(Base):
+	__tablename__ = "standings"
+
+	# snapshot of a fantasy team's place in the standings, kept current on uploads and roster changes
+	fantasy_team_id: Mapped[int] = mapped_column(ForeignKey("fantasy_teams.id", ondelete="CASCADE", onupdate="CASCADE"), primary_key=True)
+	points: Mapped[float] = mapped_column(Double, nullable=False)
+	optimal: Mapped[float] = mapped_column(Double, nullable=False)
+	rank: Mapped[int] = mapped_column(nullable=False)
+
+	def __repr__(self) -> str:
+		return (
+			f"Standing(fantasy_team_id={self.fantasy_team_id!r}, points={self.points!r}, "
+			f"optimal={self.optimal!r}, rank={self.rank!r})"
+		)
+
+
+class PointsHistory(Base):
+	__tablename__ = "points_history"
+	__table_args__ = (
+		Index("ix_points_history_team_match", "fantasy_team_id", "match_id"),
+		Index("ix_points_history_team_recorded", "fantasy_team_id", "recorded_at"),
+	)
+
+	# append-only record of a fantasy team's standing after each uploaded match that changed it
+	id: Mapped[int] = mapped_column(primary_key=True)
+	fantasy_team_id: Mapped[int] = mapped_column(ForeignKey("fantasy_teams.id", ondelete="CASCADE", onupdate="CASCADE"), nullable=False)
+	match_id: Mapped[int] = mapped_column(nullable=False)
+	recorded_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+	points: Mapped[float] = mapped_column(Double, nullable=False)
+	optimal: Mapped[float] = mapped_column(Double, nullable=False)
+	rank: Mapped[int] = mapped_column(nullable=False)
+
+	def __repr__(self) -> str:
+		return (
+			f"PointsHistory(fantasy_team_id={self.fantasy_team_id!r}, match_id={self.match_id!r}, "
+			f"recorded_at={self.recorded_at!r}, points={self.points!r}, optimal={self.optimal!r}, rank={self.rank!r})"
+		)
+
+
+class RosterTransaction(Base):
+	__tablename__ = "roster_transactions"
+	__table_args__ = (
+		Index("ix_roster_transactions_team_player", "fantasy_team_id", "player_id", "id"),
+	)
+
+	# append-only log of draft, drop and set commands; each row opens a stint
+	# that the player's next row for the same fantasy team closes
+	id: Mapped[int] = mapped_column(primary_key=True)
+	fantasy_team_id: Mapped[int] = mapped_column(ForeignKey("fantasy_teams.id", ondelete="CASCADE", onupdate="CASCADE"), nullable=False)
+	player_id: Mapped[int] = mapped_column(ForeignKey("players.id", ondelete="CASCADE", onupdate="CASCADE"), nullable=False)
+	action: Mapped[str] = mapped_column(String(10), nullable=False)
+	# roster slot held from here on, None once dropped
+	position: Mapped[int] = mapped_column(nullable=True)
+	# highest results.id when the transaction was made: results with higher ids
+	# were uploaded, and so played, after it
+	after_result_id: Mapped[int] = mapped_column(nullable=False)
+	created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+	def __repr__(self) -> str:
+		return (
+			f"RosterTransaction(id={self.id!r}, fantasy_team_id={self.fantasy_team_id!r}, player_id={self.player_id!r}, "
+			f"action={self.action!r}, position={self.position!r}, after_result_id={self.after_result_id!r})"
+		)
+
+
+class SchemaMigration(Base):
+	__tablename__ = "schema_migrations"
+
+	# one row per migration in fantasyVCT.migrations applied to this database
+	version: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+	description: Mapped[str] = mapped_column(String(100), nullable=False)
+	applied_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+	def __repr__(self) -> str:
+		return f"SchemaMigration(version={self.version!r}, description={self.description!r}, applied_at={self.applied_at!r})"
+
 ######################################
 ## Non-Mapped Classes
 ######################################
@@ -297,6 +461,88 @@ class Match:
 		return None
 
 
+######################################
+## Eager-loaded Queries
+######################################
+# Statements for the views that walk relationships row by row. Every hop a view
+# reads is loaded up front, so each statement costs a fixed number of SELECTs
+# however many fantasy teams, players and results there are. Collections use
+# selectinload (one extra IN query each) and many-to-one hops use joinedload.
+
+def _player_options():
+	"""Loader options for everything shown alongside a pro player.
+	"""
+	return (
+		joinedload(Player.team),
+		joinedload(Player.fantasyplayer).joinedload(FantasyPlayer.fantasyteam),
+	)
+
+
+def _roster_options(fantasyplayers, with_results: bool = True):
+	"""Extend a loader for FantasyTeam.fantasyplayers to each player's team and,
+	optionally, results.
+	"""
+	player = fantasyplayers.selectinload(FantasyPlayer.player)
+	if not with_results:
+		return player.joinedload(Player.team)
+	return player.options(
+		joinedload(Player.team),
+		selectinload(Player.results),
+	)
+
+
+def select_rosters(*criteria, with_results: bool = True):
+	"""Select fantasy teams with their rosters eager loaded.
+
+	Args:
+	    *criteria: optional WHERE criteria on FantasyTeam
+	    with_results (bool, optional): also load every player's results. Views
+	    	that aggregate points in SQL can skip them.
+
+	Returns:
+	    Select: statement yielding FantasyTeam rows
+	"""
+	return select(FantasyTeam).where(*criteria).options(
+		_roster_options(selectinload(FantasyTeam.fantasyplayers), with_results)
+	)
+
+
+def select_user_roster(discord_id, with_results: bool = True):
+	"""Select a user with their fantasy team's roster eager loaded.
+
+	Args:
+	    discord_id (str): discord id of the user
+	    with_results (bool, optional): also load every player's results
+
+	Returns:
+	    Select: statement yielding at most one User row
+	"""
+	return select(User).filter_by(discord_id=discord_id).options(
+		_roster_options(joinedload(User.fantasyteam).selectinload(FantasyTeam.fantasyplayers), with_results)
+	)
+
+
+def select_players(*criteria):
+	"""Select pro players with their team and fantasy team eager loaded.
+
+	Args:
+	    *criteria: optional WHERE criteria on Player
+
+	Returns:
+	    Select: statement yielding Player rows
+	"""
+	return select(Player).where(*criteria).options(*_player_options())
+
+
+def select_free_agents():
+	"""Select pro players that are not on a fantasy team, eager loaded like select_players.
+
+	Returns:
+	    Select: statement yielding Player rows
+	"""
+	return select_players(Player.id.notin_(select(FantasyPlayer.player_id)))
+
+
 ######################################
 ## Helpers
 ######################################
@@ -0,0 +1,135 @@
+import asyncio
+import json
+
+import aiohttp
+
+from fantasyVCT.http_cache import ResponseCache, OfflineCacheMiss
+from fantasyVCT.ratelimit import RateLimiter
+
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0.0.0 Safari/537.36"
+    )
+}
+
+REQUEST_TIMEOUT = 20.0
+
+
+class Fetcher:
+
+	"""Pooled asynchronous HTTP client shared by the scraper and the cogs.
+
+	A single aiohttp session is created lazily inside the running event loop and
+	reused for every request, so connections to vlr.gg and vlrggapi are kept
+	alive between fetches. The connector caps the total number of open
+	connections and the number of concurrent connections per host.
+
+	If a ResponseCache is attached, fresh bodies are served from disk and stale
+	ones are revalidated with a conditional request. If a RateLimiter is
+	attached, every request that reaches the network waits for its host's
+	budget, and throttled or failed requests are retried with backoff.
+	"""
+
+	def __init__(self, limit: int = 16, limit_per_host: int = 4, timeout: float = REQUEST_TIMEOUT,
+			cache: ResponseCache = None, limiter: RateLimiter = None):
+		self.limit = limit
+		self.limit_per_host = limit_per_host
+		self.timeout = timeout
+		self.cache = cache
+		self.limiter = limiter
+		self._session = None
+
+	async def __aenter__(self):
+		return self
+
+	async def __aexit__(self, *exc_info):
+		await self.close()
+
+	def _get_session(self):
+		"""Return the shared session, creating it on first use.
+
+		Returns:
+		    aiohttp.ClientSession: the pooled session
+		"""
+		if self._session is None or self._session.closed:
+			connector = aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host, ttl_dns_cache=300)
+			self._session = aiohttp.ClientSession(
+				connector=connector,
+				headers=HEADERS,
+				timeout=aiohttp.ClientTimeout(total=self.timeout),
+			)
+		return self._session
+
+	async def fetch_text(self, url: str, ttl: float = None) -> str:
+		"""Retrieve the body of a url as text.
+
+		Args:
+		    url (str): url to retrieve
+		    ttl (float, optional): seconds a cached body stays fresh, defaults to the cache's ttl
+
+		Returns:
+		    str: response body
+
+		Raises:
+		    aiohttp.ClientResponseError: the server returned an error status, after any retries
+		    OfflineCacheMiss: the cache is offline and the url was never cached
+		"""
+		# the cache reads and writes files, so keep it off the event loop
+		entry = await asyncio.to_thread(self.cache.get, url) if self.cache else None
+		if entry is not None and self.cache.is_fresh(entry, ttl):
+			return entry.body
+		if self.cache and self.cache.offline:
+			raise OfflineCacheMiss(url)
+
+		headers = entry.validators() if entry is not None else None
+		attempt = 0
+		while True:
+			if self.limiter:
+				await self.limiter.acquire(url)
+			try:
+				async with self._get_session().get(url, headers=headers) as resp:
+					if resp.status == 304 and entry is not None:
+						await asyncio.to_thread(self.cache.refresh, entry)
+						return entry.body
+					delay = None
+					if resp.status >= 400 and self.limiter:
+						delay = self.limiter.retry_delay(attempt, resp.status, resp.headers.get("Retry-After"))
+					if delay is None:
+						resp.raise_for_status()
+						body = await resp.text()
+						break
+			except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+				delay = self.limiter.retry_delay(attempt) if self.limiter else None
+				if delay is None:
+					raise
+			attempt += 1
+			await asyncio.sleep(delay)
+
+		if self.cache:
+			await asyncio.to_thread(self.cache.put, url, body, resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
+		return body
+
+	async def fetch_json(self, url: str, ttl: float = None):
+		"""Retrieve the body of a url as decoded json.
+
+		Args:
+		    url (str): url to retrieve
+		    ttl (float, optional): seconds a cached body stays fresh, defaults to the cache's ttl
+
+		Returns:
+		    dict: decoded response body
+
+		Raises:
+		    aiohttp.ClientResponseError: the server returned an error status
+		    OfflineCacheMiss: the cache is offline and the url was never cached
+		"""
+		return json.loads(await self.fetch_text(url, ttl))
+
+	async def close(self):
+		"""Close the shared session and release pooled connections.
+		"""
+		if self._session is not None and not self._session.closed:
+			await self._session.close()
+		self._session = None
@@ -0,0 +1,245 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class OfflineCacheMiss(LookupError):
+
+	"""Raised in offline mode when a url has never been cached.
+	"""
+
+
+class CacheEntry:
+
+	"""A cached response body and the validators needed to revalidate it.
+	"""
+
+	def __init__(self, url: str, body: str, etag: str = None, last_modified: str = None, stored_at: float = 0.0):
+		self.url = url
+		self.body = body
+		self.etag = etag
+		self.last_modified = last_modified
+		self.stored_at = stored_at
+
+	def validators(self) -> dict:
+		"""Return conditional request headers for revalidating this entry.
+
+		Returns:
+		    dict: If-None-Match / If-Modified-Since headers, empty if there are no validators
+		"""
+		headers = dict()
+		if self.etag:
+			headers["If-None-Match"] = self.etag
+		if self.last_modified:
+			headers["If-Modified-Since"] = self.last_modified
+		return headers
+
+
+class ResponseCache:
+
+	"""Content-addressed on-disk cache of http response bodies.
+
+	Bodies are stored once under objects/, named by the sha256 of their content.
+	Each url has a small json index file under entries/, named by the sha256 of
+	the url, which points at its body and holds the ETag/Last-Modified
+	validators. An index file's mtime is its last use, and the least recently
+	used entries are evicted once the stored bodies exceed max_bytes.
+
+	The entries are read once, when the cache is opened, into an in-memory index
+	of each entry's body and of the bytes stored, kept in least recently used
+	order. Storing a body only touches its own files, and evicts only while the
+	cache is over budget. A lock serializes writes and eviction, since pages are
+	fetched from several threads at once.
+
+	In offline mode every cached entry is served regardless of age and a url
+	that was never cached raises OfflineCacheMiss, so nothing touches the network.
+	"""
+
+	def __init__(self, directory: str, ttl: float = 3600.0, max_bytes: int = 256 * 2**20, offline: bool = False):
+		self.directory = directory
+		self.ttl = ttl
+		self.max_bytes = max_bytes
+		self.offline = offline
+		self._entries = os.path.join(directory, "entries")
+		self._objects = os.path.join(directory, "objects")
+		os.makedirs(self._entries, exist_ok=True)
+		os.makedirs(self._objects, exist_ok=True)
+		self._lock = threading.Lock()
+		# entry file name -> blob name, least recently used first
+		self._index = OrderedDict()
+		# blob name -> [size, number of entries pointing at it]
+		self._blobs = dict()
+		self._bytes = 0
+		self._load()
+
+	def _entry_path(self, url: str) -> str:
+		return os.path.join(self._entries, self._entry_name(url))
+
+	@staticmethod
+	def _entry_name(url: str) -> str:
+		return hashlib.sha256(url.encode()).hexdigest() + ".json"
+
+	def get(self, url: str):
+		"""Retrieve the cached entry for a url and mark it as recently used.
+
+		Args:
+		    url (str): url to look up
+
+		Returns:
+		    CacheEntry: the cached entry, or None if the url is not cached
+		"""
+		path = self._entry_path(url)
+		try:
+			with open(path, 'r') as f:
+				meta = json.load(f)
+			with open(os.path.join(self._objects, meta["blob"]), 'r', encoding="utf-8") as f:
+				body = f.read()
+			os.utime(path)
+		except (FileNotFoundError, ValueError, KeyError):
+			return None
+		with self._lock:
+			if os.path.basename(path) in self._index:
+				self._index.move_to_end(os.path.basename(path))
+		return CacheEntry(url, body, meta.get("etag"), meta.get("last_modified"), meta.get("stored_at", 0.0))
+
+	def is_fresh(self, entry: CacheEntry, ttl: float = None) -> bool:
+		"""Check whether an entry can be served without revalidation.
+
+		Args:
+		    entry (CacheEntry): entry to check
+		    ttl (float, optional): seconds an entry stays fresh, defaults to the cache's ttl
+
+		Returns:
+		    bool: True if the entry is still fresh, or the cache is offline
+		"""
+		if self.offline:
+			return True
+		ttl = self.ttl if ttl is None else ttl
+		return time.time() - entry.stored_at < ttl
+
+	def put(self, url: str, body: str, etag: str = None, last_modified: str = None):
+		"""Store a response body for a url, then evict down to max_bytes.
+
+		Args:
+		    url (str): url the body was retrieved from
+		    body (str): response body
+		    etag (str, optional): ETag response header
+		    last_modified (str, optional): Last-Modified response header
+		"""
+		data = body.encode("utf-8")
+		blob = hashlib.sha256(data).hexdigest()
+		name = self._entry_name(url)
+		meta = {
+			"url": url,
+			"blob": blob,
+			"size": len(data),
+			"etag": etag,
+			"last_modified": last_modified,
+			"stored_at": time.time(),
+		}
+		with self._lock:
+			blob_path = os.path.join(self._objects, blob)
+			if blob not in self._blobs or not os.path.exists(blob_path):
+				self._write(blob_path, data)
+			self._write(os.path.join(self._entries, name), json.dumps(meta).encode())
+			old = self._index.pop(name, None)
+			self._reference(blob, len(data))
+			self._index[name] = blob
+			if old is not None:
+				self._release(old)
+			self._evict()
+
+	def refresh(self, entry: CacheEntry):
+		"""Mark an entry as fresh again after the server answered 304 Not Modified.
+
+		Args:
+		    entry (CacheEntry): entry that was revalidated
+		"""
+		self.put(entry.url, entry.body, entry.etag, entry.last_modified)
+
+	def size(self) -> int:
+		"""Return the total size in bytes of the stored bodies.
+		"""
+		return self._bytes
+
+	@staticmethod
+	def _write(path: str, data: bytes):
+		# write then rename so a crash never leaves a truncated file behind. The
+		# temporary name is unique to the writer, so concurrent writers of the
+		# same file never share one.
+		tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+		with open(tmp, 'wb') as f:
+			f.write(data)
+		os.replace(tmp, path)
+
+	@staticmethod
+	def _remove(path: str):
+		try:
+			os.remove(path)
+		except FileNotFoundError:
+			pass
+
+	def _load(self):
+		"""Read every entry into the index, least recently used first, and remove
+		bodies no entry points at. Temporary files of writes in progress are left alone.
+		"""
+		entries = list()
+		for name in os.listdir(self._entries):
+			if name.endswith(".tmp"):
+				continue
+			path = os.path.join(self._entries, name)
+			try:
+				with open(path, 'r') as f:
+					meta = json.load(f)
+				entries.append((os.path.getmtime(path), name, meta["blob"]))
+			except (FileNotFoundError, ValueError, KeyError):
+				continue
+		entries.sort()
+
+		sizes = dict()
+		for name in os.listdir(self._objects):
+			if name.endswith(".tmp"):
+				continue
+			try:
+				sizes[name] = os.path.getsize(os.path.join(self._objects, name))
+			except FileNotFoundError:
+				continue
+		for _, name, blob in entries:
+			if blob not in sizes:
+				# the body is gone, so the entry can never be served
+				self._remove(os.path.join(self._entries, name))
+				continue
+			self._reference(blob, sizes[blob])
+			self._index[name] = blob
+		for blob in sizes.keys() - self._blobs.keys():
+			self._remove(os.path.join(self._objects, blob))
+		with self._lock:
+			self._evict()
+
+	def _reference(self, blob: str, size: int):
+		"""Count one more entry pointing at a body."""
+		if blob in self._blobs:
+			self._blobs[blob][1] += 1
+		else:
+			self._blobs[blob] = [size, 1]
+			self._bytes += size
+
+	def _release(self, blob: str):
+		"""Count one entry fewer pointing at a body, removing it once none does."""
+		self._blobs[blob][1] -= 1
+		if self._blobs[blob][1] == 0:
+			size, _ = self._blobs.pop(blob)
+			self._bytes -= size
+			self._remove(os.path.join(self._objects, blob))
+
+	def _evict(self):
+		"""Remove least recently used entries until the bodies fit in max_bytes.
+		Call with the lock held.
+		"""
+		while self._bytes > self.max_bytes and self._index:
+			name, blob = self._index.popitem(last=False)
+			self._remove(os.path.join(self._entries, name))
+			self._release(blob)
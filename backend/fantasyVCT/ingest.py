@@ -0,0 +1,365 @@
+import asyncio
+import re
+
+import fantasyVCT.database as db
+from fantasyVCT.log import log
+from fantasyVCT.names import match_names
+from fantasyVCT.query_cache import POINTS, PLAYERS
+from fantasyVCT.scoring import PointCalculator, STAT_COLUMNS
+from fantasyVCT.scraper import Scraper
+from fantasyVCT.vlr_api import vlr_api
+
+from sqlalchemy import inspect, insert, select, update
+
+# the results feed changes as matches finish, so always revalidate it
+RESULTS_TTL = 0
+
+MATCH_ID_PATTERN = re.compile("^[0-9]{5,6}$")
+
+# every results column except the autoincrement primary key
+RESULT_COLUMNS = [attr for attr in inspect(db.Result).column_attrs if attr.key != "id"]
+
+
+def match_id_from_page(match_page: str):
+	"""Extract the vlr.gg match id from a results feed match_page.
+
+	Args:
+	    match_page (str): path of the match page, e.g. "/12345/team-a-vs-team-b"
+
+	Returns:
+	    str: the match id, or None if it is not a valid vlr match number
+	"""
+	match_id = match_page.strip('/').split('/')[0]
+	if not MATCH_ID_PATTERN.match(match_id):
+		return None
+	return match_id
+
+
+def _result_values(result: db.Result) -> dict:
+	"""Column values of a scraped result, ready for a bulk insert.
+	"""
+	return {column.key: getattr(result, column.key) for column in RESULT_COLUMNS}
+
+
+def store_match(session, match: db.Match, event_id: int = None, profile: db.ScoringProfile = None):
+	"""Add a parsed match's teams, players and results to a session.
+	Caller is responsible for committing.
+
+	Names are resolved set-wise, so the number of statements does not grow
+	with the number of maps or players: one IN query per type, one multi-row
+	insert for each type with missing rows (plus a query to read back their
+	ids), one executemany assigning teamless players, and one bulk insert of
+	every result. The results' points are then materialized with
+	PointCalculator.record_scores for every live scoring profile version.
+
+	Args:
+	    session (Session): session to add rows to
+	    match (db.Match): parsed match from the scraper
+	    event_id (int, optional): id of the tracked event the match belongs to
+	    profile (db.ScoringProfile, optional): profile version to return points
+	    	for, defaults to the selected one
+
+	Returns:
+	    dict: points of each added result, keyed by player id then game id.
+	    	The keys are exactly the players whose results were added.
+	"""
+	abbrevs = dict()
+	player_teams = dict()
+	for map_scraped in match.maps:
+		for team_scraped in (map_scraped.team1, map_scraped.team2):
+			abbrevs.setdefault(team_scraped.name, team_scraped.abbrev)
+			for player_scraped in team_scraped.players:
+				player_teams.setdefault(player_scraped.name, team_scraped.name)
+	if not player_teams:
+		return dict()
+
+	# resolve teams, creating any that do not exist in database
+	team_ids = _resolve_ids(session, db.Team, abbrevs, lambda name: {"name": name, "abbrev": abbrevs[name]})
+
+	# resolve players, creating any that do not exist in database
+	rows = session.execute(select(db.Player.id, db.Player.name, db.Player.team_id).where(db.Player.name.in_(player_teams))).all()
+	player_ids = _match_rows(player_teams, [(name, player_id) for player_id, name, _ in rows])
+	missing = _distinct_folded(name for name in player_teams if name not in player_ids)
+	if missing:
+		session.execute(insert(db.Player), [{"name": name, "team_id": team_ids[player_teams[name]]} for name in missing])
+		player_ids.update(_match_rows(
+			[name for name in player_teams if name not in player_ids],
+			session.execute(select(db.Player.name, db.Player.id).where(db.Player.name.in_(missing))).all(),
+		))
+
+	# players that are not assigned to a team join the team they played for
+	teamless_ids = {player_id for player_id, _, team_id in rows if team_id is None}
+	teamless = [
+		{"id": player_id, "team_id": team_ids[player_teams[name]]}
+		for name, player_id in player_ids.items() if player_id in teamless_ids
+	]
+	if teamless:
+		session.execute(update(db.Player), teamless)
+
+	# add results to results table
+	values = list()
+	for map_scraped in match.maps:
+		for team_scraped in (map_scraped.team1, map_scraped.team2):
+			for player_scraped in team_scraped.players:
+				row = _result_values(player_scraped.results[0])
+				row["player_id"] = player_ids[player_scraped.name]
+				if event_id is not None:
+					row["event_id"] = event_id
+				values.append(row)
+	session.execute(insert(db.Result), values)
+
+	# rows were written behind the identity map's back
+	session.expire_all()
+
+	# keep the materialized scores of every live profile version in step with
+	# the results, in the same transaction
+	stats = {key: [row[key] for row in values] for key in STAT_COLUMNS}
+	rv = None
+	for live in PointCalculator.live_profiles(session):
+		new_scores = dict()
+		points = PointCalculator.score_batch(stats, live)
+		for row, row_points in zip(values, points.tolist()):
+			new_scores.setdefault(row["player_id"], dict())[row["game_id"]] = row_points
+		if (live.selected if profile is None else live.id == profile.id):
+			rv = new_scores
+		PointCalculator.record_scores(session, new_scores, live)
+	return rv if rv is not None else dict()
+
+
+def _resolve_ids(session, model, names, new_row):
+	"""Map names to primary keys, inserting rows for the names that are missing.
+
+	Args:
+	    session (Session): session to query with
+	    model (Base): mapped class with id and name columns
+	    names (Iterable[str]): names to resolve
+	    new_row (Callable): builds the insert values for a missing name
+
+	Returns:
+	    dict: name to id for every name
+	"""
+	names = list(names)
+	ids = _match_rows(names, session.execute(select(model.name, model.id).where(model.name.in_(names))).all())
+	missing = _distinct_folded(name for name in names if name not in ids)
+	if missing:
+		session.execute(insert(model), [new_row(name) for name in missing])
+		ids.update(_match_rows(
+			[name for name in names if name not in ids],
+			session.execute(select(model.name, model.id).where(model.name.in_(missing))).all(),
+		))
+	return ids
+
+
+def _match_rows(names, rows) -> dict:
+	"""Match the (name, id) rows an IN query returned back to the names it was
+	given. The production database compares names case-insensitively, so a row
+	may come back spelled differently from the name that found it; a name
+	takes the row spelled exactly like it, else one differing only in case.
+
+	Returns:
+	    dict: id keyed by each of names that has a row
+	"""
+	exact = dict(rows)
+	folded = dict()
+	for name, row_id in rows:
+		folded.setdefault(name.casefold(), row_id)
+	ids = dict()
+	for name in names:
+		row_id = exact.get(name, folded.get(name.casefold()))
+		if row_id is not None:
+			ids[name] = row_id
+	return ids
+
+
+def _distinct_folded(names) -> list:
+	"""Names to insert, keeping only the first of any that differ only in case,
+	which the database's unique indexes treat as equal.
+	"""
+	seen = dict()
+	for name in names:
+		seen.setdefault(name.casefold(), name)
+	return list(seen.values())
+
+
+class IngestPipeline:
+
+	"""Staged pipeline that loads new results from tracked events.
+
+	Discovery, event filtering and deduplication run once per pass and cost one
+	http request and two queries. Each new match then flows through three
+	concurrent stages connected by bounded queues:
+
+	    fetch  - download both match tabs through the shared Fetcher
+	    parse  - build the db.Match in an executor, off the event loop
+	    write  - store batches of matches in a worker thread, one commit per batch
+
+	Blocking work never runs on the event loop, so commands stay responsive
+	during large result drops. A match that fails to fetch or parse, or a batch
+	that fails to store, is logged and skipped; it is retried on the next pass
+	because nothing was written.
+	"""
+
+	def __init__(self, bot, fetch_workers: int = 2, parse_workers: int = 2, queue_size: int = 4,
+			batch_size: int = 4, parse_executor=None):
+		self.bot = bot
+		self.fetch_workers = fetch_workers
+		self.parse_workers = parse_workers
+		self.queue_size = queue_size
+		self.batch_size = batch_size
+		self.parse_executor = parse_executor
+
+	async def run(self):
+		"""Run one ingestion pass.
+
+		Returns:
+		    list: ids of the matches written to the database
+		"""
+		segments = await self.discover()
+		if not segments:
+			return list()
+
+		tracked = await asyncio.to_thread(self._tracked_events)
+		candidates = dict()
+		for segment in segments:
+			event_id = tracked.get(segment.get('tournament_name'))
+			if event_id is None:
+				continue
+			match_id = match_id_from_page(segment.get('match_page', ''))
+			if not match_id:
+				log("invalid match id", segment.get('match_page'))
+				continue
+			candidates[match_id] = event_id
+		if not candidates:
+			return list()
+
+		existing = await asyncio.to_thread(self._existing_match_ids, list(candidates))
+		new = [(match_id, event_id) for match_id, event_id in candidates.items() if match_id not in existing]
+		if not new:
+			return list()
+
+		return await self._process(new)
+
+	async def discover(self):
+		"""Retrieve the latest results feed from vlrggapi.
+
+		Returns:
+		    list: result segments, empty if the feed could not be retrieved
+		"""
+		try:
+			json = await self.bot.fetcher.fetch_json(vlr_api.format("match/results"), ttl=RESULTS_TTL)
+		except Exception as e:
+			log("could not retrieve results from vlrggapi:", repr(e))
+			return list()
+		return json.get('data', {}).get('segments', [])
+
+	def _tracked_events(self):
+		with self.bot.db_manager.create_session() as session:
+			return {event.name: event.id for event in session.scalars(select(db.Event))}
+
+	def _existing_match_ids(self, match_ids):
+		with self.bot.db_manager.create_session() as session:
+			stmt = select(db.Result.match_id).where(db.Result.match_id.in_([int(m) for m in match_ids])).distinct()
+			return {str(match_id) for match_id in session.scalars(stmt)}
+
+	async def _process(self, new):
+		fetch_q = asyncio.Queue(self.queue_size)
+		parse_q = asyncio.Queue(self.queue_size)
+		write_q = asyncio.Queue(self.queue_size)
+		written = list()
+		loop = asyncio.get_running_loop()
+
+		async def fetch(item):
+			match_id, event_id = item
+			pages = await self.bot.scraper.fetch_match_pages(match_id)
+			return match_id, event_id, pages
+
+		async def parse(item):
+			match_id, event_id, (summary_html, performance_html) = item
+			match = await loop.run_in_executor(self.parse_executor, Scraper._build_match, match_id, summary_html, performance_html)
+			return match, event_id
+
+		async def produce():
+			for item in new:
+				await fetch_q.put(item)
+			for _ in range(self.fetch_workers):
+				await fetch_q.put(None)
+
+		async def writer():
+			batch = list()
+			while True:
+				item = await write_q.get()
+				if item is not None:
+					batch.append(item)
+				if batch and (item is None or len(batch) >= self.batch_size):
+					await write(batch)
+					batch = list()
+				if item is None:
+					return
+
+		async def write(batch):
+			try:
+				match_ids, new_scores, version = await asyncio.to_thread(self._write, batch)
+			except Exception as e:
+				# nothing was committed, so the matches are retried on the next pass
+				log("could not store matches", [match.match_id for match, _ in batch], repr(e))
+				return
+			written.extend(match_ids)
+			self.bot.cache.update(new_scores, version)
+			self.bot.queries.invalidate(POINTS, PLAYERS)
+			log("stored", len(match_ids), "match(es),", len(new_scores), "player(s) gained results")
+			log(self.bot.cache)
+
+		# if a stage fails outright, the group cancels the others instead of
+		# leaving them blocked on full queues
+		async with asyncio.TaskGroup() as group:
+			group.create_task(produce())
+			group.create_task(self._stage(fetch_q, parse_q, fetch, self.fetch_workers, self.parse_workers))
+			group.create_task(self._stage(parse_q, write_q, parse, self.parse_workers, 1))
+			group.create_task(writer())
+		return written
+
+	@staticmethod
+	async def _stage(in_q, out_q, fn, workers, downstream_workers):
+		"""Run `workers` copies of fn over in_q, then shut down the next stage.
+		"""
+		async def worker():
+			while True:
+				item = await in_q.get()
+				if item is None:
+					return
+				try:
+					await out_q.put(await fn(item))
+				except Exception as e:
+					log("ingestion failed for", item[0], repr(e))
+
+		await asyncio.gather(*(worker() for _ in range(workers)))
+		for _ in range(downstream_workers):
+			await out_q.put(None)
+
+	def _write(self, batch):
+		"""Store a batch of parsed matches in one transaction, refreshing the
+		standings of the fantasy teams that roster their players after each match.
+
+		Returns:
+		    tuple: ids of the matches written, the points of every added result
+		    	keyed by player id then game id, and the id of the scoring profile
+		    	version the points were computed with
+		"""
+		new_scores = dict()
+		profile = self.bot.scoring
+		with self.bot.db_manager.create_session() as session:
+			for match, event_id in batch:
+				match_scores = store_match(session, match, event_id, profile)
+				# refreshed per match so points_history gets a row for each one
+				self.bot.standings.players_changed(session, match_scores, profile, int(match.match_id))
+				for player_id, games in match_scores.items():
+					new_scores.setdefault(player_id, dict()).update(games)
+			session.commit()
+			# index the names of any teams and players the batch created
+			player_names, team_names = set(), set()
+			for match, _ in batch:
+				match_players, match_teams = match_names(match)
+				player_names.update(match_players)
+				team_names.update(match_teams)
+			self.bot.names.refresh(session, player_names, team_names)
+		return [match.match_id for match, _ in batch], new_scores, profile.id if profile is not None else None
@@ -1,12 +1,17 @@
 from enum import Enum
 import typing
 
+from fantasyVCT.standings import parse_history_bound, select_history, team_points
+from fantasyVCT.transactions import DRAFT, DROP, SET, log_moves, rostered_points
 from fantasyVCT.scoring import PointCalculator
+from fantasyVCT.names import PLAYER, TEAM
+from fantasyVCT.query_cache import POINTS, PLAYERS, ROSTERS
 import fantasyVCT.database as db
 
 from discord.ext import commands
+from discord import app_commands
 import discord
-from sqlalchemy import select, or_
+from sqlalchemy import delete, select, or_
 
 
 class Category(Enum):
@@ -99,7 +104,9 @@ class ConfigCog(commands.Cog, name="Configuration"):
 			# commit transaction
 			session.add_all([author, new_fteam])
 			session.flush()
+			self.bot.standings.refresh(session, [new_fteam.id], self.bot.scoring)
 			session.commit()
+			self.bot.queries.invalidate(ROSTERS)
 
 		# reply
 		await ctx.send(f"{team_abbrev} {team_name} has been registered for {ctx.message.author.mention}")
@@ -131,7 +138,7 @@ class ConfigCog(commands.Cog, name="Configuration"):
 
 	@commands.hybrid_command()
 	async def untrackevent(self, ctx, event_name: str):
-		"""Stop tracking new matches from a VCT event.
+		"""Stop tracking a VCT event and remove its results.
 
 		Parameters:
 		-----------
@@ -141,10 +148,20 @@ class ConfigCog(commands.Cog, name="Configuration"):
 			event = session.execute(select(db.Event).filter_by(name=event_name)).scalar_one_or_none()
 			if not event:
 				return await ctx.send("{event_name} is not currently being tracked.")
-		
+
+			# the event's results go with it, so recompute the scores and standings
+			# of the players who played in it
+			player_ids = list(session.scalars(select(db.Result.player_id).where(db.Result.event_id == event.id).distinct()))
+			session.execute(delete(db.Result).where(db.Result.event_id == event.id))
 			session.delete(event)
 			session.flush()
+			if player_ids:
+				for live in PointCalculator.live_profiles(session):
+					PointCalculator.rebuild_scores(session, live, player_ids)
+				self.bot.standings.players_changed(session, player_ids, self.bot.scoring)
 			session.commit()
+		self.bot.cache.forget(player_ids)
+		self.bot.queries.invalidate(POINTS)
 
 		await ctx.send(f"Stopped tracking {event_name}.")
 
@@ -174,26 +191,36 @@ class ConfigCog(commands.Cog, name="Configuration"):
 		"""
 		if self.bot.draft_state.is_draft_started():
 			return await ctx.send("Cannot add additional teams/players once draft has started.")
-		team_name, team_abbrev, player_names = self.bot.scraper.parse_team(url)
+		team_name, team_abbrev, player_names = await self.bot.scraper.parse_team_async(url)
 
 		with self.bot.db_manager.create_session() as session:
+			names = self.bot.names.ensure_loaded(session)
 			# check if team exists in database
-			team = session.execute(select(db.Team).filter_by(name=team_name)).scalar_one_or_none()
+			team_id = names.team_id(team_name)
+			team = session.get(db.Team, team_id) if team_id is not None else None
 			if not team:
 				# team does not exist in database
 				team = db.Team(name=team_name, abbrev=team_abbrev)
 				session.add(team)
 			
+			players = list()
 			for player_name in player_names:
 				# check that players exist in database
-				player = session.execute(select(db.Player).filter_by(name=player_name)).scalar_one_or_none()
+				player_id = names.player_id(player_name)
+				player = session.get(db.Player, player_id) if player_id is not None else None
 				if not player:
 					# player does not exist in database
 					player = db.Player(name=player_name)
 					session.add(player)
 				player.team = team
+				players.append(player)
 			session.flush()
+			team_row = (team.id, team.name, team.abbrev)
+			player_rows = [(player.id, player.name) for player in players]
 			session.commit()
+			names.add_teams([team_row])
+			names.add_players(player_rows)
+			self.bot.queries.invalidate(PLAYERS)
 			return await ctx.invoke(self.bot.get_command('info'), team_name)
 
 	@commands.hybrid_command()
@@ -224,10 +251,66 @@ class ConfigCog(commands.Cog, name="Configuration"):
 	async def scoring(self, ctx):
 		"""Display the stat weights used to calculate fantasy points."""
 		buf = "```\n"
-		buf += PointCalculator.get_scoring_info()
+		buf += PointCalculator.get_scoring_info(self.bot.scoring)
 		buf += "```"
 		return await ctx.send(buf)
 
+	@commands.hybrid_command()
+	async def scoringprofile(self, ctx, name: typing.Optional[str] = None):
+		"""List the scoring profiles, or select one for this league.
+
+		Parameters:
+		-----------
+		name: Profile to score with. A new name starts as a copy of the current weights.
+		"""
+		with self.bot.db_manager.create_session() as session:
+			if name is None:
+				profiles = session.scalars(select(db.ScoringProfile).order_by(db.ScoringProfile.name, db.ScoringProfile.version))
+				buf = "```\nScoring profiles:\n"
+				for profile in profiles:
+					line = str(profile)
+					if profile.selected:
+						line += " (selected)"
+					if profile.ready:
+						line += " (in use)"
+					buf += line + "\n"
+				buf += "```"
+				return await ctx.send(buf)
+
+			profile = PointCalculator.select_profile(session, name)
+			session.commit()
+			name, profile_id = str(profile), profile.id
+
+		await self._rescore(ctx, name, profile_id)
+
+	@commands.hybrid_command()
+	async def setweight(self, ctx, stat: str, weight: float):
+		"""Change the weight of one stat, creating a new version of the selected scoring profile.
+
+		Parameters:
+		-----------
+		stat: Stat to change, as listed by /scoring (e.g. KILLS or CLUTCH_V2).
+		weight: Points awarded per unit of the stat.
+		"""
+		with self.bot.db_manager.create_session() as session:
+			try:
+				profile = PointCalculator.revise_profile(session, **{stat.lower(): weight})
+			except ValueError:
+				return await ctx.send(f"{stat} is not a scored stat. See /scoring for the list.")
+			session.commit()
+			name, profile_id = str(profile), profile.id
+
+		await self._rescore(ctx, name, profile_id)
+
+	async def _rescore(self, ctx, name, profile_id):
+		"""Start recomputing a newly selected profile version and tell the league.
+		"""
+		self.bot.rescore(profile_id)
+		await ctx.send(
+			f"Selected scoring profile {name}. Scores are being recomputed in the background; "
+			f"until that finishes, points are still calculated with {self.bot.scoring}."
+		)
+
 
 class FantasyCog(commands.Cog, name="Fantasy"):
 	def __init__(self, bot):
@@ -244,7 +327,7 @@ class FantasyCog(commands.Cog, name="Fantasy"):
 
 		Parameters:
 		-----------
-		player_name: Player's exact IGN (case-sensitive). Use !freeagents to see available players.
+		player_name: Player's IGN. Use !freeagents to see available players.
 		"""
 		author_id = ctx.message.author.id
 
@@ -256,9 +339,9 @@ class FantasyCog(commands.Cog, name="Fantasy"):
 
 		with self.bot.db_manager.create_session() as session:
 			# search for player
-			drafted_player = session.execute(select(db.Player).filter_by(name=player_name)).scalar_one_or_none()
+			drafted_player = _get_player(self.bot.names, session, player_name)
 			if not drafted_player:
-				return await ctx.send(f"No player was found for \"{player_name}\"")
+				return await ctx.send(f"No player was found for \"{player_name}\"." + _did_you_mean(self.bot.names, player_name, (PLAYER,)))
 
 			# check that player isn't already on a team
 			if drafted_player.fantasyplayer:
@@ -297,7 +380,10 @@ class FantasyCog(commands.Cog, name="Fantasy"):
 				
 				# commit changes and print new roster info
 				session.flush()
+				log_moves(session, [(DRAFT, user.fantasy_team_id, drafted_player.id, i)])
+				self.bot.standings.refresh(session, [user.fantasy_team_id], self.bot.scoring)
 				session.commit()
+				self.bot.queries.invalidate(ROSTERS)
 				placed_flag = True
 				break
 
@@ -321,7 +407,7 @@ class FantasyCog(commands.Cog, name="Fantasy"):
 
 		Parameters:
 		-----------
-		player_name: Player's exact IGN (case-sensitive). Use !roster to see your current players.
+		player_name: Player's IGN. Use !roster to see your current players.
 		"""
 		author_id = ctx.message.author.id
 
@@ -331,9 +417,9 @@ class FantasyCog(commands.Cog, name="Fantasy"):
 		
 		with self.bot.db_manager.create_session() as session:
 			# search for player
-			dropped_player = session.execute(select(db.Player).filter_by(name=player_name)).scalar_one_or_none()
+			dropped_player = _get_player(self.bot.names, session, player_name)
 			if not dropped_player:
-				return await ctx.send(f"No player was found for \"{player_name}\"")
+				return await ctx.send(f"No player was found for \"{player_name}\"." + _did_you_mean(self.bot.names, player_name, (PLAYER,)))
 
 			# check that player is on user's roster
 			user = session.execute(select(db.User).filter_by(discord_id=author_id)).scalar_one_or_none()
@@ -343,7 +429,10 @@ class FantasyCog(commands.Cog, name="Fantasy"):
 			# drop player
 			session.delete(dropped_player.fantasyplayer)
 			session.flush()
+			log_moves(session, [(DROP, user.fantasy_team_id, dropped_player.id, None)])
+			self.bot.standings.refresh(session, [user.fantasy_team_id], self.bot.scoring)
 			session.commit()
+			self.bot.queries.invalidate(ROSTERS)
 
 			await ctx.send(f"{dropped_player.name} is now a free agent!")
 
@@ -356,111 +445,112 @@ class FantasyCog(commands.Cog, name="Fantasy"):
 		member: @mention a Discord user to view their roster (optional).
 		team: Team abbreviation or name to view (optional).
 		"""
+		author_id = None if member or team else ctx.message.author.id
+		key = ("roster", member.id if member else None, team, author_id)
+		await ctx.send(self.bot.queries.fetch(key, (POINTS, PLAYERS, ROSTERS), lambda: self._roster(member, team, author_id)))
 
+	def _roster(self, member, team, author_id) -> str:
+		"""Read and format a fantasy team's roster, see roster."""
 		with self.bot.db_manager.create_session() as session:
 			fantasy_team = None
 
 			# argument options
 			if member:
 				# search for the member's team
-				user = session.execute(select(db.User).filter_by(discord_id=member.id)).scalar_one_or_none()
+				user = session.execute(db.select_user_roster(member.id, with_results=False)).scalar_one_or_none()
 				if not user or not user.fantasyteam:
-					return await ctx.send(f"{member.name} does not have a registered fantasy team.")
+					return f"{member.name} does not have a registered fantasy team."
 				fantasy_team = user.fantasyteam
 			elif team:
 				# search for specified team
-				fantasy_team = session.execute(select(db.FantasyTeam).where(
+				fantasy_team = session.execute(db.select_rosters(
 					or_(
 						db.FantasyTeam.name == team,
 						db.FantasyTeam.abbrev == team
-					)
+					),
+					with_results=False,
 				)).scalar_one_or_none()
 				if not fantasy_team:
-					return await ctx.send(f"No fantasy team found for {team}")
+					return f"No fantasy team found for {team}"
 			else:
 				# otherwise, use the author's team
-				author = session.execute(select(db.User).filter_by(discord_id=ctx.message.author.id)).scalar_one_or_none()
+				author = session.execute(db.select_user_roster(author_id, with_results=False)).scalar_one_or_none()
 				if not author or not author.fantasyteam:
-					return await ctx.send("You do not have a registered fantasy team. Use the `!register` command. Type `!help` for more information.")
+					return "You do not have a registered fantasy team. Use the `!register` command. Type `!help` for more information."
 				fantasy_team = author.fantasyteam
 
 			fantasy_players = fantasy_team.fantasyplayers
 
+			# only results from while a player was in an active slot count for the team
+			points = rostered_points(session, [fantasy_team.id], self.bot.scoring).get(fantasy_team.id, dict())
+
 			# format output
 			buf = "```\n" + fantasy_team.abbrev + " / " + fantasy_team.name
-			total = 0
 			buf2 = ""
 			for k in range(self.pos_max):
 				line = add_spaces("", 4) + str(POSITIONS[k])
 				for fp in fantasy_players:
 					if fp.position is k:
 						line += add_spaces(line, 16) + f"{fp.player.team.abbrev} {fp.player.name}"
-						# update player information from results
-						# TODO optimize this out maybe with caching?
-						for row in fp.player.results:
-							fantasy_points = self.bot.cache.retrieve(fp.player.id, row.game_id)
-							if not fantasy_points:
-								# game is not in cache, so perform calculation
-								fantasy_points = PointCalculator.score(row)
-								self.bot.cache.store(fp.player.id, row.game_id, fantasy_points)
-						player_points = self.bot.cache.retrieve_total(fp.player.id)
+						rostered, counted = points.get(fp.player.id, (0.0, 0.0))
 						if k == 0:
-							player_points = player_points * 1.2
-						if k < 6:
-							total += player_points
-						line += add_spaces(line, 36) + str(round(player_points, 1))
-						if k == 0:
-							line += " (1.2x)"
+							# the label stands for the multiplier, so show the points before it
+							line += add_spaces(line, 36) + str(rostered) + " (1.2x)"
+						else:
+							line += add_spaces(line, 36) + str(counted)
 						break
 				buf2 += line + "\n"
 				if k == 5:
 					buf2 += "\n"
-			buf += " -- " + str(round(total, 1)) + "\n"
+			buf += " -- " + str(team_points(points)) + "\n"
 			line = ""
 			line += add_spaces(line, 4) + "Position"
 			line += add_spaces(line, 16) + "Name"
 			line += add_spaces(line, 36) + "Points"
 			buf += line + "\n\n"
 			buf += buf2 + "```"
-			await ctx.send(buf)
+			return buf
 
 	@commands.hybrid_command()
 	async def freeagents(self, ctx):
 		"""List all undrafted players and their fantasy points."""
+		await _send_all(ctx, self.bot.queries.fetch(("freeagents",), (POINTS, PLAYERS, ROSTERS), self._freeagents))
+
+	def _freeagents(self) -> list:
+		"""Read and format the free agents, see freeagents.
 
+		Returns:
+		    list: messages, split to stay under discord's character limit
+		"""
+		messages = list()
 		with self.bot.db_manager.create_session() as session:
 			# get all remaining players that are not drafted
-			stmt = select(db.Player).where(db.Player.id.notin_(select(db.FantasyPlayer.player_id)))
-			free_agents = session.scalars(stmt)
+			free_agents = session.scalars(db.select_free_agents())
+			totals = PointCalculator.stored_totals(
+				session, db.PlayerTotal.player_id.notin_(select(db.FantasyPlayer.player_id)), profile=self.bot.scoring
+			)
 
 			buf = "```\nFree Agents\n"
 			line = add_spaces("", 4) + "Player"
 			line += add_spaces(line, 24) + "Points"
 			buf += line + "\n\n"
 			for player in free_agents:
-				# update player information from results
-				# TODO optimize this out
-				for row in player.results:
-					fantasy_points = self.bot.cache.retrieve(player.id, row.game_id)
-					if not fantasy_points:
-						# game is not in cache, so perform calculation
-						fantasy_points = PointCalculator.score(row)
-						self.bot.cache.store(player.id, row.game_id, fantasy_points)
-				player_points = self.bot.cache.retrieve_total(player.id)
+				player_points = totals.get(player.id, 0)
 				line = add_spaces("", 4) + f"{player.team.abbrev} {player.name}"
 				line += add_spaces(line, 24) + str(player_points)
 
 				# check to ensure that the message has not exceeded discord's character limit
 				if len(buf + line) > 1900:
 					buf += "```"
-					await ctx.send(buf)
+					messages.append(buf)
 					buf = "```\nFree Agents (page 2)\n"
 					line2 = add_spaces("", 4) + "Player"
 					line2 += add_spaces(line, 24) + "Points"
 					buf += line2 + "\n\n"
 				buf += line + "\n"
 			buf += "```"
-			await ctx.send(buf)
+			messages.append(buf)
+		return messages
 
 	@commands.hybrid_command()
 	async def set(self, ctx, player: str, position: str):
@@ -468,7 +558,7 @@ class FantasyCog(commands.Cog, name="Fantasy"):
 
 		Parameters:
 		-----------
-		player: Player's exact IGN (case-sensitive).
+		player: Player's IGN.
 		position: Target position (captain, player1–player5, sub1–sub4).
 		"""
 
@@ -481,9 +571,9 @@ class FantasyCog(commands.Cog, name="Fantasy"):
 
 		with self.bot.db_manager.create_session() as session:
 			# check that player exists
-			set_player = session.execute(select(db.Player).filter_by(name=player)).scalar_one_or_none()
+			set_player = _get_player(self.bot.names, session, player)
 			if not set_player:
-				return await ctx.send(f"No player was not found for \"{player}\".")
+				return await ctx.send(f"No player was not found for \"{player}\"." + _did_you_mean(self.bot.names, player, (PLAYER,)))
 			
 			# check that the player is on the user's team
 			user = session.execute(select(db.User).filter_by(discord_id=ctx.message.author.id)).scalar_one_or_none()
@@ -492,10 +582,12 @@ class FantasyCog(commands.Cog, name="Fantasy"):
 
 			# check if the desired position is filled
 			dest_player = session.execute(select(db.FantasyPlayer).filter_by(fantasy_team_id=user.fantasy_team_id, position=dest_pos)).scalar_one_or_none()
+			moved = [set_player.fantasyplayer]
 			if dest_player:
 				# swap positions
 				dest_player.position = set_player.fantasyplayer.position
 				set_player.fantasyplayer.position = dest_pos
+				moved.append(dest_player)
 			else:
 				# update source player position
 				set_player.fantasyplayer.position = dest_pos
@@ -512,73 +604,111 @@ class FantasyCog(commands.Cog, name="Fantasy"):
 
 			# commit transaction and format output
 			session.flush()
+			log_moves(session, [(SET, user.fantasy_team_id, fp.player_id, fp.position) for fp in moved])
+			self.bot.standings.refresh(session, [user.fantasy_team_id], self.bot.scoring)
 			session.commit()
+			self.bot.queries.invalidate(ROSTERS)
 			await ctx.invoke(self.bot.get_command('roster'))
 
+	@draft.autocomplete("player_name")
+	@drop.autocomplete("player_name")
+	@set.autocomplete("player")
+	async def player_autocomplete(self, interaction, current: str):
+		return _choices(self.bot.names.search(current, kinds=(PLAYER,), limit=25))
+
 	@commands.hybrid_command()
 	async def standings(self, ctx):
 		"""Show current fantasy league standings sorted by optimized score."""
 
+		# the snapshot is kept current by uploads and roster changes
+		if not self.bot.standings.loaded:
+			with self.bot.db_manager.create_session() as session:
+				self.bot.standings.load(session, self.bot.scoring)
+				session.commit()
+		await ctx.send(self.bot.standings.render())
+
+	@commands.hybrid_command()
+	async def history(self, ctx, team: str, since: typing.Optional[str] = None, until: typing.Optional[str] = None):
+		"""Show a fantasy team's points after each uploaded match.
+
+		Parameters:
+		-----------
+		team: Team abbreviation or name.
+		since: First vlr match number or date (YYYY-MM-DD) to show (optional).
+		until: Last vlr match number or date (YYYY-MM-DD) to show (optional).
+		"""
+		try:
+			since = parse_history_bound(since) if since else None
+			until = parse_history_bound(until) if until else None
+		except ValueError:
+			return await ctx.send("Bounds must be a vlr match number or a date formatted YYYY-MM-DD.")
+
 		with self.bot.db_manager.create_session() as session:
-			# get curret scores
-			fteams = list(session.scalars(select(db.FantasyTeam)))
-			for fteam in fteams:
-				total = 0
-				for fp in fteam.fantasyplayers:
-					# populate cache for all players including subs (needed for optimal score)
-					# TODO optimize this out
-					for row in fp.player.results:
-						fantasy_points = self.bot.cache.retrieve(fp.player.id, row.game_id)
-						if not fantasy_points:
-							fantasy_points = PointCalculator.score(row)
-							self.bot.cache.store(fp.player.id, row.game_id, fantasy_points)
-					# don't count subs in actual score
-					if fp.position < 6:
-						player_points = self.bot.cache.retrieve_total(fp.player.id)
-						if fp.position == 0:
-							player_points = player_points * 1.2
-						total = round(total + player_points, 1)
-				fteam.points = total
-
-			# compute optimal scores
-			optimal_scores = {fteam.id: _optimal_score(fteam, self.bot.cache) for fteam in fteams}
-
-			sorted_teams = sorted(fteams, key=lambda k: optimal_scores[k.id], reverse=True)
+			fantasy_team = session.execute(select(db.FantasyTeam).where(
+				or_(
+					db.FantasyTeam.name == team,
+					db.FantasyTeam.abbrev == team
+				)
+			)).scalar_one_or_none()
+			if not fantasy_team:
+				return await ctx.send(f"No fantasy team found for {team}")
+			entries = list(session.scalars(select_history(fantasy_team.id, since, until)))
+			if not entries:
+				return await ctx.send(f"No points history found for {fantasy_team.abbrev}.")
+
+			header = "```\n" + fantasy_team.abbrev + " / " + fantasy_team.name + " History\n\n"
+			line = add_spaces("", 4) + "Date"
+			line += add_spaces(line, 16) + "Match"
+			line += add_spaces(line, 26) + "Points"
+			line += add_spaces(line, 36) + "Optimal"
+			line += add_spaces(line, 46) + "Rank\n"
+			header += line
+			buf = header
+			for entry in entries:
+				line = add_spaces("", 4) + entry.recorded_at.strftime("%Y-%m-%d")
+				line += add_spaces(line, 16) + str(entry.match_id)
+				line += add_spaces(line, 26) + str(entry.points)
+				line += add_spaces(line, 36) + str(entry.optimal)
+				line += add_spaces(line, 46) + str(entry.rank) + "\n"
 
-			# format output
-			any_suboptimal = any(optimal_scores[t.id] != t.points for t in sorted_teams)
-			buf = "```\n" + "Standings\n\n"
-			for fteam in sorted_teams:
-				optimal = optimal_scores[fteam.id]
-				marker = "*" if optimal != fteam.points else ""
-				buf += f"\t{fteam.abbrev} / {fteam.name} - {optimal}{marker}\n"
-			if any_suboptimal:
-				buf += "\n* Optimized score shown. Use !set to improve your lineup."
-			buf += "```"
-			await ctx.send(buf)
-
-
-def _optimal_score(fteam, cache) -> float:
-	"""Optimal score: try each player as captain, greedily pick best 5 active with distinct pro teams."""
-	players = [(cache.retrieve_total(fp.player.id), fp.player.team_id) for fp in fteam.fantasyplayers]
-	if not players:
-		return 0.0
-	players.sort(reverse=True)
-	best = 0.0
-	for i, (cap_score, _) in enumerate(players):
-		# pick best 5 active from remaining with distinct pro teams
-		active, used_teams = [], set()
-		for j, (score, team_id) in enumerate(players):
-			if j == i or team_id in used_teams:
-				continue
-			active.append(score)
-			used_teams.add(team_id)
-			if len(active) == 5:
-				break
-		total = round(cap_score * 1.2 + sum(active), 1)
-		if total > best:
-			best = total
-	return best
+				# check to ensure that the message has not exceeded discord's character limit
+				if len(buf + line) > 1900:
+					await ctx.send(buf + "```")
+					buf = header
+				buf += line
+		await ctx.send(buf + "```")
+
+
+def _get_player(names, session, name: str):
+	"""Load the player a name resolves to in the name index, or None.
+	A name the index does not know costs no query.
+	"""
+	player_id = names.ensure_loaded(session).player_id(name)
+	if player_id is None:
+		return None
+	return session.get(db.Player, player_id)
+
+
+async def _send_all(ctx, messages):
+	for message in messages:
+		await ctx.send(message)
+
+
+def _did_you_mean(names, name: str, kinds=(PLAYER, TEAM)) -> str:
+	"""Suggest the closest names to one that was not found.
+
+	Returns:
+	    str: " Did you mean ...?", or an empty string if nothing is close
+	"""
+	candidates = names.search(name, kinds=kinds, limit=3)
+	if not candidates:
+		return ""
+	return " Did you mean " + " or ".join(f"\"{candidate.name}\"" for candidate in candidates) + "?"
+
+
+def _choices(candidates) -> list:
+	"""Slash command autocomplete choices for search candidates."""
+	return [app_commands.Choice(name=candidate.name, value=candidate.name) for candidate in candidates]
 
 
 class StatsCog(commands.Cog, name="Stats"):
@@ -597,27 +727,28 @@ class StatsCog(commands.Cog, name="Stats"):
 		-----------
 		query: Player IGN or team name/abbreviation.
 		"""
-		query_string = query
+		await ctx.send(self.bot.queries.fetch(("info", query), (POINTS, PLAYERS), lambda: self._info(query)))
 
+	def _info(self, query_string: str) -> str:
+		"""Read and format a pro player or team, see info."""
 		with self.bot.db_manager.create_session() as session:
 			# check if query_string is a team
-			team = session.execute(select(db.Team).filter_by(name=query_string)).scalar_one_or_none()
+			team_id = self.bot.names.ensure_loaded(session).team_id(query_string)
+			team = session.get(db.Team, team_id) if team_id is not None else None
 			if team:
 				buf = "```\n" + str(team.name)
 				for player in team.players:
 					buf += "\n    " + str(player.name)
 				buf += "```"
-				return await ctx.send(buf)
+				return buf
 
 			# check if query_string is a player
-			player = session.execute(select(db.Player).filter_by(name=query_string)).scalar_one_or_none()
+			player = _get_player(self.bot.names, session, query_string)
 			if player:
 				for row in player.results:
-					fantasy_points = self.bot.cache.retrieve(player.id, row.game_id)
-					if not fantasy_points:
+					if not self.bot.cache.contains(player.id, row.game_id):
 						# game is not in cache, so perform calculation
-						fantasy_points = PointCalculator.score(row)
-						self.bot.cache.store(player.id, row.game_id, fantasy_points)
+						self.bot.cache.store(player.id, row.game_id, PointCalculator.score(row, self.bot.scoring))
 				total = self.bot.cache.retrieve_total(player.id)
 
 				# format output
@@ -637,21 +768,31 @@ class StatsCog(commands.Cog, name="Stats"):
 					line += add_spaces(line, 34) + str(row.game_id) + "\n"
 					buf += line
 				buf += "```"
-				return await ctx.send(buf)
+				return buf
+
+		return "A team or player was not found for {}.".format(query_string) + _did_you_mean(self.bot.names, query_string)
 
-		await ctx.send("A team or player was not found for {}.".format(query_string))
+	@info.autocomplete("query")
+	async def info_autocomplete(self, interaction, current: str):
+		return _choices(self.bot.names.search(current, limit=25))
+
+	@commands.hybrid_command()
+	async def cachestats(self, ctx):
+		"""Show score and query cache sizes, budgets and hit/miss/eviction counts."""
+		await ctx.send("```\n" + str(self.bot.cache) + "\n" + str(self.bot.queries) + "\n```")
 
 	@commands.hybrid_command()
 	async def rankplayers(self, ctx):
 		"""Rank all pro players by fantasy points, highest to lowest."""
+		await _send_all(ctx, self.bot.queries.fetch(("rankplayers",), (POINTS, PLAYERS, ROSTERS), self._rankplayers))
 
-		def get_fantasy_points(cache, player):
-			"""Retrieve the fantasy points value of the given db.Player"""
-			for row in player.results:
-				if not cache.retrieve(player.id, row.game_id):
-					cache.store(player.id, row.game_id, PointCalculator.score(row))
-			return cache.retrieve_total(player.id)
+	def _rankplayers(self) -> list:
+		"""Read and format the player rankings, see rankplayers.
 
+		Returns:
+		    list: messages, split to stay under discord's character limit
+		"""
+		messages = list()
 		buf = "```Player Rankings\n"
 		line = add_spaces("", 4) + "Player"
 		line += add_spaces(line, 30) + "Points"
@@ -660,18 +801,19 @@ class StatsCog(commands.Cog, name="Stats"):
 
 		with self.bot.db_manager.create_session() as session:
 			# get all players
-			players = list(session.scalars(select(db.Player)))
-			players = sorted(players, key=lambda player: get_fantasy_points(self.bot.cache, player), reverse=True)
+			players = list(session.scalars(db.select_players()))
+			totals = PointCalculator.stored_totals(session, profile=self.bot.scoring)
+			players = sorted(players, key=lambda player: totals.get(player.id, 0), reverse=True)
 			for player in players:
 				line = f"    {player.team.abbrev} {player.name}"
-				line += add_spaces(line, 30) + str(self.bot.cache.retrieve_total(player.id))
+				line += add_spaces(line, 30) + str(totals.get(player.id, 0))
 				if player.fantasyplayer:
 					line += add_spaces(line, 40) + player.fantasyplayer.fantasyteam.abbrev
 
 				# check to ensure that the message has not exceeded discord's character limit
 				if len(buf + line) > 1900:
 					buf += "```"
-					await ctx.send(buf)
+					messages.append(buf)
 					buf = "```\nPlayer Rankings (page 2)\n"
 					line2 = add_spaces(buf, 4) + "Player"
 					line2 += add_spaces(buf, 30) + "Points"
@@ -680,7 +822,8 @@ class StatsCog(commands.Cog, name="Stats"):
 				buf += line + "\n"
 
 		buf += "```"
-		return await ctx.send(buf)
+		messages.append(buf)
+		return messages
 
 
 async def setup(bot):
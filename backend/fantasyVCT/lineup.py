@@ -0,0 +1,81 @@
+import operator
+
+# the captain's points count this many times
+CAPTAIN_MULTIPLIER = 1.2
+# active slots besides the captain, each filled by a player from a different pro team
+ACTIVE_SLOTS = 5
+
+_points = operator.itemgetter(1)
+
+
+def optimal_lineup(players):
+	"""Find the highest scoring lineup a roster could field.
+
+	A lineup is an optional captain plus up to ACTIVE_SLOTS active players, no
+	two of whom play for the same pro team. The captain is exempt from the team
+	restriction. Slots may be left empty, so players with negative points are
+	only fielded when that helps.
+
+	Only the best player of each pro team can be active, so for a fixed captain
+	the best actives are the top positive team bests, with the captain's own
+	team falling back to its next best player. Only a captain who is one of the
+	top ACTIVE_SLOTS team bests changes that set, so at most ACTIVE_SLOTS + 1
+	captains need a closer look, which makes the search exact in O(n log n)
+	for n players.
+
+	Args:
+	    players (Iterable[tuple]): (key, points, team_id) for every rostered player,
+	    	where key identifies the player to the caller
+
+	Returns:
+	    tuple: (points rounded to one decimal, captain key or None, list of active keys
+	    	from best to worst)
+	"""
+	# best first, ties in roster order
+	ranked = sorted(players, key=_points, reverse=True)
+
+	# best and second best player of each pro team
+	firsts = list()
+	first_teams = set()
+	seconds = dict()
+	others = list()
+	for player in ranked:
+		team_id = player[2]
+		if team_id not in first_teams:
+			first_teams.add(team_id)
+			firsts.append(player)
+		else:
+			if team_id not in seconds:
+				seconds[team_id] = player
+			others.append(player)
+
+	def fielded(candidates):
+		chosen = [player for player in candidates[:ACTIVE_SLOTS] if player[1] > 0]
+		return sum((player[1] for player in chosen), 0.0), chosen
+
+	# with no captain, or a captain who is not a top team best, the actives are the top team bests
+	base_points, base = fielded(firsts)
+	best_points, best_captain, best_actives = base_points, None, base
+	outside = [player for player in (firsts[ACTIVE_SLOTS:ACTIVE_SLOTS + 1] + others[:1]) if player[1] > 0]
+	if outside:
+		captain = max(outside, key=_points)
+		total = captain[1] * CAPTAIN_MULTIPLIER + base_points
+		if total > best_points:
+			best_points, best_captain = total, captain
+
+	# a top team best as captain hands their slot to the next best team or teammate
+	for index, captain in enumerate(firsts[:ACTIVE_SLOTS]):
+		if captain[1] <= 0:
+			break
+		candidates = firsts[:index] + firsts[index + 1:ACTIVE_SLOTS + 1]
+		teammate = seconds.get(captain[2])
+		if teammate is not None:
+			candidates.append(teammate)
+			candidates.sort(key=_points, reverse=True)
+		active_points, actives = fielded(candidates)
+		total = captain[1] * CAPTAIN_MULTIPLIER + active_points
+		if total > best_points:
+			best_points, best_captain, best_actives = total, captain, actives
+
+	captain_key = best_captain[0] if best_captain is not None else None
+	return round(best_points, 1), captain_key, [player[0] for player in best_actives]
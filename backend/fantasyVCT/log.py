@@ -0,0 +1,7 @@
+import datetime
+
+
+def log(*args):
+	"""Print a timestamped line to the bot's output.
+	"""
+	print(datetime.datetime.now(), "- ", *args)
@@ -0,0 +1,219 @@
+import datetime
+import re
+
+import fantasyVCT.database as db
+from fantasyVCT.log import log
+from fantasyVCT.schema import missing_indexes, short_columns
+
+from sqlalchemy import delete, func, inspect, insert, select, text
+from sqlalchemy.exc import DBAPIError
+
+# (version, description, function) in the order they are applied, see migration
+MIGRATIONS = list()
+
+# privileges the bot's database user needs to run migrations, see init_user.sh
+MIGRATION_PRIVILEGES = ("CREATE", "ALTER", "INDEX", "REFERENCES")
+
+# MySQL error codes of statements denied for lack of a privilege
+_ACCESS_DENIED = {1044, 1142}
+
+
+class DuplicateResults(RuntimeError):
+
+	"""Raised by migrate when results holds several copies of a player's game,
+	which the unique index of migration 2 cannot be built over.
+	"""
+
+	def __init__(self, duplicates: dict):
+		self.duplicates = duplicates
+		lines = [
+			f"player {player_id}, game {game_id}: results {', '.join(map(str, ids))}"
+			for (player_id, game_id), ids in sorted(duplicates.items())
+		]
+		super().__init__(
+			f"{len(duplicates)} game(s) have duplicate results. Rerun with --delete-duplicate-results "
+			"to keep the first copy of each, or remove them by hand:\n\t" + "\n\t".join(lines)
+		)
+
+
+class MissingPrivilege(RuntimeError):
+
+	"""Raised by migrate when the database user may not run a migration's DDL.
+	"""
+
+	def __init__(self, privilege: str, user: str, database: str):
+		self.privilege = privilege
+		self.grant = f"GRANT {', '.join(MIGRATION_PRIVILEGES)} ON {database}.* TO '{user}'@'%';"
+		super().__init__(
+			f"The database user {user} lacks the {privilege} privilege on {database}, which schema "
+			f"migrations need. As root, run:\n\t{self.grant}\n\tFLUSH PRIVILEGES;"
+		)
+
+
+def migration(version: int, description: str):
+	"""Register a function as a schema migration.
+
+	The function is called with a Connection inside a transaction and must be
+	safe to run against a database that already has its changes, since
+	databases created from the current models or init_db.sql start out with
+	every change but no recorded versions. MySQL commits DDL implicitly, so a
+	failed migration is not rolled back; rerunning it must finish the job.
+
+	Args:
+	    version (int): position of the migration, one higher than the last
+	    description (str): what the migration changes, recorded with the version
+	"""
+	def register(fn):
+		if MIGRATIONS and version != MIGRATIONS[-1][0] + 1:
+			raise ValueError(f"migration {version} does not follow {MIGRATIONS[-1][0]}")
+		MIGRATIONS.append((version, description, fn))
+		return fn
+	return register
+
+
+def migrate(engine, delete_duplicates: bool = False) -> list:
+	"""Apply every registered migration the database has not recorded yet, in
+	version order, each in its own transaction.
+
+	Args:
+	    engine (Engine): engine of the database to migrate
+	    delete_duplicates (bool, optional): first delete every copy of a player's
+	    	game but the first, see delete_duplicate_results
+
+	Returns:
+	    list: versions applied
+
+	Raises:
+	    DuplicateResults: results holds duplicate games and delete_duplicates is
+	    	not set. Migrations before the one that needs them stay applied.
+	    MissingPrivilege: the database user lacks a privilege a migration needs
+	"""
+	try:
+		return _migrate(engine, delete_duplicates)
+	except DBAPIError as e:
+		args = getattr(e.orig, "args", ())
+		if not args or args[0] not in _ACCESS_DENIED:
+			raise
+		# e.g. "INDEX command denied to user 'discord'@'172.18.0.3' for table 'results'"
+		denied = re.match(r"(\w+) command denied", str(args[-1]))
+		privilege = denied.group(1).upper() if denied else "CREATE"
+		raise MissingPrivilege(privilege, engine.url.username, engine.url.database) from e
+
+
+def _migrate(engine, delete_duplicates: bool) -> list:
+	"""migrate without translating privilege errors."""
+	if delete_duplicates:
+		delete_duplicate_results(engine)
+	db.SchemaMigration.__table__.create(engine, checkfirst=True)
+	with engine.connect() as conn:
+		applied = set(conn.scalars(select(db.SchemaMigration.version)))
+
+	versions = list()
+	for version, description, fn in MIGRATIONS:
+		if version in applied:
+			continue
+		with engine.begin() as conn:
+			fn(conn)
+			conn.execute(insert(db.SchemaMigration).values(
+				version=version, description=description, applied_at=datetime.datetime.now()
+			))
+		log("applied schema migration", version, "-", description)
+		versions.append(version)
+	return versions
+
+
+def find_duplicate_results(conn) -> dict:
+	"""Find players' games stored more than once in results.
+
+	Args:
+	    conn (Connection): connection to query with
+
+	Returns:
+	    dict: result ids in id order, keyed by (player_id, game_id), for every
+	    	game with more than one result
+	"""
+	copies = (
+		select(db.Result.player_id, db.Result.game_id)
+		.group_by(db.Result.player_id, db.Result.game_id)
+		.having(func.count() > 1)
+		.subquery()
+	)
+	rows = conn.execute(
+		select(db.Result.player_id, db.Result.game_id, db.Result.id)
+		.join(copies, (db.Result.player_id == copies.c.player_id) & (db.Result.game_id == copies.c.game_id))
+		.order_by(db.Result.id)
+	)
+	duplicates = dict()
+	for player_id, game_id, result_id in rows:
+		duplicates.setdefault((player_id, game_id), list()).append(result_id)
+	return duplicates
+
+
+def delete_duplicate_results(engine) -> list:
+	"""Delete every copy of a player's game in results but the first, logging
+	each deleted row.
+
+	Args:
+	    engine (Engine): engine of the database to clean
+
+	Returns:
+	    list: ids of the deleted results
+	"""
+	with engine.begin() as conn:
+		if not inspect(conn).has_table(db.Result.__tablename__):
+			return list()
+		deleted = list()
+		for (player_id, game_id), ids in find_duplicate_results(conn).items():
+			for result_id in ids[1:]:
+				log("deleting result", result_id, "duplicating result", ids[0], "of player", player_id, "game", game_id)
+				deleted.append(result_id)
+		if deleted:
+			conn.execute(delete(db.Result).where(db.Result.id.in_(deleted)))
+	return deleted
+
+
+def _create_indexes(conn, *indexes):
+	"""Create indexes that do not exist yet."""
+	inspector = inspect(conn)
+	for index in indexes:
+		if index.name not in {existing["name"] for existing in inspector.get_indexes(index.table.name)}:
+			index.create(conn)
+
+
+######################################
+## Migrations
+######################################
+
+@migration(1, "create tables missing from the models")
+def _create_tables(conn):
+	# tables added after init_db.sql was first run: scoring profiles, scores,
+	# standings, points history and the roster transaction log
+	db.Base.metadata.create_all(conn, checkfirst=True)
+
+
+@migration(2, "index results by match, player and game, and event")
+def _index_results(conn):
+	indexes = {index.name: index for index in db.Result.__table__.indexes}
+	# the unique index cannot be built over duplicate games, and which copy is
+	# right is for the operator to decide
+	duplicates = find_duplicate_results(conn)
+	if duplicates:
+		raise DuplicateResults(duplicates)
+	_create_indexes(conn, indexes["uq_results_player_game"], indexes["ix_results_match"], indexes["ix_results_event"])
+
+
+@migration(3, "align constraints and column sizes with the models")
+def _align_with_models(conn):
+	inspector = inspect(conn)
+	for table in db.Base.metadata.sorted_tables:
+		if conn.dialect.name == "mysql":
+			# e.g. players.name, created as VARCHAR(20) by the first init_db.sql
+			for column, _ in short_columns(inspector, table):
+				column_type = column.type.compile(dialect=conn.dialect)
+				nullable = "NULL" if column.nullable else "NOT NULL"
+				conn.execute(text(f"ALTER TABLE {table.name} MODIFY {column.name} {column_type} {nullable}"))
+		for columns, unique in missing_indexes(inspector, table):
+			# the first init_db.sql declared these inline, so they only go missing if
+			# a table was created by hand
+			kind, prefix = ("UNIQUE INDEX", "uq") if unique else ("INDEX", "ix")
+			conn.execute(text(f"CREATE {kind} {prefix}_{table.name}_{'_'.join(columns)} ON {table.name} ({', '.join(columns)})"))
@@ -0,0 +1,252 @@
+from collections import Counter, namedtuple
+import threading
+import unicodedata
+
+import fantasyVCT.database as db
+
+from sqlalchemy import select
+
+PLAYER = "player"
+TEAM = "team"
+
+# a search result: what it is, its id and name, and how well it matched
+Candidate = namedtuple("Candidate", ["kind", "id", "name", "score"])
+
+
+def match_names(match: db.Match) -> tuple:
+	"""Names of the teams and players in a parsed match.
+
+	Returns:
+	    tuple: (set of player names, set of team names)
+	"""
+	players = set()
+	teams = set()
+	for map_scraped in match.maps:
+		for team_scraped in (map_scraped.team1, map_scraped.team2):
+			teams.add(team_scraped.name)
+			players.update(player_scraped.name for player_scraped in team_scraped.players)
+	return players, teams
+
+
+class NameIndex:
+	"""Process-wide lookup of pro player and team ids by name, kept in memory.
+
+	Players are keyed by name, teams by name and abbreviation. A name that does
+	not match exactly falls back to its case-folded form when exactly one row
+	has it. The index is read once by load and extended as rows are inserted:
+	by add_players and add_teams when the caller knows the new ids, by refresh
+	when it only knows the names. Players and teams are never deleted or
+	renamed, so it never needs to drop a key.
+
+	The index also answers fuzzy searches, see search. Every key is split into
+	trigrams of its case-folded, accent-stripped form, and an inverted index
+	maps each trigram to the keys containing it.
+
+	Ingestion adds names from worker threads, so every change holds a lock.
+	"""
+
+	def __init__(self):
+		self._lock = threading.Lock()
+		self._players = dict()
+		self._team_names = dict()
+		self._team_abbrevs = dict()
+		# case-folded key -> set of ids, for each of the three above
+		self._players_folded = dict()
+		self._team_names_folded = dict()
+		self._team_abbrevs_folded = dict()
+		# trigram -> set of (kind, id, search key); search key -> its number of trigrams
+		self._trigrams = dict()
+		self._trigram_counts = dict()
+		# (kind, id) -> name shown in search results
+		self._display = dict()
+		self.loaded = False
+
+	def load(self, session):
+		"""Read every player and team.
+
+		Args:
+		    session (Session): session to read with
+		"""
+		players = session.execute(select(db.Player.id, db.Player.name)).all()
+		teams = session.execute(select(db.Team.id, db.Team.name, db.Team.abbrev)).all()
+		with self._lock:
+			self._players = dict()
+			self._team_names = dict()
+			self._team_abbrevs = dict()
+			self._players_folded = dict()
+			self._team_names_folded = dict()
+			self._team_abbrevs_folded = dict()
+			self._trigrams = dict()
+			self._trigram_counts = dict()
+			self._display = dict()
+			self._add_players(players)
+			self._add_teams(teams)
+			self.loaded = True
+
+	def ensure_loaded(self, session):
+		"""Load the index if it has not been, e.g. when a command runs before startup finished.
+
+		Returns:
+		    NameIndex: self
+		"""
+		if not self.loaded:
+			self.load(session)
+		return self
+
+	def add_players(self, rows):
+		"""Index players.
+
+		Args:
+		    rows (Iterable[tuple]): (id, name) of each player
+		"""
+		with self._lock:
+			self._add_players(rows)
+
+	def add_teams(self, rows):
+		"""Index teams.
+
+		Args:
+		    rows (Iterable[tuple]): (id, name, abbrev) of each team
+		"""
+		with self._lock:
+			self._add_teams(rows)
+
+	def _add_players(self, rows):
+		for player_id, name in rows:
+			_add(self._players, self._players_folded, name, player_id)
+			self._add_search(PLAYER, player_id, name, name)
+
+	def _add_teams(self, rows):
+		for team_id, name, abbrev in rows:
+			_add(self._team_names, self._team_names_folded, name, team_id)
+			_add(self._team_abbrevs, self._team_abbrevs_folded, abbrev, team_id)
+			self._add_search(TEAM, team_id, name, name)
+			self._add_search(TEAM, team_id, abbrev, name)
+
+	def _add_search(self, kind, row_id, key, name):
+		if key is None:
+			return
+		key = search_key(key)
+		grams = trigrams(key)
+		for gram in grams:
+			self._trigrams.setdefault(gram, set()).add((kind, row_id, key))
+		self._trigram_counts[key] = len(grams)
+		self._display[(kind, row_id)] = name
+
+	def refresh(self, session, player_names=(), team_names=()):
+		"""Index the rows of any names the index does not have yet, after they
+		were inserted. Names it already has cost no query.
+
+		Args:
+		    session (Session): session to read with
+		    player_names (Iterable[str], optional): names of players that may be new
+		    team_names (Iterable[str], optional): names of teams that may be new
+		"""
+		with self._lock:
+			player_names = [name for name in player_names if name not in self._players]
+			team_names = [name for name in team_names if name not in self._team_names]
+		if player_names:
+			self.add_players(session.execute(select(db.Player.id, db.Player.name).where(db.Player.name.in_(player_names))).all())
+		if team_names:
+			self.add_teams(session.execute(
+				select(db.Team.id, db.Team.name, db.Team.abbrev).where(db.Team.name.in_(team_names))
+			).all())
+
+	def player_id(self, name: str):
+		"""Id of the player with a name, matched exactly or else case-insensitively.
+
+		Returns:
+		    int: the player's id, or None if no single player matches
+		"""
+		with self._lock:
+			return _find(name, (self._players, None), (None, self._players_folded))
+
+	def team_id(self, name: str):
+		"""Id of the team with a name or abbreviation, matched exactly or else
+		case-insensitively. Names take precedence over abbreviations.
+
+		Returns:
+		    int: the team's id, or None if no single team matches
+		"""
+		with self._lock:
+			return _find(
+				name,
+				(self._team_names, None), (self._team_abbrevs, None),
+				(None, self._team_names_folded), (None, self._team_abbrevs_folded),
+			)
+
+	def search(self, query: str, kinds=(PLAYER, TEAM), limit: int = 10, threshold: float = 0.3) -> list:
+		"""Players and teams whose name (or abbreviation, for teams) is similar to
+		a query, ignoring case and accents.
+
+		Similarity is the share of trigrams the query and a key have in common,
+		out of all trigrams of either. Keys that start with the query always
+		match, so partly typed names find what they are the start of, and rank
+		above the rest. Only keys sharing a trigram with the query are scored.
+
+		Args:
+		    query (str): name as typed
+		    kinds (tuple, optional): PLAYER and/or TEAM, defaults to both
+		    limit (int, optional): most candidates to return, defaults to 10
+		    threshold (float, optional): least similarity for keys the query is
+		    	not a prefix of, defaults to 0.3
+
+		Returns:
+		    list: Candidate tuples, best match first
+		"""
+		query = search_key(query)
+		if not query.strip():
+			return list()
+		grams = trigrams(query)
+		with self._lock:
+			shared = Counter()
+			for gram in grams:
+				shared.update(self._trigrams.get(gram, ()))
+
+			best = dict()
+			for (kind, row_id, key), count in shared.items():
+				if kind not in kinds:
+					continue
+				score = count / (len(grams) + self._trigram_counts[key] - count)
+				prefix = key.startswith(query)
+				if (score >= threshold or prefix) and (prefix, score) > best.get((kind, row_id), (False, -1.0)):
+					best[(kind, row_id)] = (prefix, score)
+			candidates = [
+				(prefix, Candidate(kind, row_id, self._display[(kind, row_id)], score))
+				for (kind, row_id), (prefix, score) in best.items()
+			]
+		candidates.sort(key=lambda item: (not item[0], -item[1].score, item[1].name.casefold(), item[1].id))
+		return [candidate for _, candidate in candidates[:limit]]
+
+
+def search_key(name: str) -> str:
+	"""Case-folded name without accents, so Rose finds Rosé."""
+	decomposed = unicodedata.normalize("NFKD", name.casefold())
+	return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def trigrams(key: str) -> set:
+	"""Three-character substrings of a key padded with two spaces before and one
+	after, so the start of a name weighs more than its end.
+	"""
+	padded = f"  {key} "
+	return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _add(exact, folded, key, row_id):
+	if key is None:
+		return
+	exact[key] = row_id
+	folded.setdefault(key.casefold(), set()).add(row_id)
+
+
+def _find(name, *lookups):
+	"""Try each (exact, folded) lookup in turn; folded matches count only if unique."""
+	for exact, folded in lookups:
+		if exact is not None and name in exact:
+			return exact[name]
+		if folded is not None:
+			ids = folded.get(name.casefold(), ())
+			if len(ids) == 1:
+				return next(iter(ids))
+	return None
@@ -0,0 +1,127 @@
+from collections import OrderedDict
+import threading
+import time
+
+# what a cached result was read from, see QueryCache.fetch
+POINTS = "points"  # results and the scores computed from them
+PLAYERS = "players"  # pro players and teams
+ROSTERS = "rosters"  # fantasy teams, their users and their players
+TAGS = (POINTS, PLAYERS, ROSTERS)
+
+
+class QueryCache:
+
+	"""Read-through cache of the replies of read-only commands.
+
+	Results are keyed by a tuple naming the query and its parameters, and are
+	tagged with the kinds of rows they were read from. Commands that write
+	those rows call invalidate with the matching tags, which drops every result
+	carrying any of them. Results also expire ttl seconds after they were read,
+	so a change made outside the bot, e.g. by hand in the database, is picked
+	up eventually.
+
+	A result read while one of its tags is invalidated, e.g. by an upload
+	committing from a worker thread, is returned but not stored, since it may
+	predate the write.
+
+	At most max_entries results are kept, evicting the least recently used.
+	Hits, misses, expirations, invalidations and evictions are counted and
+	reported by stats().
+	"""
+
+	def __init__(self, ttl: float = 300.0, max_entries: int = 256, clock=time.monotonic):
+		self.ttl = ttl
+		self.max_entries = max_entries
+		self._clock = clock
+		self._lock = threading.Lock()
+		# key -> (tags, expiry, value)
+		self._store = OrderedDict()
+		# tag -> number of times it was invalidated
+		self._generations = dict.fromkeys(TAGS, 0)
+		self.hits = 0
+		self.misses = 0
+		self.expirations = 0
+		self.invalidations = 0
+		self.evictions = 0
+
+	def fetch(self, key: tuple, tags, load):
+		"""Return the cached result of a query, reading and caching it on a miss.
+
+		Args:
+		    key (tuple): names the query and every parameter its result depends on
+		    tags (Iterable[str]): kinds of rows the result is read from, see TAGS
+		    load (Callable): reads the result; called without arguments on a miss
+
+		Returns:
+		    the cached or newly read result, shared between callers, so it must
+		    	not be modified
+		"""
+		tags = tuple(tags)
+		with self._lock:
+			entry = self._store.get(key)
+			if entry is not None and entry[1] <= self._clock():
+				del self._store[key]
+				self.expirations += 1
+				entry = None
+			if entry is not None:
+				self._store.move_to_end(key)
+				self.hits += 1
+				return entry[2]
+			self.misses += 1
+			generations = [self._generations[tag] for tag in tags]
+
+		value = load()
+
+		with self._lock:
+			if generations == [self._generations[tag] for tag in tags]:
+				self._store[key] = (tags, self._clock() + self.ttl, value)
+				self._store.move_to_end(key)
+				while len(self._store) > self.max_entries:
+					self._store.popitem(last=False)
+					self.evictions += 1
+		return value
+
+	def invalidate(self, *tags):
+		"""Drop every cached result read from any of the given kinds of rows.
+		Call after committing a write.
+
+		Args:
+		    *tags (str): kinds of rows written, see TAGS. Defaults to all of them.
+		"""
+		tags = set(tags or TAGS)
+		with self._lock:
+			for tag in tags:
+				self._generations[tag] += 1
+			stale = [key for key, (entry_tags, _, _) in self._store.items() if tags.intersection(entry_tags)]
+			for key in stale:
+				del self._store[key]
+			self.invalidations += len(stale)
+
+	def stats(self) -> dict:
+		"""Report the cache's size and its counters.
+
+		Returns:
+		    dict: entries, max_entries, ttl, hits, misses, expirations,
+		    	invalidations, evictions and hit_rate
+		"""
+		with self._lock:
+			lookups = self.hits + self.misses
+			return {
+				"entries": len(self._store),
+				"max_entries": self.max_entries,
+				"ttl": self.ttl,
+				"hits": self.hits,
+				"misses": self.misses,
+				"expirations": self.expirations,
+				"invalidations": self.invalidations,
+				"evictions": self.evictions,
+				"hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+			}
+
+	def __str__(self) -> str:
+		stats = self.stats()
+		return (
+			f"query cache: {stats['entries']}/{stats['max_entries']} results, {stats['ttl']:g}s ttl, "
+			f"{stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.1%} hit rate), "
+			f"{stats['expirations']} expired, {stats['invalidations']} invalidated, {stats['evictions']} evictions"
+		)
@@ -0,0 +1,125 @@
+import asyncio
+import email.utils
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+# statuses worth retrying after a pause; anything else is raised immediately
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+
+
+def parse_retry_after(value):
+	"""Parse a Retry-After header.
+
+	Args:
+	    value (str): header value, either delay-seconds or an HTTP-date
+
+	Returns:
+	    float: seconds to wait, or None if the header is missing or malformed
+	"""
+	if not value:
+		return None
+	try:
+		return max(0.0, float(value))
+	except ValueError:
+		pass
+	try:
+		when = email.utils.parsedate_to_datetime(value)
+	except (TypeError, ValueError):
+		return None
+	return max(0.0, when.timestamp() - time.time())
+
+
+class TokenBucket:
+
+	"""Token bucket shared by blocking and async callers.
+
+	Callers reserve a token and are told how long to wait for it. The balance
+	may go negative, which queues callers behind each other at the bucket's
+	rate instead of having them poll.
+	"""
+
+	def __init__(self, rate: float, capacity: float = None):
+		self.rate = rate
+		self.capacity = capacity if capacity else max(1.0, rate)
+		self._tokens = self.capacity
+		self._updated = time.monotonic()
+		self._lock = threading.Lock()
+
+	def reserve(self) -> float:
+		"""Take a token.
+
+		Returns:
+		    float: seconds the caller must wait before using the token
+		"""
+		with self._lock:
+			now = time.monotonic()
+			self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+			self._updated = now
+			self._tokens -= 1
+			if self._tokens >= 0:
+				return 0.0
+			return -self._tokens / self.rate
+
+
+class RateLimiter:
+
+	"""Requests/sec budget per host, with jittered exponential backoff.
+
+	Every outbound request first waits for a token from its host's bucket. A
+	response with a status in RETRY_STATUSES, or a connection error, is retried
+	up to `retries` times. The pause honours Retry-After when the server sends
+	it, and otherwise uses full-jitter exponential backoff capped at
+	`max_delay` seconds.
+	"""
+
+	def __init__(self, rate: float = 2.0, burst: float = None, retries: int = 4, base_delay: float = 1.0, max_delay: float = 60.0):
+		self.rate = rate
+		self.burst = burst
+		self.retries = retries
+		self.base_delay = base_delay
+		self.max_delay = max_delay
+		self._buckets = dict()
+		self._lock = threading.Lock()
+
+	def _bucket(self, url: str) -> TokenBucket:
+		host = urlsplit(url).netloc
+		with self._lock:
+			if host not in self._buckets:
+				self._buckets[host] = TokenBucket(self.rate, self.burst)
+			return self._buckets[host]
+
+	async def acquire(self, url: str):
+		"""Wait for permission to send a request to url's host.
+		"""
+		delay = self._bucket(url).reserve()
+		if delay:
+			await asyncio.sleep(delay)
+
+	def acquire_sync(self, url: str):
+		"""Block until a request may be sent to url's host.
+		"""
+		delay = self._bucket(url).reserve()
+		if delay:
+			time.sleep(delay)
+
+	def retry_delay(self, attempt: int, status: int = None, retry_after: str = None):
+		"""Decide whether and when to retry a failed request.
+
+		Args:
+		    attempt (int): number of attempts already made, starting at 0
+		    status (int, optional): response status, None for a connection error
+		    retry_after (str, optional): Retry-After header of the response
+
+		Returns:
+		    float: seconds to wait before retrying, or None if the request should not be retried
+		"""
+		if attempt >= self.retries:
+			return None
+		if status is not None and status not in RETRY_STATUSES:
+			return None
+		delay = parse_retry_after(retry_after)
+		if delay is not None:
+			return min(delay, self.max_delay)
+		return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
@@ -0,0 +1,110 @@
+import asyncio
+
+import fantasyVCT.database as db
+from fantasyVCT.log import log
+from fantasyVCT.scoring import PointCalculator
+
+from sqlalchemy import select
+
+
+class Rescorer:
+	"""Recompute the materialized scores of a new scoring profile version in the background.
+
+	Players are rescored in batches, each in its own short transaction on a worker
+	thread, so commands keep running and keep reading the totals of the version
+	in bot.scoring until every batch is done. New results uploaded meanwhile are
+	materialized for the selected version by ingest.store_match, so nothing is
+	missed. When the last batch commits, the version is marked ready, the bot
+	switches to it, the standings are recomputed with it and the scores of older
+	versions are dropped.
+
+	If another version is selected before the job finishes, it stops at the next
+	batch; its partial scores are dropped when the newer version takes over.
+	"""
+
+	def __init__(self, bot, batch_size: int = 200):
+		self.bot = bot
+		self.batch_size = batch_size
+
+	async def run(self, profile_id: int) -> bool:
+		"""Rescore every player with results for a profile version.
+
+		Args:
+		    profile_id (int): id of the selected scoring profile version
+
+		Returns:
+		    bool: True if the bot switched to the version, False if it was
+		    	deselected before the job finished
+		"""
+		player_ids = await asyncio.to_thread(self._player_ids)
+		log("rescoring", len(player_ids), "player(s) for scoring profile", profile_id)
+		for start in range(0, len(player_ids), self.batch_size):
+			batch = player_ids[start:start + self.batch_size]
+			if not await asyncio.to_thread(self._rescore, profile_id, batch):
+				log("scoring profile", profile_id, "was deselected, rescoring stopped")
+				return False
+		profile = await asyncio.to_thread(self._finish, profile_id)
+		if profile is None:
+			log("scoring profile", profile_id, "was deselected, rescoring stopped")
+			return False
+		# switch before recomputing the standings, so an upload landing in
+		# between updates its teams with the new version rather than
+		# overwriting the recomputed standings with the old one
+		self.bot.set_scoring(profile)
+		await asyncio.to_thread(self._refresh_standings, profile)
+		# uploads racing the switch may still score with the old version, so its
+		# scores are only dropped once the bot reads the new one
+		await asyncio.to_thread(self._prune, profile)
+		log("now scoring with", profile)
+		return True
+
+	def _player_ids(self):
+		with self.bot.db_manager.create_session() as session:
+			return list(session.scalars(select(db.Result.player_id).distinct().order_by(db.Result.player_id)))
+
+	def _rescore(self, profile_id, player_ids):
+		"""Rescore one batch of players in one transaction.
+
+		Returns:
+		    bool: False if the profile version is no longer selected
+		"""
+		with self.bot.db_manager.create_session() as session:
+			profile = session.get(db.ScoringProfile, profile_id)
+			if profile is None or not profile.selected:
+				return False
+			PointCalculator.rebuild_scores(session, profile, player_ids)
+			session.commit()
+		return True
+
+	def _finish(self, profile_id):
+		"""Mark a fully rescored version ready.
+
+		Returns:
+		    db.ScoringProfile: the version, detached from its session, or None if
+		    	it is no longer selected
+		"""
+		with self.bot.db_manager.create_session() as session:
+			profile = session.get(db.ScoringProfile, profile_id)
+			if profile is None or not profile.selected:
+				return None
+			# players whose first results arrived after the job listed players
+			# were materialized by store_match, so this only catches hand edits
+			PointCalculator.ensure_scores(session, profile)
+			session.commit()
+			session.refresh(profile)
+			session.expunge(profile)
+		return profile
+
+	def _refresh_standings(self, profile):
+		"""Recompute the standings with the version the bot switched to.
+		"""
+		with self.bot.db_manager.create_session() as session:
+			self.bot.standings.refresh(session, profile=profile)
+			session.commit()
+
+	def _prune(self, profile):
+		"""Drop the scores of every version but the one the bot switched to.
+		"""
+		with self.bot.db_manager.create_session() as session:
+			PointCalculator.prune_scores(session, profile)
+			session.commit()
@@ -0,0 +1,145 @@
+"""Generate the MySQL DDL for the models in fantasyVCT.database, and check a
+live database for drift from them.
+
+Regenerate db/scripts/init_db.sql after changing a model, from backend/:
+    python -m fantasyVCT.schema > ../db/scripts/init_db.sql
+"""
+import sys
+
+import fantasyVCT.database as db
+
+from sqlalchemy import String, inspect, insert
+from sqlalchemy.dialects import mysql
+from sqlalchemy.schema import CreateIndex, CreateTable, UniqueConstraint
+
+DATABASES = ("FantasyValDev", "FantasyValProd")
+
+# rows every database starts with
+SEED_ROWS = {
+	db.Position: [
+		{"id": 0, "position": "captain"},
+		{"id": 1, "position": "player1"},
+		{"id": 2, "position": "player2"},
+		{"id": 3, "position": "player3"},
+		{"id": 4, "position": "player4"},
+		{"id": 5, "position": "player5"},
+		{"id": 6, "position": "sub1"},
+		{"id": 7, "position": "sub2"},
+		{"id": 8, "position": "sub3"},
+		{"id": 9, "position": "sub4"},
+	],
+}
+
+
+def generate_ddl(databases=DATABASES) -> str:
+	"""MySQL statements creating every mapped table, index and seed row in
+	each database.
+
+	Args:
+	    databases (Iterable[str], optional): database names, defaults to dev and prod
+
+	Returns:
+	    str: the script, one statement per paragraph
+	"""
+	dialect = mysql.dialect()
+	tables = db.Base.metadata.sorted_tables
+	statements = list()
+	for database in databases:
+		statements.append(f"CREATE DATABASE IF NOT EXISTS {database}")
+	for database in databases:
+		statements.append(f"USE {database}")
+		for table in tables:
+			statements.append(str(CreateTable(table, if_not_exists=True).compile(dialect=dialect)).strip())
+			for index in sorted(table.indexes, key=lambda index: index.name):
+				statements.append(str(CreateIndex(index).compile(dialect=dialect)).strip())
+		for model, rows in SEED_ROWS.items():
+			stmt = insert(model).prefix_with("IGNORE").values(rows)
+			statements.append(str(stmt.compile(dialect=dialect, compile_kwargs={"literal_binds": True})).strip())
+
+	header = (
+		"-- Generated from the models in backend/fantasyVCT/database.py. Do not edit;\n"
+		"-- from backend/, run: python -m fantasyVCT.schema > ../db/scripts/init_db.sql\n\n"
+	)
+	script = header + ";\n\n".join(statements) + ";\n"
+	return "\n".join(line.rstrip() for line in script.split("\n"))
+
+
+def expected_indexes(table) -> set:
+	"""Indexes a table needs: its declared indexes and unique constraints.
+
+	Returns:
+	    set: (column names tuple, unique) pairs
+	"""
+	specs = {(tuple(column.name for column in index.columns), bool(index.unique)) for index in table.indexes}
+	specs.update(
+		(tuple(column.name for column in constraint.columns), True)
+		for constraint in table.constraints if isinstance(constraint, UniqueConstraint)
+	)
+	return specs
+
+
+def missing_indexes(inspector, table) -> list:
+	"""Expected indexes of a table that the database does not have, by columns
+	and uniqueness rather than by name. A unique index also covers a plain one
+	on the same columns.
+
+	Returns:
+	    list: (column names tuple, unique) pairs, sorted
+	"""
+	existing = {(tuple(index["column_names"]), bool(index["unique"])) for index in inspector.get_indexes(table.name)}
+	existing.update((tuple(constraint["column_names"]), True) for constraint in inspector.get_unique_constraints(table.name))
+	existing.add((tuple(inspector.get_pk_constraint(table.name)["constrained_columns"]), True))
+	return sorted(
+		(columns, unique) for columns, unique in expected_indexes(table)
+		if (columns, True) not in existing and (unique or (columns, False) not in existing)
+	)
+
+
+def short_columns(inspector, table) -> list:
+	"""String columns the database declares shorter than the model does.
+
+	Returns:
+	    list: (column, length in the database) pairs
+	"""
+	reflected = {column["name"]: column["type"] for column in inspector.get_columns(table.name)}
+	short = list()
+	for column in table.columns:
+		actual = reflected.get(column.name)
+		if isinstance(column.type, String) and column.type.length and getattr(actual, "length", None):
+			if actual.length < column.type.length:
+				short.append((column, actual.length))
+	return short
+
+
+def check_schema(engine) -> list:
+	"""Compare a database with the models: every table, column and index the
+	models declare must exist, and no string column may be shorter.
+
+	Args:
+	    engine (Engine): engine of the database to check
+
+	Returns:
+	    list: a description of each difference, empty if there is none
+	"""
+	problems = list()
+	with engine.connect() as conn:
+		inspector = inspect(conn)
+		existing_tables = set(inspector.get_table_names())
+		for table in db.Base.metadata.sorted_tables:
+			if table.name not in existing_tables:
+				problems.append(f"missing table {table.name}")
+				continue
+			reflected = {column["name"] for column in inspector.get_columns(table.name)}
+			for column in table.columns:
+				if column.name not in reflected:
+					problems.append(f"missing column {table.name}.{column.name}")
+			for columns, unique in missing_indexes(inspector, table):
+				kind = "unique index" if unique else "index"
+				problems.append(f"missing {kind} on {table.name} ({', '.join(columns)})")
+			for column, length in short_columns(inspector, table):
+				problems.append(f"{table.name}.{column.name} holds {length} characters, the model {column.type.length}")
+	return problems
+
+
+if __name__ == "__main__":
+	sys.stdout.write(generate_ddl())
@@ -1,4 +1,13 @@
-from fantasyVCT.database import Result, add_spaces
+import math
+import operator
+import sys
+from collections import OrderedDict
+
+from fantasyVCT.database import PlayerScore, PlayerTotal, Result, ScoringProfile, add_spaces
+
+import numpy as np
+
+from sqlalchemy import bindparam, delete, func, insert, select, update
 
 ACS = 0.05
 KILLS = 2
@@ -13,6 +22,92 @@ CLUTCH_V3 = 4
 CLUTCH_V4 = 5
 CLUTCH_V5 = 6
 
+# results column and weight for each scored stat, in score() order
+WEIGHTS = (
+	(Result.player_acs, ACS),
+	(Result.player_kills, KILLS),
+	(Result.player_deaths, DEATHS),
+	(Result.player_assists, ASSISTS),
+	(Result.player_2k, KILLS2),
+	(Result.player_3k, KILLS3),
+	(Result.player_4k, KILLS4),
+	(Result.player_5k, KILLS5),
+	(Result.player_clutch_v2, CLUTCH_V2),
+	(Result.player_clutch_v3, CLUTCH_V3),
+	(Result.player_clutch_v4, CLUTCH_V4),
+	(Result.player_clutch_v5, CLUTCH_V5),
+)
+
+# results attribute names in WEIGHTS order, the column layout of a stats block
+STAT_COLUMNS = tuple(column.key for column, _ in WEIGHTS)
+_stat_getter = operator.attrgetter(*STAT_COLUMNS)
+
+# scoring_profiles weight attribute names in WEIGHTS order
+WEIGHT_NAMES = (
+	"acs", "kills", "deaths", "assists", "kills2", "kills3", "kills4", "kills5",
+	"clutch_v2", "clutch_v3", "clutch_v4", "clutch_v5",
+)
+_weight_getter = operator.attrgetter(*WEIGHT_NAMES)
+
+# profile created from the weights above when a league has none
+DEFAULT_PROFILE = "default"
+
+
+def profile_weights(profile: ScoringProfile = None) -> tuple:
+	"""Weights of a scoring profile in WEIGHTS order.
+
+	Args:
+	    profile (ScoringProfile, optional): profile version to read, defaults to
+	    	the weights defined in this module
+
+	Returns:
+	    tuple: one weight per scored stat
+	"""
+	if profile is None:
+		return tuple(weight for _, weight in WEIGHTS)
+	return _weight_getter(profile)
+
+# slack when deciding ties, so float error in a weighted sum like 9.55 cannot
+# push it to the wrong side of the .x5 boundary
+ROUNDING_EPSILON = 1e-6
+_HALF = 0.5 + ROUNDING_EPSILON
+
+
+def round_points(points: float) -> float:
+	"""Round points to one decimal place, ties away from zero.
+
+	round() sends exact binary ties to the even digit and near ties wherever float
+	error puts them, which NumPy cannot reproduce. This rule has an exact
+	counterpart in round_points_array.
+
+	Args:
+	    points (float): unrounded points
+
+	Returns:
+	    float: points rounded to one decimal place
+	"""
+	tenths = math.floor(abs(points) * 10 + _HALF)
+	return (tenths if points >= 0 else -tenths) / 10
+
+
+def round_points_array(points: np.ndarray) -> np.ndarray:
+	"""NumPy counterpart of round_points.
+
+	Args:
+	    points (np.ndarray): unrounded points
+
+	Returns:
+	    np.ndarray: points rounded to one decimal place, ties away from zero
+	"""
+	tenths = np.floor(np.abs(points) * 10 + _HALF)
+	# adding 0.0 turns the -0.0 of small negative scores into 0.0, like round_points
+	return np.where(points >= 0, tenths, -tenths) / 10 + 0.0
+
+
+# returned by Cache.retrieve on a miss when passed as the default
+MISSING = object()
+
+
 class Cache:
 
 	"""Caches scores to prevent the need for many database requests.
@@ -20,18 +115,106 @@ class Cache:
 	Store is an outer dict, keyed by player_id as int. Value is another dict.
 	Inner dict contains scores keyed by match id as int. Also contains a key -1,
 	which corresponds to the total score. If the value corresponding to -1 is None,
-	total score should be recalculated and stored.
+	total score should be recalculated and stored. A score or total of 0 is a
+	real cached value; misses are detected with contains() or the MISSING
+	sentinel, never by truthiness.
+
+	The cache is bounded by max_entries cached game scores and by an estimate of
+	max_bytes of memory. When either budget is exceeded, whole players are
+	evicted in least recently used order; evicting single games would leave
+	totals that silently miss them. Hits, misses and evictions are counted and
+	reported by stats().
+
+	Every cached score belongs to the scoring profile version in version. Moving
+	the cache to another version with set_version drops every score, and update
+	ignores scores computed for any other version.
 	"""
 	
-	def __init__(self):
-		self._store = dict()
+	def __init__(self, max_entries: int = 100_000, max_bytes: int = 32 * 2**20):
+		self.max_entries = max_entries
+		self.max_bytes = max_bytes
+		self._store = OrderedDict()
+		self._sizes = dict()
+		self._entries = 0
+		self._bytes = 0
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+		self.version = None
+
+	def set_version(self, version):
+		"""Key the cache to a scoring profile version, dropping scores of any other version.
+
+		Args:
+		    version (int): id of the scoring profile version scores are computed with
+		"""
+		if version == self.version:
+			return
+		self.version = version
+		self._store.clear()
+		self._sizes.clear()
+		self._entries = 0
+		self._bytes = 0
+
+	def invalidate(self, player_ids=None):
+		"""Invalidate cached totals so they are recalculated on next retrieval.
+		
+		Args:
+		    player_ids (Iterable[int], optional): players to invalidate, defaults to every player
+		"""
+		if player_ids is None:
+			player_ids = self._store.keys()
+		for player in player_ids:
+			scores = self._store.get(player)
+			if scores is not None:
+				self._set(player, scores, -1, None)
+
+	def forget(self, player_ids):
+		"""Drop every cached score of some players, e.g. after some of their results
+		were deleted. They are reloaded the next time they are viewed.
+
+		Args:
+		    player_ids (Iterable[int]): players to drop
+		"""
+		for player_id in player_ids:
+			if self._store.pop(player_id, None) is not None:
+				entries, size = self._sizes.pop(player_id)
+				self._entries -= entries
+				self._bytes -= size
+
+	def update(self, new_scores: dict, version=None) -> int:
+		"""Add newly uploaded game scores, keeping cached totals current.
+		Costs O(affected players): each current total is adjusted by the new
+		games instead of being recalculated.
 
-	def invalidate(self):
-		"""Invalidate the cache. Remove all total scores.
+		Players that are not cached yet are skipped. Their full history is
+		loaded the first time they are viewed, so caching a single new game
+		would only hide the older ones.
+		
+		Args:
+		    new_scores (dict): scores keyed by player id, then game id
+		    version (int, optional): scoring profile version the scores were computed
+		    	with. Scores of a version other than the cache's are ignored.
+		
+		Returns:
+		    int: number of cached players that were updated
 		"""
-		for player in self._store.keys():
-			scores = self._store[player]
-			scores[-1] = None
+		if version != self.version:
+			return 0
+		updated = 0
+		for player_id, games in new_scores.items():
+			scores = self._store.get(player_id)
+			if scores is None:
+				continue
+			total = scores[-1]
+			for key, value in games.items():
+				if total is not None:
+					total += value - scores.get(key, 0)
+				self._set(player_id, scores, key, value)
+			self._set(player_id, scores, -1, None if total is None else round(total, 1))
+			updated += 1
+		self._evict()
+		return updated
 
 	def store(self, player_id: int, key: int, value):
 		"""Store a key and value in a player's store. Create the player's store
@@ -43,28 +226,54 @@ class Cache:
 		    value (int): the value to store
 		"""
 		if not player_id in self._store:
-			self._store[player_id] = {-1 : None}
-		self._store[player_id][key] = value
-		self._store[player_id][-1] = None
+			self._store[player_id] = dict()
+			self._sizes[player_id] = (0, sys.getsizeof(self._store[player_id]))
+			self._bytes += self._sizes[player_id][1]
+		self._store.move_to_end(player_id)
+		scores = self._store[player_id]
+		self._set(player_id, scores, key, value)
+		self._set(player_id, scores, -1, None)
+		self._evict()
+
+	def contains(self, player_id: int, key: int) -> bool:
+		"""Check whether a value is cached for a player and key.
+		Use this, not the truthiness of a retrieved value, to detect a miss:
+		a cached score of 0.0 is a hit.
+		
+		Args:
+		    player_id (int): the player id to use when searching store
+		    key (int): the key to look for
+		
+		Returns:
+		    bool: True if a value is cached, even if that value is 0
+		"""
+		return self.retrieve(player_id, key, MISSING) is not MISSING
 
-	def retrieve(self, player_id: int, key: int = None):
+	def retrieve(self, player_id: int, key: int = None, default=None):
 		"""Retrieve a specific value or all values associated with a player id.
 		
 		Args:
 		    player_id (int): the player id to use when searching store
 		    key (int, optional): the key to retrieve a specific value
+		    default (optional): returned on a miss. Pass MISSING to tell a miss
+		    	apart from any cached value.
 		
 		Returns:
 		    int/dict: either a specific value if a key is provided, or the entire store dict associated
 		    	with the player id
 		"""
 		if not player_id in self._store:
-			return None
-		elif key and key in self._store[player_id]:
+			self.misses += 1
+			return default
+		self._store.move_to_end(player_id)
+		if key is not None and key in self._store[player_id]:
+			self.hits += 1
 			return self._store[player_id][key]
-		elif key:
-			return None
+		elif key is not None:
+			self.misses += 1
+			return default
 		else:
+			self.hits += 1
 			return self._store[player_id].copy()
 
 	def retrieve_total(self, player_id: int):
@@ -78,73 +287,425 @@ class Cache:
 		    int: total of all values for the specified player id
 		"""
 		if not player_id in self._store:
+			self.misses += 1
 			return 0
 
+		self._store.move_to_end(player_id)
 		rv = self._store[player_id][-1]
-		if not rv:
+		if rv is None:
 			# total is not current, so perform calculation
+			self.misses += 1
 			rv = 0
 			for k,v in self._store[player_id].items():
 				if k == -1:
 					continue
 				rv += v
-			self._store[player_id][-1] = round(rv, 1)
+			self._set(player_id, self._store[player_id], -1, round(rv, 1))
+		else:
+			self.hits += 1
 		return round(rv, 1)
 
+	def stats(self) -> dict:
+		"""Report the cache's size against its budgets and its counters.
+
+		Returns:
+		    dict: players, entries, bytes, max_entries, max_bytes, hits, misses,
+		    	evictions and hit_rate
+		"""
+		lookups = self.hits + self.misses
+		return {
+			"players": len(self._store),
+			"entries": self._entries,
+			"bytes": self._bytes,
+			"max_entries": self.max_entries,
+			"max_bytes": self.max_bytes,
+			"hits": self.hits,
+			"misses": self.misses,
+			"evictions": self.evictions,
+			"hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+		}
+
+	def __str__(self) -> str:
+		stats = self.stats()
+		return (
+			f"score cache: {stats['players']} players, "
+			f"{stats['entries']}/{stats['max_entries']} entries, "
+			f"{stats['bytes'] / 2**20:.1f}/{stats['max_bytes'] / 2**20:.1f} MiB, "
+			f"{stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.1%} hit rate), "
+			f"{stats['evictions']} evictions"
+		)
+
+	def _set(self, player_id: int, scores: dict, key: int, value):
+		"""Set one value in a player's store, adjusting the entries and estimated
+		bytes held for the player by what changed instead of recounting them.
+		"""
+		container = sys.getsizeof(scores)
+		old = scores.get(key, MISSING)
+		scores[key] = value
+		size = sys.getsizeof(scores) - container + sys.getsizeof(value)
+		if old is MISSING:
+			size += sys.getsizeof(key)
+			added = 0 if key == -1 else 1
+		else:
+			size -= sys.getsizeof(old)
+			added = 0
+		entries, held = self._sizes[player_id]
+		self._sizes[player_id] = (entries + added, held + size)
+		self._entries += added
+		self._bytes += size
+
+	def _evict(self):
+		"""Evict least recently used players until both budgets are met.
+		The most recently used player is always kept.
+		"""
+		while len(self._store) > 1 and (self._entries > self.max_entries or self._bytes > self.max_bytes):
+			player_id, _ = self._store.popitem(last=False)
+			entries, size = self._sizes.pop(player_id)
+			self._entries -= entries
+			self._bytes -= size
+			self.evictions += 1
+
 
 class PointCalculator:
 
 	@staticmethod
-	def get_scoring_info():
+	def get_scoring_info(profile: ScoringProfile = None):
 		"""
 		print storing info.
 		similar to __str__ or __repr__ but static
 		"""
 		rv = "Scoring info:\n"
-		line = "ACS"
-		rv += line + add_spaces(line, 20) + str(ACS) + "\n"
-		line = "KILLS" 
-		rv += line + add_spaces(line, 20) + str(KILLS) + "\n"
-		line = "DEATHS"
-		rv += line + add_spaces(line, 20) + str(DEATHS) + "\n"
-		line = "ASSISTS"
-		rv += line + add_spaces(line, 20) + str(ASSISTS) + "\n"
-		line = "KILLS2"
-		rv += line + add_spaces(line, 20) + str(KILLS2) + "\n"
-		line = "KILLS3"
-		rv += line + add_spaces(line, 20) + str(KILLS3) + "\n"
-		line = "KILLS4"
-		rv += line + add_spaces(line, 20) + str(KILLS4) + "\n"
-		line = "KILLS5"
-		rv += line + add_spaces(line, 20) + str(KILLS5) + "\n"
-		line = "CLUTCH_V2"
-		rv += line + add_spaces(line, 20) + str(CLUTCH_V2) + "\n"
-		line = "CLUTCH_V3"
-		rv += line + add_spaces(line, 20) + str(CLUTCH_V3) + "\n"
-		line = "CLUTCH_V4"
-		rv += line + add_spaces(line, 20) + str(CLUTCH_V4) + "\n"
-		line = "CLUTCH_V5"
-		rv += line + add_spaces(line, 20) + str(CLUTCH_V5)
-		return rv
+		if profile is not None:
+			line = "PROFILE"
+			rv += line + add_spaces(line, 20) + str(profile) + "\n"
+		lines = list()
+		for name, weight in zip(WEIGHT_NAMES, profile_weights(profile)):
+			line = name.upper()
+			lines.append(line + add_spaces(line, 20) + f"{weight:g}")
+		return rv + "\n".join(lines)
 
 	@staticmethod
-	def score(player_stats: Result):
+	def score(player_stats: Result, profile: ScoringProfile = None):
 		"""
 		player_stats retrieved from results table:
 		(id, map, game_id, match_id, event_id, player_id, player_acs, player_kills, player_deaths, player_assists,
 		player_2k, player_3k, player_4k, player_5k,
 		player_clutch_v2, player_clutch_v3, player_clutch_v4, player_clutch_v5)
+		scored with the weights of profile, or the module weights if it is None
 		"""
-		rv = player_stats.player_acs * ACS
-		rv += player_stats.player_kills * KILLS
-		rv += player_stats.player_deaths * DEATHS
-		rv += player_stats.player_assists * ASSISTS
-		rv += player_stats.player_2k * KILLS2
-		rv += player_stats.player_3k * KILLS3
-		rv += player_stats.player_4k * KILLS4
-		rv += player_stats.player_5k * KILLS5
-		rv += player_stats.player_clutch_v2 * CLUTCH_V2
-		rv += player_stats.player_clutch_v3 * CLUTCH_V3
-		rv += player_stats.player_clutch_v4 * CLUTCH_V4
-		rv += player_stats.player_clutch_v5 * CLUTCH_V5
-		return round(rv, 1)
+		weights = profile_weights(profile)
+		stats = _stat_getter(player_stats)
+		rv = stats[0] * weights[0]
+		for stat, weight in zip(stats[1:], weights[1:]):
+			rv += stat * weight
+		return round_points(rv)
+
+	@staticmethod
+	def selected_profile(session):
+		"""Retrieve the scoring profile version the league has selected.
+		If there is none, the newest version of the default profile is selected,
+		and created from the module weights if it does not exist.
+		Caller is responsible for committing.
+
+		Args:
+		    session (Session): session to query with
+
+		Returns:
+		    ScoringProfile: the selected profile version
+		"""
+		profile = session.scalars(select(ScoringProfile).where(ScoringProfile.selected)).first()
+		if profile is None:
+			profile = PointCalculator._latest_profile(session, DEFAULT_PROFILE)
+			if profile is None:
+				profile = ScoringProfile(name=DEFAULT_PROFILE, version=1, **dict(zip(WEIGHT_NAMES, profile_weights())))
+				session.add(profile)
+			profile.selected = True
+			session.flush()
+		return profile
+
+	@staticmethod
+	def live_profiles(session):
+		"""Retrieve every profile version whose materialized scores must follow new results:
+		the one commands read from and the selected one, if it is still being computed.
+		Caller is responsible for committing.
+
+		Args:
+		    session (Session): session to query with
+
+		Returns:
+		    list: ScoringProfile versions, the selected one included
+		"""
+		profiles = list(session.scalars(select(ScoringProfile).where(ScoringProfile.selected | ScoringProfile.ready)))
+		if not any(profile.selected for profile in profiles):
+			profiles.append(PointCalculator.selected_profile(session))
+		return profiles
+
+	@staticmethod
+	def select_profile(session, name: str):
+		"""Select the newest version of a named scoring profile for the league.
+		A name that does not exist yet starts as a copy of the selected weights.
+		Caller is responsible for committing and for recomputing its scores.
+
+		Args:
+		    session (Session): session to write with
+		    name (str): profile to select
+
+		Returns:
+		    ScoringProfile: the newly selected profile version
+		"""
+		current = PointCalculator.selected_profile(session)
+		profile = PointCalculator._latest_profile(session, name)
+		if profile is None:
+			profile = ScoringProfile(name=name, version=1, **dict(zip(WEIGHT_NAMES, profile_weights(current))))
+			session.add(profile)
+		current.selected = False
+		profile.selected = True
+		session.flush()
+		return profile
+
+	@staticmethod
+	def revise_profile(session, **weights):
+		"""Select a new version of the selected profile with some weights changed.
+		Earlier versions are kept unchanged, so scores keyed by them stay correct.
+		Caller is responsible for committing and for recomputing its scores.
+
+		Args:
+		    session (Session): session to write with
+		    **weights: new weights keyed by WEIGHT_NAMES name
+
+		Returns:
+		    ScoringProfile: the newly selected profile version
+
+		Raises:
+		    ValueError: a weight name is not one of WEIGHT_NAMES
+		"""
+		unknown = set(weights) - set(WEIGHT_NAMES)
+		if unknown:
+			raise ValueError(f"unknown weight(s): {', '.join(sorted(unknown))}")
+		current = PointCalculator.selected_profile(session)
+		latest = PointCalculator._latest_profile(session, current.name)
+		values = dict(zip(WEIGHT_NAMES, profile_weights(current)))
+		values.update(weights)
+		profile = ScoringProfile(name=current.name, version=latest.version + 1, **values)
+		current.selected = False
+		profile.selected = True
+		session.add(profile)
+		session.flush()
+		return profile
+
+	@staticmethod
+	def _latest_profile(session, name: str):
+		"""Newest version of a named profile, or None.
+		"""
+		stmt = select(ScoringProfile).where(ScoringProfile.name == name).order_by(ScoringProfile.version.desc()).limit(1)
+		return session.scalars(stmt).first()
+
+	@staticmethod
+	def record_scores(session, new_scores, profile: ScoringProfile = None):
+		"""Materialize the points of newly added results and fold them into the running totals.
+		Caller is responsible for committing, in the same transaction as the results.
+
+		Args:
+		    session (Session): session to write with
+		    new_scores (dict): points keyed by player id then game id, as returned by ingest.store_match
+		    profile (ScoringProfile, optional): profile version the points were computed
+		    	with, defaults to the selected one
+
+		Returns:
+		    int: number of player_scores rows written
+		"""
+		if profile is None:
+			profile = PointCalculator.selected_profile(session)
+		profile_id = profile.id
+		rows = [
+			{"profile_id": profile_id, "player_id": player_id, "game_id": game_id, "points": float(points)}
+			for player_id, games in new_scores.items() for game_id, points in games.items()
+		]
+		if not rows:
+			return 0
+		session.execute(insert(PlayerScore), rows)
+
+		existing = set(session.scalars(
+			select(PlayerTotal.player_id).where(PlayerTotal.profile_id == profile_id, PlayerTotal.player_id.in_(new_scores))
+		))
+		added = {player_id: (math.fsum(games.values()), len(games)) for player_id, games in new_scores.items() if games}
+		updates = [
+			{"b_player_id": player_id, "b_points": points, "b_games": games}
+			for player_id, (points, games) in added.items() if player_id in existing
+		]
+		if updates:
+			session.execute(
+				update(PlayerTotal.__table__)
+				.where(PlayerTotal.profile_id == profile_id, PlayerTotal.player_id == bindparam("b_player_id"))
+				.values(points=PlayerTotal.points + bindparam("b_points"), games=PlayerTotal.games + bindparam("b_games")),
+				updates,
+			)
+		missing = [
+			{"profile_id": profile_id, "player_id": player_id, "points": points, "games": games}
+			for player_id, (points, games) in added.items() if player_id not in existing
+		]
+		if missing:
+			session.execute(insert(PlayerTotal), missing)
+		session.expire_all()
+		return len(rows)
+
+	@staticmethod
+	def rebuild_scores(session, profile: ScoringProfile = None, player_ids=None):
+		"""Recompute a profile version's player_scores and player_totals from the results table.
+		Caller is responsible for committing.
+
+		Args:
+		    session (Session): session to write with
+		    profile (ScoringProfile, optional): profile version to score with,
+		    	defaults to the selected one
+		    player_ids (Iterable[int], optional): players to recompute, defaults to every player
+
+		Returns:
+		    int: number of player_scores rows written
+		"""
+		if profile is None:
+			profile = PointCalculator.selected_profile(session)
+		profile_id = profile.id
+		weights = profile_weights(profile)
+		scores_criteria = [PlayerScore.profile_id == profile_id]
+		totals_criteria = [PlayerTotal.profile_id == profile_id]
+		results_criteria = list()
+		if player_ids is not None:
+			player_ids = list(player_ids)
+			scores_criteria.append(PlayerScore.player_id.in_(player_ids))
+			totals_criteria.append(PlayerTotal.player_id.in_(player_ids))
+			results_criteria.append(Result.player_id.in_(player_ids))
+
+		session.execute(delete(PlayerTotal).where(*totals_criteria))
+		session.execute(delete(PlayerScore).where(*scores_criteria))
+		rows = session.execute(
+			select(Result.player_id, Result.game_id, *(column for column, _ in WEIGHTS)).where(*results_criteria)
+		).all()
+		if rows:
+			points = PointCalculator._score_block(PointCalculator.stats_block(rows), weights)
+			session.execute(insert(PlayerScore), [
+				{"profile_id": profile_id, "player_id": row.player_id, "game_id": row.game_id, "points": row_points}
+				for row, row_points in zip(rows, points.tolist())
+			])
+			session.execute(insert(PlayerTotal).from_select(
+				["profile_id", "player_id", "points", "games"],
+				select(PlayerScore.profile_id, PlayerScore.player_id, func.sum(PlayerScore.points), func.count())
+				.where(*scores_criteria)
+				.group_by(PlayerScore.profile_id, PlayerScore.player_id),
+			))
+		session.expire_all()
+		return len(rows)
+
+	@staticmethod
+	def ensure_scores(session, profile: ScoringProfile = None):
+		"""Rebuild a profile version's materialized scores if they do not cover the results table,
+		e.g. on first start after the tables were added or after results were edited by hand.
+		The profile is marked ready afterwards. Caller is responsible for committing.
+
+		Args:
+		    session (Session): session to check and write with
+		    profile (ScoringProfile, optional): profile version to check,
+		    	defaults to the selected one
+
+		Returns:
+		    bool: True if the scores were rebuilt
+		"""
+		if profile is None:
+			profile = PointCalculator.selected_profile(session)
+		results = session.scalar(select(func.count()).select_from(Result))
+		scores = session.scalar(select(func.count()).select_from(PlayerScore).where(PlayerScore.profile_id == profile.id))
+		rebuilt = results != scores
+		if rebuilt:
+			PointCalculator.rebuild_scores(session, profile)
+		profile.ready = True
+		session.flush()
+		return rebuilt
+
+	@staticmethod
+	def prune_scores(session, keep: ScoringProfile):
+		"""Drop the materialized scores of every profile version except one.
+		Caller is responsible for committing.
+
+		Args:
+		    session (Session): session to write with
+		    keep (ScoringProfile): profile version whose scores commands read
+		"""
+		session.execute(delete(PlayerTotal).where(PlayerTotal.profile_id != keep.id))
+		session.execute(delete(PlayerScore).where(PlayerScore.profile_id != keep.id))
+		session.execute(update(ScoringProfile).where(ScoringProfile.id != keep.id).values(ready=False))
+		session.expire_all()
+
+	@staticmethod
+	def stored_totals(session, *criteria, profile: ScoringProfile = None):
+		"""Read each player's total points from the materialized player_totals table.
+
+		Args:
+		    session (Session): session to query with
+		    *criteria: optional WHERE criteria on PlayerTotal
+		    profile (ScoringProfile, optional): profile version to read,
+		    	defaults to the selected one
+
+		Returns:
+		    dict: total points keyed by player id, rounded to one decimal. Players
+		    	without results are absent.
+		"""
+		if profile is None:
+			profile_id = select(ScoringProfile.id).where(ScoringProfile.selected).scalar_subquery()
+		else:
+			profile_id = profile.id
+		rows = session.execute(
+			select(PlayerTotal.player_id, PlayerTotal.points).where(PlayerTotal.profile_id == profile_id, *criteria)
+		)
+		return {player_id: round(points, 1) for player_id, points in rows}
+
+	@staticmethod
+	def stats_block(results) -> np.ndarray:
+		"""Pack results into a columnar stats block for score_batch.
+
+		Args:
+		    results (Iterable): db.Result objects, or rows with the STAT_COLUMNS attributes
+
+		Returns:
+		    np.ndarray: float64 array of shape (len(results), len(STAT_COLUMNS))
+		"""
+		rows = list(map(_stat_getter, results))
+		return np.array(rows, dtype=np.float64).reshape(len(rows), len(STAT_COLUMNS))
+
+	@staticmethod
+	def score_batch(stats, profile: ScoringProfile = None) -> np.ndarray:
+		"""Score a block of results in one pass, equal to score() on each row.
+
+		The weighted sum accumulates column by column in the same order as
+		score(), so every row sees the same floating point operations and rounds
+		to exactly the same value.
+
+		Args:
+		    stats (np.ndarray | dict): array of shape (n, len(STAT_COLUMNS)) in
+		    	STAT_COLUMNS order, or a dict of equal length columns keyed by
+		    	STAT_COLUMNS name
+		    profile (ScoringProfile, optional): profile version to score with
+
+		Returns:
+		    np.ndarray: float64 array of n scores
+
+		Raises:
+		    ValueError: stats does not have one column per scored stat
+		"""
+		return PointCalculator._score_block(stats, profile_weights(profile))
+
+	@staticmethod
+	def _score_block(stats, weights) -> np.ndarray:
+		"""score_batch with the weights already resolved.
+		"""
+		if isinstance(stats, dict):
+			columns = [np.asarray(stats[key], dtype=np.float64) for key in STAT_COLUMNS]
+		else:
+			stats = np.asarray(stats, dtype=np.float64)
+			if stats.ndim != 2 or stats.shape[1] != len(WEIGHTS):
+				raise ValueError(f"expected a stats block of shape (n, {len(WEIGHTS)}), got {stats.shape}")
+			columns = stats.T
+
+		rv = columns[0] * weights[0]
+		for column, weight in zip(columns[1:], weights[1:]):
+			rv = rv + column * weight
+		return round_points_array(rv)
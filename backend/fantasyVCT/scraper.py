@@ -1,19 +1,124 @@
 
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import fantasyVCT.database as db
+from fantasyVCT.fetch import Fetcher, HEADERS, REQUEST_TIMEOUT
+from fantasyVCT.http_cache import ResponseCache, OfflineCacheMiss
+from fantasyVCT.ratelimit import RateLimiter
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import requests
 
 vlr_performance = "https://vlr.gg/{}/?game=all&tab=performance"
 vlr_summary = "https://vlr.gg/{}/?game=all"
 
-_HEADERS = {
-    "User-Agent": (
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/120.0.0.0 Safari/537.36"
-    )
-}
+# shared session so blocking callers still get connection reuse
+_session = requests.Session()
+_session.headers.update(HEADERS)
+_cache = None
+_limiter = None
+
+# BeautifulSoup tree builders, fastest first. lxml is C-backed; html.parser is
+# pure Python and always available.
+PARSER_BACKENDS = ("lxml", "html.parser")
+
+
+def _backend_available(name: str) -> bool:
+	if name == "lxml":
+		try:
+			import lxml
+		except ImportError:
+			return False
+	return True
+
+
+_parser = next(name for name in PARSER_BACKENDS if _backend_available(name))
+
+
+def get_parser() -> str:
+	"""Return the name of the html parser backend in use.
+	"""
+	return _parser
+
+
+def set_parser(name: str):
+	"""Select the html parser backend used for every page.
+	
+	Args:
+	    name (str): one of PARSER_BACKENDS
+	
+	Raises:
+	    ValueError: name is not a known backend, or its library is not installed
+	"""
+	global _parser
+	if name not in PARSER_BACKENDS:
+		raise ValueError(f"Unknown parser backend {name}, expected one of {PARSER_BACKENDS}")
+	if not _backend_available(name):
+		raise ValueError(f"Parser backend {name} is not installed")
+	_parser = name
+
+
+# match pages are only ever read through their vm-stats-game blocks, so the rest
+# of the page (nav, sidebar, comments, ads) is never built into the tree
+def _is_stats_game(css_class) -> bool:
+	# match the class token, so blocks with extra classes (mod-active) are kept
+	return css_class is not None and "vm-stats-game" in css_class.split()
+
+
+MATCH_STRAINER = SoupStrainer("div", class_=_is_stats_game)
+
+
+def set_response_cache(cache: ResponseCache):
+	"""Attach an on-disk response cache to blocking page fetches.
+	
+	Args:
+	    cache (ResponseCache): cache to use, or None to always hit the network
+	"""
+	global _cache
+	_cache = cache
+
+
+def set_rate_limiter(limiter: RateLimiter):
+	"""Attach a rate limiter to blocking page fetches.
+	
+	Args:
+	    limiter (RateLimiter): limiter to share with the async Fetcher, or None to send immediately
+	"""
+	global _limiter
+	_limiter = limiter
+
+
+def make_soup(html: str, parse_only: SoupStrainer = None) -> BeautifulSoup:
+	"""Build a BeautifulSoup tree from html using the selected parser backend.
+	
+	Args:
+	    html (str): page to parse
+	    parse_only (SoupStrainer, optional): only build the matching subtrees
+	
+	Returns:
+	    BeautifulSoup: parsed page
+	"""
+	return BeautifulSoup(html, _parser, parse_only=parse_only)
+
+
+def make_match_soup(html: str) -> BeautifulSoup:
+	"""Build a tree of just the vm-stats-game blocks of a match page.
+
+	Everything before the first block is cut off before parsing so the
+	tokenizer never sees it, and the strainer drops the rest.
+	
+	Args:
+	    html (str): match page to parse
+	
+	Returns:
+	    BeautifulSoup: parsed vm-stats-game blocks
+	"""
+	start = html.find('class="vm-stats-game')
+	if start != -1:
+		html = html[html.rfind('<', 0, start):]
+	return make_soup(html, MATCH_STRAINER)
 
 
 def getNthDiv(soup, n):
@@ -32,24 +137,68 @@ def getNthDiv(soup, n):
 class Scraper:
 
 	"""Scrapes and parses a vlr.gg match page.
+
+	The static methods fetch pages with a blocking request. The ``*_async``
+	methods fetch through the shared Fetcher and parse in a worker thread, so
+	they can be awaited from the bot's event loop.
 	"""
 
+	def __init__(self, fetcher: Fetcher = None):
+		self.fetcher = fetcher if fetcher else Fetcher()
+
 	@staticmethod
-	def scrape_url(url: str):
+	def scrape_url(url: str, parse_only: SoupStrainer = None):
 		"""Retrieve match information from a vlr.gg url as html.
 		
 		Args:
 		    url (str): vlr.gg url as a string
+		    parse_only (SoupStrainer, optional): only build the matching subtrees
 
 		Returns:
 			BeautifulSoup: Match information scraped from url
 		"""
-		req = requests.get(url, headers=_HEADERS)
-		req.raise_for_status()
-		soup = BeautifulSoup(req.text, "html.parser")
+		soup = make_soup(Scraper._get_text(url), parse_only)
 
 		return soup
 
+	@staticmethod
+	def _get_text(url: str) -> str:
+		"""Retrieve the body of a url as text with a blocking request.
+		"""
+		entry = _cache.get(url) if _cache else None
+		if entry is not None and _cache.is_fresh(entry):
+			return entry.body
+		if _cache and _cache.offline:
+			raise OfflineCacheMiss(url)
+
+		headers = entry.validators() if entry is not None else None
+		attempt = 0
+		while True:
+			if _limiter:
+				_limiter.acquire_sync(url)
+			try:
+				req = _session.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+			except (requests.ConnectionError, requests.Timeout):
+				delay = _limiter.retry_delay(attempt) if _limiter else None
+				if delay is None:
+					raise
+			else:
+				if req.status_code == 304 and entry is not None:
+					_cache.refresh(entry)
+					return entry.body
+				delay = None
+				if req.status_code >= 400 and _limiter:
+					delay = _limiter.retry_delay(attempt, req.status_code, req.headers.get("Retry-After"))
+				if delay is None:
+					req.raise_for_status()
+					break
+			attempt += 1
+			time.sleep(delay)
+
+		if _cache:
+			_cache.put(url, req.text, req.headers.get("ETag"), req.headers.get("Last-Modified"))
+		return req.text
+
 	@staticmethod
 	def _parse_player_summary(html, player):
 		"""Parse an html object for player information, assuming summary tab.
@@ -223,13 +372,15 @@ class Scraper:
 		return map_
 
 	@staticmethod
-	def _parse_match_summary(match: db.Match):
+	def _parse_match_summary(match: db.Match, soup=None):
 		"""Parse a vlr.gg match page's summary tab.
 		
 		Args:
 		    match (db.Match): db.Match object to place data in
+		    soup (BeautifulSoup, optional): summary page, scraped if not provided
 		"""
-		soup = Scraper.scrape_url(vlr_summary.format(match.match_id))
+		if soup is None:
+			soup = Scraper.scrape_url(vlr_summary.format(match.match_id), MATCH_STRAINER)
 		maps = soup.find_all("div", {"class": "vm-stats-game"})
 
 		for map_div in maps:
@@ -245,13 +396,15 @@ class Scraper:
 			Scraper._parse_map_summary(map_div, map_)
 
 	@staticmethod
-	def _parse_match_performance(match: db.Match):
+	def _parse_match_performance(match: db.Match, soup=None):
 		"""Parse a vlr.gg match page's performance tab.
 		
 		Args:
 			match (db.Match): db.Match object to place data in
+			soup (BeautifulSoup, optional): performance page, scraped if not provided
 		"""
-		soup = Scraper.scrape_url(vlr_performance.format(match.match_id))
+		if soup is None:
+			soup = Scraper.scrape_url(vlr_performance.format(match.match_id), MATCH_STRAINER)
 		maps = soup.find_all('div', {'class': 'vm-stats-game'})
 
 		for map_div in maps:
@@ -274,7 +427,32 @@ class Scraper:
 				player.results[0].game_id = game_id
 				player.results[0].map = map_.name
 
+	@staticmethod
+	def _check_match_id(match_id):
+		"""Raise ValueError if match_id is not parseable as an int.
+		"""
+		try:
+			int(match_id)
+		except:
+			raise ValueError("Match ID must be parseable as an int")
+
+	@staticmethod
+	def _build_match(match_id, summary_html: str, performance_html: str) -> db.Match:
+		"""Parse the raw html of both match tabs into a db.Match.
+		
+		Args:
+		    match_id (str): id of the vlr.gg match
+		    summary_html (str): html of the summary tab
+		    performance_html (str): html of the performance tab
 		
+		Returns:
+		    db.Match: all match data parsed
+		"""
+		match = db.Match(match_id=match_id)
+		Scraper._parse_match_summary(match, make_match_soup(summary_html))
+		Scraper._parse_match_performance(match, make_match_soup(performance_html))
+		return match
+
 	@staticmethod
 	def parse_match(match_id: str) -> db.Match:
 		"""Parse a vlr.gg match.
@@ -289,21 +467,92 @@ class Scraper:
 		    ValueError: match_id is not parseable as an int
 		"""
 		# sanitize input
-		try:
-			match_id_int = int(match_id)
-		except:
-			raise ValueError("Match ID must be parseable as an int")
+		Scraper._check_match_id(match_id)
 
-		match = db.Match(match_id=match_id)
-		Scraper._parse_match_summary(match)
-		Scraper._parse_match_performance(match)
-		return match
+		# download both tabs at the same time, then merge them in order
+		with ThreadPoolExecutor(max_workers=2) as pool:
+			summary = pool.submit(Scraper._get_text, vlr_summary.format(match_id))
+			performance = pool.submit(Scraper._get_text, vlr_performance.format(match_id))
+			summary_html, performance_html = summary.result(), performance.result()
+
+		return Scraper._build_match(match_id, summary_html, performance_html)
+
+	async def parse_match_async(self, match_id: str) -> db.Match:
+		"""Parse a vlr.gg match without blocking the event loop.
+		
+		Args:
+		    match_id (str): id of the vlr.gg match to parse
+		
+		Returns:
+		    db.Match: all match data parsed
+		
+		Raises:
+		    ValueError: match_id is not parseable as an int
+		"""
+		# sanitize input
+		Scraper._check_match_id(match_id)
+
+		summary_html, performance_html = await self.fetch_match_pages(match_id)
+		return await asyncio.to_thread(Scraper._build_match, match_id, summary_html, performance_html)
+
+	async def fetch_match_pages(self, match_id: str):
+		"""Download the summary and performance tabs of a vlr.gg match at the same time.
+		
+		Args:
+		    match_id (str): id of the vlr.gg match
+		
+		Returns:
+		    tuple: summary tab html, performance tab html
+		"""
+		return tuple(await asyncio.gather(
+			self.fetcher.fetch_text(vlr_summary.format(match_id)),
+			self.fetcher.fetch_text(vlr_performance.format(match_id)),
+		))
+
+	async def parse_matches(self, match_ids, workers: int = 4, return_exceptions: bool = False):
+		"""Parse many vlr.gg matches through a bounded pool of workers.
+		
+		Args:
+		    match_ids (iterable): ids of the vlr.gg matches to parse
+		    workers (int, optional): number of matches in flight at once
+		    return_exceptions (bool, optional): place a failed match's exception in
+		    	the results instead of raising it
+		
+		Returns:
+		    list: a db.Match (or exception) per match id, in the order given
+		"""
+		match_ids = list(match_ids)
+		results = [None] * len(match_ids)
+		queue = asyncio.Queue()
+		for item in enumerate(match_ids):
+			queue.put_nowait(item)
+
+		async def worker():
+			while not queue.empty():
+				i, match_id = queue.get_nowait()
+				try:
+					results[i] = await self.parse_match_async(match_id)
+				except Exception as e:
+					results[i] = e
+
+		await asyncio.gather(*(worker() for _ in range(max(1, min(workers, len(match_ids))))))
+
+		if not return_exceptions:
+			for rv in results:
+				if isinstance(rv, Exception):
+					raise rv
+		return results
 
 	@staticmethod
-	def parse_team(url: str):
-		"""Parse a vlr.gg team page.
+	def _parse_team_page(html):
+		"""Parse a vlr.gg team page for the team's name, abbreviation and roster.
+		
+		Args:
+		    html (BeautifulSoup): team page to parse
+		
+		Returns:
+		    tuple: team name, team abbreviation, list of player names
 		"""
-		html = Scraper.scrape_url(url)
 		header = html.body.find('div', {'class': 'team-header'})
 		body = html.body.find('div', {'class': 'team-summary-container-1'})
 
@@ -322,3 +571,21 @@ class Scraper:
 			player_names.append(player.find('div', {'class': 'team-roster-item-name-alias'}).get_text(strip=True))
 
 		return team_name, team_abbrev, player_names
+
+	@staticmethod
+	def _build_team(html: str):
+		"""Parse the raw html of a vlr.gg team page.
+		"""
+		return Scraper._parse_team_page(make_soup(html))
+
+	@staticmethod
+	def parse_team(url: str):
+		"""Parse a vlr.gg team page.
+		"""
+		return Scraper._parse_team_page(Scraper.scrape_url(url))
+
+	async def parse_team_async(self, url: str):
+		"""Parse a vlr.gg team page without blocking the event loop.
+		"""
+		html = await self.fetcher.fetch_text(url)
+		return await asyncio.to_thread(Scraper._build_team, html)
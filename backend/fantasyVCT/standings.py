@@ -0,0 +1,361 @@
+import threading
+from datetime import date, datetime, timedelta
+
+import fantasyVCT.database as db
+from fantasyVCT.lineup import optimal_lineup
+from fantasyVCT.transactions import rostered_points
+
+from sqlalchemy import bindparam, delete, event, insert, select, update
+
+
+def team_points(points: dict) -> float:
+	"""Points a fantasy team has earned: what each player it has rostered scored
+	while in an active slot, the captain's counting 1.2 times. Players it has
+	since dropped keep the points they earned for it.
+
+	Args:
+	    points (dict): the team's (rostered, counted) points keyed by player
+	    	id, as read by transactions.rostered_points
+
+	Returns:
+	    float: points rounded to one decimal
+	"""
+	total = 0.0
+	for _, counted in points.values():
+		total = round(total + counted, 1)
+	return total
+
+
+def team_optimal(fteam, points: dict) -> float:
+	"""Points a fantasy team would have with its current roster in its best
+	lineup for every game since it rostered them, plus what players it has since
+	dropped earned for it. Never less than the points it actually has.
+
+	Args:
+	    fteam (db.FantasyTeam): team with its roster loaded
+	    points (dict): the team's (rostered, counted) points keyed by player
+	    	id, as read by transactions.rostered_points
+
+	Returns:
+	    float: points rounded to one decimal
+	"""
+	current = {fp.player_id for fp in fteam.fantasyplayers}
+	departed = 0.0
+	for player_id, (_, counted) in points.items():
+		if player_id not in current:
+			departed = round(departed + counted, 1)
+	totals = {player_id: rostered for player_id, (rostered, _) in points.items()}
+	return max(team_points(points), round(departed + team_lineup(fteam, totals)[0], 1))
+
+
+def team_lineup(fteam, totals: dict) -> tuple:
+	"""Best lineup a fantasy team's roster could field, subs included.
+
+	Args:
+	    fteam (db.FantasyTeam): team with its roster loaded
+	    totals (dict): total points keyed by player id
+
+	Returns:
+	    tuple: (points, captain FantasyPlayer or None, list of active FantasyPlayers)
+	"""
+	return optimal_lineup((fp, totals.get(fp.player.id, 0), fp.player.team_id) for fp in fteam.fantasyplayers)
+
+
+def select_history(fantasy_team_id: int, since=None, until=None):
+	"""Select a fantasy team's points_history rows, oldest first.
+
+	Bounds are inclusive. An int bound is a vlr match id, a date bound is the
+	day the standing was recorded.
+
+	Args:
+	    fantasy_team_id (int): team to select
+	    since (int | date, optional): first match or day
+	    until (int | date, optional): last match or day
+
+	Returns:
+	    Select: select statement for db.PointsHistory
+	"""
+	stmt = select(db.PointsHistory).where(db.PointsHistory.fantasy_team_id == fantasy_team_id)
+	if isinstance(since, date):
+		stmt = stmt.where(db.PointsHistory.recorded_at >= datetime.combine(since, datetime.min.time()))
+	elif since is not None:
+		stmt = stmt.where(db.PointsHistory.match_id >= since)
+	if isinstance(until, date):
+		stmt = stmt.where(db.PointsHistory.recorded_at < datetime.combine(until + timedelta(days=1), datetime.min.time()))
+	elif until is not None:
+		stmt = stmt.where(db.PointsHistory.match_id <= until)
+	return stmt.order_by(db.PointsHistory.recorded_at, db.PointsHistory.id)
+
+
+def parse_history_bound(text: str):
+	"""Parse a !history bound: a vlr match id or a YYYY-MM-DD date.
+
+	Raises:
+	    ValueError: if text is neither
+	"""
+	if text.isdigit():
+		return int(text)
+	return date.fromisoformat(text)
+
+
+class Standings:
+	"""Snapshot of the league standings, kept in memory and in the standings table.
+
+	Each fantasy team's actual points, optimal points and rank are computed when
+	something changes them, not when they are shown: refresh recomputes the
+	given teams, players_changed the teams owning the given players. Ranks order
+	teams by optimal points, and the rendered standings are rebuilt with every
+	change, so render is a constant-time read. load restores the snapshot from
+	the standings table after a restart. When players_changed is told which
+	match changed them, the refreshed teams' standings are also appended to
+	points_history, so a team's points can be charted over the season without
+	replaying results.
+
+	Changes are computed and written in the caller's session, against a view
+	of the snapshot private to that session, and only reach the shared
+	snapshot once the session commits. A rolled back session leaves the
+	snapshot as it was. Callers are responsible for committing the sessions
+	they pass in.
+
+	Ingestion refreshes from worker threads, so every change to the shared
+	snapshot holds a lock.
+	"""
+
+	def __init__(self):
+		self._lock = threading.Lock()
+		# fantasy team id -> (abbrev, name, points, optimal)
+		self._entries = dict()
+		self._ranks = dict()
+		self._text = None
+		self.loaded = False
+
+	def load(self, session, profile=None, rebuild: bool = False):
+		"""Read the persisted snapshot, computing teams that do not have one yet.
+
+		Args:
+		    session (Session): session to read and write with
+		    profile (db.ScoringProfile, optional): profile version to score with,
+		    	defaults to the selected one
+		    rebuild (bool, optional): recompute every team, e.g. after the
+		    	materialized scores were rebuilt
+		"""
+		rows = session.execute(
+			select(
+				db.FantasyTeam.id, db.FantasyTeam.abbrev, db.FantasyTeam.name,
+				db.Standing.points, db.Standing.optimal, db.Standing.rank,
+			).outerjoin(db.Standing, db.Standing.fantasy_team_id == db.FantasyTeam.id)
+		).all()
+		# the rows were committed already, so they are applied straight away
+		with self._lock:
+			self._entries = {
+				team_id: (abbrev, name, points, optimal)
+				for team_id, abbrev, name, points, optimal, _ in rows if points is not None
+			}
+			self._ranks = {team_id: rank for team_id, _, _, points, _, rank in rows if points is not None}
+			self._text = _render(self._entries)
+			self.loaded = True
+		missing = [team_id for team_id, _, _, points, _, _ in rows if points is None]
+		if rebuild:
+			self.refresh(session, profile=profile)
+		elif missing:
+			self.refresh(session, missing, profile)
+		else:
+			self._rerank(session, self._view(session))
+
+	def refresh(self, session, fantasy_team_ids=None, profile=None):
+		"""Recompute the standing of some fantasy teams, then every team's rank.
+
+		Args:
+		    session (Session): session to read and write with
+		    fantasy_team_ids (Iterable[int], optional): teams to recompute, defaults to every team
+		    profile (db.ScoringProfile, optional): profile version to score with,
+		    	defaults to the selected one
+		"""
+		team_criteria = list()
+		standing_criteria = list()
+		if fantasy_team_ids is not None:
+			fantasy_team_ids = list(fantasy_team_ids)
+			if not fantasy_team_ids:
+				return
+			team_criteria.append(db.FantasyTeam.id.in_(fantasy_team_ids))
+			standing_criteria.append(db.Standing.fantasy_team_id.in_(fantasy_team_ids))
+
+		fteams = list(session.scalars(db.select_rosters(*team_criteria, with_results=False)))
+		points = rostered_points(session, fantasy_team_ids, profile)
+		entries = dict()
+		for fteam in fteams:
+			scores = points.get(fteam.id, dict())
+			entries[fteam.id] = (
+				fteam.abbrev, fteam.name, team_points(scores), team_optimal(fteam, scores)
+			)
+
+		view = self._view(session)
+		if fantasy_team_ids is None:
+			view.entries = dict()
+			view.ranks = dict()
+			view.replace = True
+		else:
+			for team_id in fantasy_team_ids:
+				view.entries.pop(team_id, None)
+				view.ranks.pop(team_id, None)
+			view.changed.update(fantasy_team_ids)
+		view.entries.update(entries)
+
+		# ranks are rewritten below, so new rows start unranked
+		session.execute(delete(db.Standing).where(*standing_criteria))
+		if entries:
+			session.execute(insert(db.Standing), [
+				{"fantasy_team_id": team_id, "points": points, "optimal": optimal, "rank": 0}
+				for team_id, (_, _, points, optimal) in entries.items()
+			])
+		self._rerank(session, view, entries)
+
+	def players_changed(self, session, player_ids, profile=None, match_id: int = None):
+		"""Refresh the teams that roster any of the given players.
+
+		Args:
+		    session (Session): session to read and write with
+		    player_ids (Iterable[int]): players whose points changed
+		    profile (db.ScoringProfile, optional): profile version to score with,
+		    	defaults to the selected one
+		    match_id (int, optional): vlr id of the match that changed them; each
+		    	refreshed team's new standing is appended to points_history
+
+		Returns:
+		    list: ids of the fantasy teams that were refreshed
+		"""
+		player_ids = list(player_ids)
+		if not player_ids:
+			return list()
+		team_ids = list(session.scalars(
+			select(db.FantasyPlayer.fantasy_team_id)
+			.where(db.FantasyPlayer.player_id.in_(player_ids), db.FantasyPlayer.fantasy_team_id.is_not(None))
+			.distinct()
+		))
+		self.refresh(session, team_ids, profile)
+		if match_id is not None and team_ids:
+			recorded_at = datetime.now()
+			view = self._view(session)
+			rows = [
+				{
+					"fantasy_team_id": team_id, "match_id": match_id, "recorded_at": recorded_at,
+					"points": view.entries[team_id][2], "optimal": view.entries[team_id][3],
+					"rank": view.ranks[team_id],
+				}
+				for team_id in team_ids if team_id in view.entries
+			]
+			if rows:
+				session.execute(insert(db.PointsHistory), rows)
+		return team_ids
+
+	def render(self) -> str:
+		"""The standings as sent by !standings, sorted by optimal points.
+
+		Returns:
+		    str: the formatted standings
+		"""
+		return self._text
+
+	def _view(self, session):
+		"""The snapshot as a session sees it: the shared one plus the session's
+		uncommitted changes. The first call in a transaction copies the shared
+		snapshot; the session is hooked so that the changes are applied on commit
+		and dropped on rollback.
+		"""
+		view = session.info.get(self._info_key)
+		if view is None:
+			with self._lock:
+				view = _View(self._entries, self._ranks)
+			session.info[self._info_key] = view
+			if not event.contains(session, "after_commit", self._after_commit):
+				event.listen(session, "after_commit", self._after_commit)
+				event.listen(session, "after_rollback", self._after_rollback)
+		return view
+
+	@property
+	def _info_key(self):
+		return ("standings", id(self))
+
+	def _after_commit(self, session):
+		view = session.info.pop(self._info_key, None)
+		if view is None:
+			return
+		with self._lock:
+			if view.replace:
+				self._entries = dict(view.entries)
+			else:
+				# other sessions may have committed since the view was taken, so
+				# only the teams this one changed are copied over
+				for team_id in view.changed:
+					if team_id in view.entries:
+						self._entries[team_id] = view.entries[team_id]
+					else:
+						self._entries.pop(team_id, None)
+			self._ranks = _rank(self._entries)
+			self._text = _render(self._entries)
+			self.loaded = True
+
+	def _after_rollback(self, session):
+		session.info.pop(self._info_key, None)
+
+	def _rerank(self, session, view, fresh=()):
+		"""Rank every team in a session's view by optimal points and persist the
+		ranks that changed. Teams in fresh were just inserted with no rank.
+		"""
+		ranks = _rank(view.entries)
+		changed = [
+			{"b_team_id": team_id, "b_rank": rank}
+			for team_id, rank in ranks.items() if team_id in fresh or view.ranks.get(team_id) != rank
+		]
+		view.ranks = ranks
+		if changed:
+			session.execute(
+				update(db.Standing.__table__)
+				.where(db.Standing.fantasy_team_id == bindparam("b_team_id"))
+				.values(rank=bindparam("b_rank")),
+				changed,
+			)
+
+
+class _View:
+	"""A session's copy of the standings snapshot, see Standings._view."""
+
+	def __init__(self, entries, ranks):
+		self.entries = dict(entries)
+		self.ranks = dict(ranks)
+		# teams whose entries the session changed, unless it replaced every team
+		self.changed = set()
+		self.replace = False
+
+
+def _rank(entries: dict) -> dict:
+	"""Rank teams by optimal points, 1 being first. Teams with equal optimal points share a rank.
+
+	Args:
+	    entries (dict): (abbrev, name, points, optimal) keyed by fantasy team id
+
+	Returns:
+	    dict: rank keyed by fantasy team id
+	"""
+	ordered = sorted(entries.items(), key=lambda item: (-item[1][3], item[0]))
+	ranks = dict()
+	for position, (team_id, (_, _, _, optimal)) in enumerate(ordered):
+		if position and optimal == ordered[position - 1][1][3]:
+			ranks[team_id] = ranks[ordered[position - 1][0]]
+		else:
+			ranks[team_id] = position + 1
+	return ranks
+
+
+def _render(entries: dict) -> str:
+	"""The standings as sent by !standings, sorted by optimal points."""
+	ordered = sorted(entries.items(), key=lambda item: (-item[1][3], item[0]))
+	any_suboptimal = any(optimal != points for _, (_, _, points, optimal) in ordered)
+	buf = "```\n" + "Standings\n\n"
+	for _, (abbrev, name, points, optimal) in ordered:
+		marker = "*" if optimal != points else ""
+		buf += f"\t{abbrev} / {name} - {optimal}{marker}\n"
+	if any_suboptimal:
+		buf += "\n* Optimized score shown. Use !set to improve your lineup."
+	buf += "```"
+	return buf
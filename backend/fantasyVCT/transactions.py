@@ -0,0 +1,146 @@
+from datetime import datetime
+
+import fantasyVCT.database as db
+from fantasyVCT.lineup import CAPTAIN_MULTIPLIER, ACTIVE_SLOTS
+
+from sqlalchemy import and_, func, insert, or_, select
+
+DRAFT = "draft"
+DROP = "drop"
+SET = "set"
+
+
+def log_moves(session, moves):
+	"""Append roster transactions to the log.
+
+	Every move is stamped with the highest result id stored so far, so only
+	results uploaded after it count towards the slot it puts the player in.
+
+	Args:
+	    session (Session): session to write with
+	    moves (Iterable[tuple]): (action, fantasy team id, player id, position)
+	    	tuples, position being None for drops
+	"""
+	moves = list(moves)
+	if not moves:
+		return
+	after_result_id = session.scalar(select(func.coalesce(func.max(db.Result.id), 0)))
+	created_at = datetime.now()
+	session.execute(insert(db.RosterTransaction), [
+		{
+			"fantasy_team_id": fantasy_team_id, "player_id": player_id, "action": action, "position": position,
+			"after_result_id": after_result_id, "created_at": created_at,
+		}
+		for action, fantasy_team_id, player_id, position in moves
+	])
+
+
+def backfill(session) -> int:
+	"""Log a draft for every rostered player the log has no open stint for.
+
+	Rosters built before the log existed have no transactions; they are logged
+	as drafted before the first result, so they keep every result they had.
+
+	Returns:
+	    int: number of transactions added
+	"""
+	stints = select_stints().subquery()
+	open_stints = select(stints.c.player_id).where(stints.c.end_result_id.is_(None), stints.c.position.is_not(None))
+	rows = session.execute(
+		select(db.FantasyPlayer.fantasy_team_id, db.FantasyPlayer.player_id, db.FantasyPlayer.position)
+		.where(db.FantasyPlayer.fantasy_team_id.is_not(None), db.FantasyPlayer.player_id.notin_(open_stints))
+	).all()
+	if rows:
+		created_at = datetime.now()
+		session.execute(insert(db.RosterTransaction), [
+			{
+				"fantasy_team_id": fantasy_team_id, "player_id": player_id, "action": DRAFT, "position": position,
+				"after_result_id": 0, "created_at": created_at,
+			}
+			for fantasy_team_id, player_id, position in rows
+		])
+	return len(rows)
+
+
+def select_stints(*criteria):
+	"""Select the intervals players held a roster slot, one per transaction.
+
+	A stint covers the results with ids in (start_result_id, end_result_id];
+	end_result_id is NULL while the player still holds the slot. Drops are
+	stints with no position.
+
+	Args:
+	    *criteria: optional WHERE criteria on RosterTransaction
+
+	Returns:
+	    Select: statement yielding (fantasy_team_id, player_id, position,
+	    	start_result_id, end_result_id) rows
+	"""
+	log = db.RosterTransaction
+	return select(
+		log.fantasy_team_id,
+		log.player_id,
+		log.position,
+		log.after_result_id.label("start_result_id"),
+		func.lead(log.after_result_id).over(
+			partition_by=(log.fantasy_team_id, log.player_id), order_by=log.id
+		).label("end_result_id"),
+	).where(*criteria)
+
+
+def rostered_points(session, fantasy_team_ids=None, profile=None) -> dict:
+	"""Points each player earned for each fantasy team while on its roster.
+
+	Stints are joined to the results that fall inside them and to the results'
+	materialized scores in one query, summed per stint slot.
+
+	Args:
+	    session (Session): session to query with
+	    fantasy_team_ids (Iterable[int], optional): teams to read, defaults to every team
+	    profile (db.ScoringProfile, optional): profile version to read,
+	    	defaults to the selected one
+
+	Returns:
+	    dict: for each fantasy team id, a dict of player id to a (rostered,
+	    	counted) tuple: the points the player scored in any slot, and the
+	    	points counted towards the team, from active slots with the
+	    	captain's multiplied. Both are rounded to one decimal.
+	"""
+	criteria = list()
+	if fantasy_team_ids is not None:
+		criteria.append(db.RosterTransaction.fantasy_team_id.in_(list(fantasy_team_ids)))
+	if profile is None:
+		profile_id = select(db.ScoringProfile.id).where(db.ScoringProfile.selected).scalar_subquery()
+	else:
+		profile_id = profile.id
+
+	stints = select_stints(*criteria).subquery()
+	rows = session.execute(
+		select(stints.c.fantasy_team_id, stints.c.player_id, stints.c.position, func.sum(db.PlayerScore.points))
+		.join(db.Result, and_(
+			db.Result.player_id == stints.c.player_id,
+			db.Result.id > stints.c.start_result_id,
+			or_(stints.c.end_result_id.is_(None), db.Result.id <= stints.c.end_result_id),
+		))
+		.join(db.PlayerScore, and_(
+			db.PlayerScore.profile_id == profile_id,
+			db.PlayerScore.player_id == db.Result.player_id,
+			db.PlayerScore.game_id == db.Result.game_id,
+		))
+		.where(stints.c.position.is_not(None))
+		.group_by(stints.c.fantasy_team_id, stints.c.player_id, stints.c.position)
+	)
+
+	points = dict()
+	for fantasy_team_id, player_id, position, slot_points in rows:
+		rostered, counted = points.setdefault(fantasy_team_id, dict()).get(player_id, (0, 0))
+		rostered += slot_points
+		if position == 0:
+			counted += slot_points * CAPTAIN_MULTIPLIER
+		elif position <= ACTIVE_SLOTS:
+			counted += slot_points
+		points[fantasy_team_id][player_id] = (rostered, counted)
+	return {
+		fantasy_team_id: {player_id: (round(rostered, 1), round(counted, 1)) for player_id, (rostered, counted) in players.items()}
+		for fantasy_team_id, players in points.items()
+	}
@@ -1,10 +1,9 @@
-import datetime
 import re
-import asyncio
 
 import fantasyVCT.database as db
+from fantasyVCT.names import match_names
+from fantasyVCT.query_cache import POINTS, PLAYERS
 
-import requests
 from discord.ext import tasks, commands
 from sqlalchemy import select
 
@@ -25,36 +24,12 @@ class FetchCog(commands.Cog, name="Results"):
 	# @commands.command()
 	async def update(self, ctx):
 		"""Get new match results early"""
-		# TODO out of date, vlr_api does not work, needs updating to sqlalchemy, uncomment command()
-		r = requests.get(vlr_api.format("match/results"))
-		# verify request
-		if r.status_code != 200:
-			ts = datetime.datetime.now()
-			print(ts, "- ", str(r.status_code), "status returned from vlrggapi")
-			return
-		json = r.json()
-
-		# check each game if the tournament name is registered in the event table
-		for game in json['data']['segments']:
-			event_info = self.bot.db_manager.query_events_from_name(game['tournament_name'])
-
-			# allow other tasks to run
-			await asyncio.sleep(5)
-
-			if event_info:
-				vlr_id = game['match_page'].split('/')[1]
-
-				# check that the input is valid
-				if not re.match("^[0-9]{5,6}$", vlr_id):
-					ts = datetime.datetime.now()
-					print(ts, "- ", "invalid match id ", vlr_id)
-					continue
-
-				# check that match does not exist in database
-				if self.bot.db_manager.query_results_all_from_match_id(str(vlr_id)):
-					continue
-
-				await ctx.invoke(self.bot.get_command('upload'), vlr_id)
+		# ingest imports vlr_api from this module
+		from fantasyVCT.ingest import IngestPipeline
+		written = await IngestPipeline(self.bot).run()
+		if not written:
+			return await ctx.send("No new match results.")
+		await ctx.send("Uploaded " + str(len(written)) + " new match(es): " + ", ".join(str(match_id) for match_id in written))
 
 	@commands.hybrid_command()
 	async def upload(self, ctx, vlr_id: str):
@@ -74,109 +49,28 @@ class FetchCog(commands.Cog, name="Results"):
 				return await ctx.send("This match has already been uploaded.")
 
 			# parse link
-			results_scraped = self.bot.scraper.parse_match(vlr_id)
+			results_scraped = await self.bot.scraper.parse_match_async(vlr_id)
 		
-			# verify teams and players exist in database
 			for map_scraped in results_scraped.maps:
-
 				await ctx.send("```\n" + str(map_scraped) + "\n```")
-				
-				for team_scraped in (map_scraped.team1, map_scraped.team2):
-					# check that teams exist in database
-					team = session.execute(select(db.Team).filter_by(name=team_scraped.name)).scalar_one_or_none()
-					if not team:
-						# team does not exist in database
-						team = db.Team(name=team_scraped.name, abbrev=team_scraped.abbrev)
-						session.add(team)
-						session.flush()
-					
-					for player_scraped in team_scraped.players:
-						# check that player exists in database
-						player = session.execute(select(db.Player).filter_by(name=player_scraped.name)).scalar_one_or_none()
-						if not player:
-							# player does not exist in database
-							player = db.Player(name=player_scraped.name)
-							session.add(player)
-							session.flush()
-
-						if not player.team:
-							# player is not assigned to a team
-							player.team = team
-
-						# add result to results table
-						result = player_scraped.results[0]
-						result.player = player
-						session.add(result)
-					session.flush()
-
-			# commmit and send response
-			self.bot.cache.invalidate()
+
+			# verify teams and players exist in database
+			from fantasyVCT.ingest import store_match
+			profile = self.bot.scoring
+			new_scores = store_match(session, results_scraped, profile=profile)
+			self.bot.standings.players_changed(session, new_scores, profile, int(results_scraped.match_id))
+
+			# commmit, then add the new games to cached totals
 			session.commit()
+			self.bot.cache.update(new_scores, profile.id if profile is not None else None)
+			self.bot.names.refresh(session, *match_names(results_scraped))
+			self.bot.queries.invalidate(POINTS, PLAYERS)
 
 
 	@tasks.loop(hours=1.0)
 	async def get_results(self):
-		r = requests.get(vlr_api.format("match/results"))
-
-		# verify request
-		if r.status_code != 200:
-			ts = datetime.datetime.now()
-			print(ts, "- ", str(r.status_code), "status returned from vlrggapi")
-			return
-		json = r.json()
-
-		# check each game if the tournament name is registered in the event table
-		for game in json['data']['segments']:
-			event_info = self.bot.db_manager.query_events_from_name(game['tournament_name'])
-
-			# allow other tasks to run
-			await asyncio.sleep(5)
-
-			if event_info:
-				vlr_id = game['match_page'].split('/')[1]
-
-				# check that the input is valid
-				if not re.match("^[0-9]{5,6}$", vlr_id):
-					ts = datetime.datetime.now()
-					print(ts, "- ", "invalid match id ", vlr_id)
-					return
-
-				# check that match does not exist in database
-				if self.bot.db_manager.query_results_all_from_match_id(str(vlr_id)):
-					return
-
-				# parse link
-				results = self.bot.scraper.parse_match(vlr_id)
-
-				# verify teams and players exist in database
-				for _map in results.maps:
-					for team in (_map.team1, _map.team2):
-						# check that teams exist in database
-						team_info = self.bot.db_manager.query_team_all_from_name(team.name)
-						if not team_info:
-							# team does not exist in database
-							self.bot.db_manager.insert_team_to_teams(team.name, team.abbrev, "TEST")
-							self.bot.db_manager.commit()
-							team_info = self.bot.db_manager.query_team_all_from_name(team.name)
-
-						team_id = team_info[0]
-
-						for player in team.players:
-							# check that players exist in database
-							player_info = self.bot.db_manager.query_players_all_from_name(player.name)
-							if not player_info:
-								# player does not exist in database
-								self.bot.db_manager.insert_player_to_players(player.name, team_id)
-								player_info = self.bot.db_manager.query_players_all_from_name(player.name)
-							elif not player_info[2] or player_info[2] != team_id:
-								# player is not assigned to a team
-								self.bot.db_manager.update_players_team_id(player_info[0], team_id)
-
-							# upload data
-							self.bot.db_manager.insert_result_to_results(_map.name, _map.game_id, vlr_id, player_info[0], player, event_info[0])
-							self.bot.db_manager.commit()
-
-				self.bot.cache.invalidate()
+		from fantasyVCT.ingest import IngestPipeline
+		await IngestPipeline(self.bot).run()
 
 	@get_results.before_loop
 	async def before_get_results(self):
@@ -4,6 +4,7 @@ import asyncio
 
 from fantasyVCT.bot import FantasyValBot
 from fantasyVCT.interactions import setup
+from fantasyVCT.migrations import DuplicateResults, MissingPrivilege
 from fantasyVCT.vlr_api import fetch_setup
 
 
@@ -14,6 +15,7 @@ DB_TYPE = os.getenv('DATABASE_TYPE')
 DB_HOST = os.getenv('DATABASE_HOST', '127.0.0.1')
 DB_DEV = os.getenv('DATABASE_DEV')
 DB_PROD = os.getenv('DATABASE_PROD')
+CACHE_DIR = os.getenv('VLR_CACHE_DIR')
 DB_PASSWORD = None
 TOKEN = None
 
@@ -53,12 +55,41 @@ parser.add_argument('--skip-draft', action='store_true', help='skip the draft st
 parser.add_argument('-r', '--rounds', dest='num_rounds', action='store', default=7, type=int, help="number of draft rounds")
 parser.add_argument('-s', '--subs', dest='sub_slots', action='store', default=0, type=int, help="number of sub slots allowed per team")
 parser.add_argument('--prod', action='store_true', help='use production database instead of development database')
+parser.add_argument('--vlr-rate', dest='vlr_rate', action='store', default=2.0, type=float, help="outbound requests/sec allowed per vlr host")
+parser.add_argument('--offline', action='store_true', help='serve vlr pages only from the response cache in VLR_CACHE_DIR')
+parser.add_argument('--score-cache-entries', dest='score_cache_entries', action='store', default=100000, type=int, help="maximum game scores held in the score cache")
+parser.add_argument('--score-cache-mb', dest='score_cache_mb', action='store', default=32.0, type=float, help="approximate memory budget of the score cache in MiB")
+parser.add_argument('--query-cache-ttl', dest='query_cache_ttl', action='store', default=300.0, type=float, help="seconds a cached reply of a read-only command stays valid")
+parser.add_argument('--query-cache-entries', dest='query_cache_entries', action='store', default=256, type=int, help="maximum replies held in the query cache")
+parser.add_argument('--delete-duplicate-results', dest='delete_duplicate_results', action='store_true', help="before migrating, delete every copy of a player's game in results but the first")
 
 bot = FantasyValBot("!")
 
 parser.parse_args(namespace=bot)
 
 bot.configure_db(DB_USER, DB_PASSWORD, DB_DEV, DB_PROD, db_type=DB_TYPE, db_host=DB_HOST)
+try:
+	bot.db_manager.migrate(bot.delete_duplicate_results)
+except (DuplicateResults, MissingPrivilege) as e:
+	print(e)
+	exit(1)
+schema_drift = bot.db_manager.check_schema()
+if schema_drift:
+	print("The database schema does not match the models. Regenerate db/scripts/init_db.sql or add a migration:")
+	for problem in schema_drift:
+		print("\t" + problem)
+	exit(1)
+bot.sync_scores()
+bot.load_names()
+bot.configure_rate_limit(bot.vlr_rate)
+bot.configure_score_cache(bot.score_cache_entries, bot.score_cache_mb)
+bot.configure_query_cache(bot.query_cache_ttl, bot.query_cache_entries)
+
+if CACHE_DIR:
+	bot.configure_cache(CACHE_DIR)
+elif bot.offline:
+	print("Offline mode requires a response cache. Set VLR_CACHE_DIR.")
+	exit(1)
 
 async def main():
 	async with bot:
@@ -0,0 +1,119 @@
+"""Fetcher / async scraper tests against a local stub server.
+No live network required; serves the saved pages in test/fixtures.
+"""
+import asyncio
+import pathlib
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+import fantasyVCT.scraper as scraper
+from fantasyVCT.fetch import Fetcher
+from fantasyVCT.scraper import Scraper
+
+FIXTURES = pathlib.Path(__file__).parent / "fixtures"
+
+
+def _stub_app(hits, in_flight):
+    """Serve fixture pages at /{match_id}/ the way vlr.gg does."""
+    app = web.Application()
+
+    async def match_page(request):
+        hits.append(request.path_qs)
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(0.02)
+        in_flight["now"] -= 1
+        tab = "performance" if request.query.get("tab") == "performance" else "summary"
+        path = FIXTURES / f"match_{request.match_info['match_id']}_{tab}.html"
+        if not path.exists():
+            raise web.HTTPNotFound()
+        return web.Response(text=path.read_text(), content_type="text/html")
+
+    async def json_page(request):
+        return web.json_response({"data": {"segments": []}})
+
+    app.router.add_get("/json", json_page)
+    app.router.add_get("/{match_id}/", match_page)
+    return app
+
+
+@pytest.fixture
+async def stub_server(monkeypatch):
+    hits = list()
+    in_flight = {"now": 0, "max": 0}
+    runner = web.AppRunner(_stub_app(hits, in_flight))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    base = f"http://127.0.0.1:{port}"
+    monkeypatch.setattr(scraper, "vlr_summary", base + "/{}/?game=all")
+    monkeypatch.setattr(scraper, "vlr_performance", base + "/{}/?game=all&tab=performance")
+    yield base, hits, in_flight
+    await runner.cleanup()
+
+
+async def test_fetch_json(stub_server):
+    base, _, _ = stub_server
+    async with Fetcher() as fetcher:
+        assert await fetcher.fetch_json(base + "/json") == {"data": {"segments": []}}
+
+
+async def test_fetch_error_status_raises(stub_server):
+    base, _, _ = stub_server
+    async with Fetcher() as fetcher:
+        with pytest.raises(aiohttp.ClientResponseError):
+            await fetcher.fetch_text(base + "/999/")
+
+
+async def test_session_is_reused(stub_server):
+    base, _, _ = stub_server
+    async with Fetcher() as fetcher:
+        await fetcher.fetch_json(base + "/json")
+        session = fetcher._session
+        await fetcher.fetch_json(base + "/json")
+        assert fetcher._session is session
+    assert fetcher._session is None
+
+
+async def test_parse_match_async(stub_server):
+    _, hits, in_flight = stub_server
+    async with Fetcher() as fetcher:
+        match = await Scraper(fetcher).parse_match_async("25206")
+    assert len(hits) == 2
+    # summary and performance tabs are requested at the same time
+    assert in_flight["max"] == 2
+    assert [m.name for m in match.maps] == ["Haven", "Breeze"]
+    assert match.maps[0].team1.name == "100 Thieves"
+    asuna = match.maps[0].team1.get_player("Asuna")
+    assert asuna.results[0].player_kills == 29
+    assert asuna.results[0].player_2k == 8
+    assert asuna.results[0].game_id == 47001
+
+
+async def test_parse_match_async_rejects_bad_id():
+    with pytest.raises(ValueError):
+        await Scraper(Fetcher()).parse_match_async("abc")
+
+
+async def test_parse_matches_preserves_order(stub_server):
+    _, hits, in_flight = stub_server
+    async with Fetcher() as fetcher:
+        matches = await Scraper(fetcher).parse_matches(["301000", "25206", "301000"], workers=2)
+    assert [m.match_id for m in matches] == ["301000", "25206", "301000"]
+    assert [m.name for m in matches[0].maps] == ["Ascent", "Lotus", "Sunset"]
+    assert len(hits) == 6
+    # two matches in flight, two tabs each
+    assert in_flight["max"] <= 4
+
+
+async def test_parse_matches_return_exceptions(stub_server):
+    async with Fetcher() as fetcher:
+        s = Scraper(fetcher)
+        matches = await s.parse_matches(["25206", "404404"], return_exceptions=True)
+        assert matches[0].match_id == "25206"
+        assert isinstance(matches[1], aiohttp.ClientResponseError)
+        with pytest.raises(aiohttp.ClientResponseError):
+            await s.parse_matches(["404404"])
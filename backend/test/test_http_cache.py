@@ -0,0 +1,214 @@
+"""ResponseCache tests, and Fetcher/Scraper revalidation and offline replay.
+No live network required; uses tmp_path and a local stub server.
+"""
+import os
+import pathlib
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch, MagicMock
+
+import pytest
+from aiohttp import web
+
+import fantasyVCT.scraper as scraper
+from fantasyVCT.fetch import Fetcher
+from fantasyVCT.http_cache import ResponseCache, OfflineCacheMiss
+from fantasyVCT.scraper import Scraper
+
+FIXTURES = pathlib.Path(__file__).parent / "fixtures"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(str(tmp_path / "cache"))
+
+
+# ── ResponseCache ─────────────────────────────────────────────────────────────
+
+class TestResponseCache:
+    def test_miss_returns_none(self, cache):
+        assert cache.get("https://vlr.gg/1/") is None
+
+    def test_put_and_get(self, cache):
+        cache.put("https://vlr.gg/1/", "body", etag='"abc"', last_modified="Sat, 10 Apr 2021 18:00:00 GMT")
+        entry = cache.get("https://vlr.gg/1/")
+        assert entry.body == "body"
+        assert entry.validators() == {
+            "If-None-Match": '"abc"',
+            "If-Modified-Since": "Sat, 10 Apr 2021 18:00:00 GMT",
+        }
+
+    def test_no_validators(self, cache):
+        cache.put("https://vlr.gg/1/", "body")
+        assert cache.get("https://vlr.gg/1/").validators() == {}
+
+    def test_identical_bodies_stored_once(self, cache):
+        cache.put("https://vlr.gg/1/", "same body")
+        cache.put("https://vlr.gg/2/", "same body")
+        assert len(os.listdir(cache._objects)) == 1
+        assert cache.size() == len("same body")
+
+    def test_replaced_body_is_removed(self, cache):
+        cache.put("https://vlr.gg/1/", "old")
+        cache.put("https://vlr.gg/1/", "new")
+        assert cache.get("https://vlr.gg/1/").body == "new"
+        assert len(os.listdir(cache._objects)) == 1
+
+    def test_ttl(self, cache):
+        cache.put("https://vlr.gg/1/", "body")
+        entry = cache.get("https://vlr.gg/1/")
+        assert cache.is_fresh(entry)
+        assert not cache.is_fresh(entry, ttl=0)
+        with patch("fantasyVCT.http_cache.time.time", return_value=entry.stored_at + cache.ttl + 1):
+            assert not cache.is_fresh(entry)
+
+    def test_offline_entries_never_expire(self, tmp_path):
+        cache = ResponseCache(str(tmp_path), offline=True)
+        cache.put("https://vlr.gg/1/", "body")
+        assert cache.is_fresh(cache.get("https://vlr.gg/1/"), ttl=0)
+
+    def test_lru_eviction(self, tmp_path):
+        cache = ResponseCache(str(tmp_path), max_bytes=25)
+        cache.put("https://vlr.gg/1/", "a" * 10)
+        cache.put("https://vlr.gg/2/", "b" * 10)
+        # touch 1 so that 2 becomes least recently used
+        os.utime(cache._entry_path("https://vlr.gg/2/"), (0, 0))
+        cache.get("https://vlr.gg/1/")
+        cache.put("https://vlr.gg/3/", "c" * 10)
+        assert cache.get("https://vlr.gg/2/") is None
+        assert cache.get("https://vlr.gg/1/").body == "a" * 10
+        assert cache.get("https://vlr.gg/3/").body == "c" * 10
+        assert cache.size() <= 25
+
+
+    def test_put_does_not_scan_the_cache(self, cache):
+        cache.put("https://vlr.gg/1/", "body")
+        with patch("fantasyVCT.http_cache.os.listdir", side_effect=AssertionError("scanned")):
+            cache.put("https://vlr.gg/2/", "other body")
+            cache.refresh(cache.get("https://vlr.gg/1/"))
+        assert cache.size() == len("body") + len("other body")
+
+    def test_reopened_cache_keeps_index(self, tmp_path):
+        cache = ResponseCache(str(tmp_path), max_bytes=25)
+        cache.put("https://vlr.gg/1/", "a" * 10)
+        cache.put("https://vlr.gg/2/", "b" * 10)
+        os.utime(cache._entry_path("https://vlr.gg/1/"), (0, 0))
+        reopened = ResponseCache(str(tmp_path), max_bytes=25)
+        assert reopened.size() == 20
+        # entry 1 was used least recently, going by its mtime
+        reopened.put("https://vlr.gg/3/", "c" * 10)
+        assert reopened.get("https://vlr.gg/1/") is None
+        assert reopened.get("https://vlr.gg/2/").body == "b" * 10
+
+    def test_writes_in_progress_are_not_evicted(self, tmp_path):
+        cache = ResponseCache(str(tmp_path), max_bytes=15)
+        tmp = os.path.join(cache._objects, "0" * 64 + ".tmp")
+        pathlib.Path(tmp).write_text("partial")
+        cache.put("https://vlr.gg/1/", "a" * 10)
+        cache.put("https://vlr.gg/2/", "b" * 10)
+        ResponseCache(str(tmp_path), max_bytes=15)
+        assert os.path.exists(tmp)
+
+    def test_concurrent_puts(self, tmp_path):
+        cache = ResponseCache(str(tmp_path), max_bytes=200)
+        urls = [f"https://vlr.gg/{i}/" for i in range(40)]
+
+        def store(url):
+            # urls share bodies in groups of ten, and the budget forces evictions
+            cache.put(url, url[:-3] * 4)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(store, urls))
+        assert cache.size() <= 200
+        assert cache.size() == sum(os.path.getsize(os.path.join(cache._objects, name)) for name in os.listdir(cache._objects))
+        for url in urls:
+            entry = cache.get(url)
+            assert entry is None or entry.body == url[:-3] * 4
+
+
+# ── Fetcher revalidation ──────────────────────────────────────────────────────
+
+@pytest.fixture
+async def etag_server():
+    """Serve one page with an ETag and answer If-None-Match with 304."""
+    requests = list()
+
+    async def page(request):
+        requests.append(dict(request.headers))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304)
+        return web.Response(text="page body", headers={"ETag": '"v1"'})
+
+    app = web.Application()
+    app.router.add_get("/page", page)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}/page", requests
+    await runner.cleanup()
+
+
+async def test_fetcher_serves_fresh_from_cache(cache, etag_server):
+    url, requests = etag_server
+    async with Fetcher(cache=cache) as fetcher:
+        assert await fetcher.fetch_text(url) == "page body"
+        assert await fetcher.fetch_text(url) == "page body"
+    assert len(requests) == 1
+
+
+async def test_fetcher_revalidates_stale(cache, etag_server):
+    url, requests = etag_server
+    async with Fetcher(cache=cache) as fetcher:
+        await fetcher.fetch_text(url)
+        assert await fetcher.fetch_text(url, ttl=0) == "page body"
+    assert len(requests) == 2
+    assert requests[1]["If-None-Match"] == '"v1"'
+
+
+async def test_fetcher_offline_miss(tmp_path):
+    cache = ResponseCache(str(tmp_path), offline=True)
+    async with Fetcher(cache=cache) as fetcher:
+        with pytest.raises(OfflineCacheMiss):
+            await fetcher.fetch_text("http://127.0.0.1:9/never-cached")
+
+
+# ── offline replay of recorded pages ──────────────────────────────────────────
+
+def _record_fixtures(cache, match_id):
+    for tab, url in (("summary", scraper.vlr_summary), ("performance", scraper.vlr_performance)):
+        cache.put(url.format(match_id), (FIXTURES / f"match_{match_id}_{tab}.html").read_text())
+
+
+async def test_parse_match_async_offline(tmp_path):
+    cache = ResponseCache(str(tmp_path), offline=True)
+    _record_fixtures(cache, "25206")
+    async with Fetcher(cache=cache) as fetcher:
+        match = await Scraper(fetcher).parse_match_async("25206")
+    assert [m.name for m in match.maps] == ["Haven", "Breeze"]
+
+
+def test_parse_match_offline(tmp_path):
+    cache = ResponseCache(str(tmp_path), offline=True)
+    _record_fixtures(cache, "301000")
+    scraper.set_response_cache(cache)
+    try:
+        with patch.object(scraper, "_session") as mock_session:
+            match = Scraper.parse_match("301000")
+            mock_session.get.assert_not_called()
+    finally:
+        scraper.set_response_cache(None)
+    assert len(match.maps) == 3
+
+
+def test_blocking_fetch_revalidates(cache):
+    cache.put("https://vlr.gg/1/", "cached", etag='"v1"')
+    scraper.set_response_cache(cache)
+    try:
+        with patch.object(scraper, "_session") as mock_session, \
+             patch("fantasyVCT.http_cache.time.time", return_value=1e12):
+            mock_session.get.return_value = MagicMock(status_code=304)
+            assert Scraper._get_text("https://vlr.gg/1/") == "cached"
+            assert mock_session.get.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+    finally:
+        scraper.set_response_cache(None)
@@ -0,0 +1,272 @@
+"""IngestPipeline tests: stage concurrency, batching, match id parsing and
+set-based storage of parsed matches.
+No live network required; match pages are served from test/fixtures.
+"""
+import asyncio
+import os
+import re
+from contextlib import contextmanager
+from unittest.mock import MagicMock, AsyncMock
+
+import pytest
+from sqlalchemy import create_engine, event, select, text
+from sqlalchemy.schema import CreateTable
+from sqlalchemy.orm import Session as SASession
+from sqlalchemy.pool import StaticPool
+
+import fantasyVCT.database as db
+from fantasyVCT.database import Base
+from fantasyVCT.names import NameIndex
+from fantasyVCT.ingest import IngestPipeline, match_id_from_page, store_match
+from fantasyVCT.scoring import PointCalculator
+from fantasyVCT.scraper import Scraper
+
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def _pages(match_id):
+	pages = list()
+	for tab in ("summary", "performance"):
+		with open(os.path.join(FIXTURES, f"match_{match_id}_{tab}.html"), encoding="utf-8") as f:
+			pages.append(f.read())
+	return tuple(pages)
+
+
+@pytest.fixture
+def engine():
+	eng = create_engine(
+		"sqlite:///:memory:",
+		connect_args={"check_same_thread": False},
+		poolclass=StaticPool,
+	)
+	Base.metadata.create_all(eng)
+	with SASession(eng) as s:
+		s.add(db.Event(id=1, name="VCT Masters"))
+		s.add_all([
+			db.Team(name="100 Thieves", abbrev="100T", region="na"),
+			db.Team(name="Sentinels", abbrev="SEN", region="na"),
+		])
+		s.commit()
+	yield eng
+	eng.dispose()
+
+
+@pytest.fixture
+def bot(engine):
+	b = MagicMock()
+	b.scoring = None
+	b.names = NameIndex()
+
+	@contextmanager
+	def make_session():
+		with SASession(engine) as s:
+			yield s
+
+	b.db_manager.create_session = make_session
+	return b
+
+
+@pytest.mark.parametrize("page,expected", [
+	("/25206/100-thieves-vs-sentinels", "25206"),
+	("25206/100-thieves-vs-sentinels", "25206"),
+	("/459518/a-vs-b/?game=all", "459518"),
+	("/event/a-vs-b", None),
+	("", None),
+])
+def test_match_id_from_page(page, expected):
+	assert match_id_from_page(page) == expected
+
+
+def _distinct_games(batch):
+	"""Give each copy of the fixture match its own game ids, as distinct matches would have.
+	"""
+	for match, _ in batch:
+		copy = int(match.match_id) % 100
+		for map_ in match.maps:
+			for team in (map_.team1, map_.team2):
+				for player in team.players:
+					player.results[0].game_id = player.results[0].game_id * 100 + copy
+	return batch
+
+
+async def test_fetch_stage_bounded_by_workers(bot):
+	"""Every id serves the same fixture pages, so each is written as its own match.
+	"""
+	ids = [str(10000 + i) for i in range(12)]
+	bot.fetcher.fetch_json = AsyncMock(return_value={"data": {"segments": [
+		{"tournament_name": "VCT Masters", "match_page": f"/{match_id}/a-vs-b"} for match_id in ids
+	]}})
+	in_flight = 0
+	peak = 0
+
+	async def fetch_match_pages(match_id):
+		nonlocal in_flight, peak
+		in_flight += 1
+		peak = max(peak, in_flight)
+		await asyncio.sleep(0.01)
+		in_flight -= 1
+		return _pages("25206")
+
+	bot.scraper.fetch_match_pages = fetch_match_pages
+	pipeline = IngestPipeline(bot, fetch_workers=3, parse_workers=2, queue_size=2, batch_size=5)
+	written_batches = list()
+	write = pipeline._write
+	pipeline._write = lambda batch: written_batches.append(len(batch)) or write(_distinct_games(batch))
+
+	written = await pipeline.run()
+
+	assert peak == 3
+	assert sorted(written) == sorted(ids)
+	assert sum(written_batches) == 12
+	assert max(written_batches) <= 5
+	assert bot.cache.update.call_count == len(written_batches)
+	# one standings refresh, and so one points_history entry, per match
+	assert bot.standings.players_changed.call_count == 12
+
+
+async def test_parse_failure_does_not_block_others(bot, engine):
+	bot.fetcher.fetch_json = AsyncMock(return_value={"data": {"segments": [
+		{"tournament_name": "VCT Masters", "match_page": "/11111/broken"},
+		{"tournament_name": "VCT Masters", "match_page": "/25206/100-thieves-vs-sentinels"},
+	]}})
+
+	async def fetch_match_pages(match_id):
+		if match_id == "11111":
+			return "<html></html>", None
+		return _pages(match_id)
+
+	bot.scraper.fetch_match_pages = fetch_match_pages
+	written = await IngestPipeline(bot).run()
+
+	assert written == ["25206"]
+	with SASession(engine) as s:
+		assert {r.match_id for r in s.scalars(select(db.Result))} == {25206}
+
+
+async def test_write_failure_does_not_block_others(bot, engine):
+	ids = [str(10000 + i) for i in range(6)]
+	bot.fetcher.fetch_json = AsyncMock(return_value={"data": {"segments": [
+		{"tournament_name": "VCT Masters", "match_page": f"/{match_id}/a-vs-b"} for match_id in ids
+	]}})
+	bot.scraper.fetch_match_pages = AsyncMock(return_value=_pages("25206"))
+	pipeline = IngestPipeline(bot, queue_size=1, batch_size=1)
+	write = pipeline._write
+
+	def failing_write(batch):
+		if batch[0][0].match_id in ("10000", "10003"):
+			raise RuntimeError("database unreachable")
+		return write(_distinct_games(batch))
+
+	pipeline._write = failing_write
+	written = await asyncio.wait_for(pipeline.run(), timeout=5)
+
+	assert sorted(written) == ["10001", "10002", "10004", "10005"]
+	assert asyncio.all_tasks() == {asyncio.current_task()}
+
+
+async def test_stage_failure_cancels_other_stages(bot):
+	bot.fetcher.fetch_json = AsyncMock(return_value={"data": {"segments": [
+		{"tournament_name": "VCT Masters", "match_page": f"/{10000 + i}/a-vs-b"} for i in range(6)
+	]}})
+	bot.scraper.fetch_match_pages = AsyncMock(return_value=_pages("25206"))
+	# fails outside the per-batch handling, after the first batch is stored
+	bot.cache.update.side_effect = RuntimeError("cache broken")
+	pipeline = IngestPipeline(bot, queue_size=1, batch_size=1)
+	write = pipeline._write
+	pipeline._write = lambda batch: write(_distinct_games(batch))
+
+	with pytest.raises(ExceptionGroup):
+		await asyncio.wait_for(pipeline.run(), timeout=5)
+	assert asyncio.all_tasks() == {asyncio.current_task()}
+
+
+# ── store_match() ────────────────────────────────────────────────────────────
+
+def _statements(engine):
+	statements = list()
+	event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+	return statements
+
+
+def _build(match_id):
+	return Scraper._build_match(match_id, *_pages(match_id))
+
+
+def test_store_match_creates_missing_rows(engine):
+	with SASession(engine) as s:
+		teamless = db.Player(name="Asuna")
+		s.add(teamless)
+		s.commit()
+
+	with SASession(engine) as s:
+		new_scores = store_match(s, _build("25206"), event_id=1)
+		s.commit()
+
+	with SASession(engine) as s:
+		players = {p.name: p for p in s.scalars(select(db.Player))}
+		assert len(players) == 10
+		assert players["Asuna"].team.name == "100 Thieves"
+		assert set(new_scores) == {p.id for p in players.values()}
+		results = list(s.scalars(select(db.Result)))
+		assert len(results) == 20
+		assert {r.event_id for r in results} == {1}
+		asuna = [r for r in results if r.player_id == players["Asuna"].id]
+		assert sorted(r.player_kills for r in asuna) == sorted(
+			p.results[0].player_kills for m in _build("25206").maps for p in m.team1.players if p.name == "Asuna"
+		)
+		assert {(r.player_id, r.game_id): PointCalculator.score(r) for r in results} == {
+			(player_id, game_id): points for player_id, games in new_scores.items() for game_id, points in games.items()
+		}
+
+
+def test_store_match_matches_names_differing_in_case():
+	eng = create_engine("sqlite:///:memory:")
+	Base.metadata.create_all(eng)
+	with eng.begin() as conn:
+		# names compare case-insensitively, as under the production collation
+		for table in (db.Player.__table__, db.Team.__table__):
+			ddl = re.sub(r"(VARCHAR\(\d+\))", r"\1 COLLATE NOCASE", str(CreateTable(table).compile(eng)))
+			conn.execute(text(f"DROP TABLE {table.name}"))
+			conn.execute(text(ddl))
+	with SASession(eng) as s:
+		s.add(db.Event(id=1, name="VCT Masters"))
+		s.add_all([db.Team(name="100 THIEVES", abbrev="100t", region="na"), db.Team(name="sentinels", abbrev="SEN", region="na")])
+		s.add(db.Player(name="ASUNA"))
+		s.commit()
+
+	with SASession(eng) as s:
+		new_scores = store_match(s, _build("25206"), event_id=1)
+		s.commit()
+
+	with SASession(eng) as s:
+		assert sorted(s.scalars(select(db.Team.name))) == ["100 THIEVES", "sentinels"]
+		players = {p.name: p for p in s.scalars(select(db.Player))}
+		assert len(players) == 10
+		assert players["ASUNA"].team.name == "100 THIEVES"
+		assert players["ASUNA"].id in new_scores
+	eng.dispose()
+
+
+def test_store_match_round_trips_do_not_grow(engine):
+	with SASession(engine) as s:
+		s.add_all([
+			db.Team(name="Fnatic", abbrev="FNC", region="eu"),
+			db.Team(name="Team Heretics", abbrev="TH", region="eu"),
+		])
+		PointCalculator.selected_profile(s)
+		s.commit()
+
+	statements = _statements(engine)
+	with SASession(engine) as s:
+		store_match(s, _build("25206"), event_id=1)
+	two_maps = len(statements)
+
+	statements.clear()
+	with SASession(engine) as s:
+		store_match(s, _build("301000"), event_id=1)
+	three_maps = len(statements)
+
+	# team lookup, player lookup, player insert + read back, result insert,
+	# then profile lookup, score insert, total lookup and total insert
+	assert two_maps == three_maps == 9
@@ -5,13 +5,18 @@ import pytest
 from unittest.mock import MagicMock, AsyncMock
 from contextlib import contextmanager
 
-from sqlalchemy import create_engine, event
+from sqlalchemy import create_engine, event, func, select
 from sqlalchemy.orm import Session as SASession
 
 import fantasyVCT.database as db
 from fantasyVCT.database import Base
+from fantasyVCT.names import NameIndex
+from fantasyVCT.query_cache import POINTS, QueryCache
+from fantasyVCT.scoring import PointCalculator
+from fantasyVCT.standings import Standings, team_lineup
+from fantasyVCT.transactions import backfill
 from fantasyVCT.interactions import (
-	ConfigCog, FantasyCog, StatsCog, Category, add_spaces, POSITIONS, _optimal_score,
+	ConfigCog, FantasyCog, StatsCog, Category, add_spaces, POSITIONS,
 )
 
 
@@ -43,6 +48,10 @@ def engine():
 def mock_bot(engine):
 	bot = MagicMock()
 	bot.cache = MagicMock()
+	bot.scoring = None
+	bot.standings = Standings()
+	bot.names = NameIndex()
+	bot.queries = QueryCache()
 	bot.sub_slots = 4
 	bot.num_rounds = 5
 	bot.draft_state = MagicMock()
@@ -141,6 +150,54 @@ async def test_register_success(mock_bot, ctx):
 	assert "Test Team" in sent
 
 
+# ── ConfigCog scoring profiles ───────────────────────────────────────────────
+
+async def test_setweight_selects_new_version_and_rescores(mock_bot, ctx, engine):
+	cog = ConfigCog(mock_bot)
+	await cog.setweight.callback(cog, ctx, "KILLS", 3.0)
+	with SASession(engine) as s:
+		profile = PointCalculator.selected_profile(s)
+		assert (str(profile), profile.kills) == ("default v2", 3.0)
+		mock_bot.rescore.assert_called_once_with(profile.id)
+	assert "default v2" in ctx.send.call_args[0][0]
+
+
+async def test_setweight_unknown_stat(mock_bot, ctx):
+	cog = ConfigCog(mock_bot)
+	await cog.setweight.callback(cog, ctx, "HEADSHOTS", 1.0)
+	assert "not a scored stat" in ctx.send.call_args[0][0]
+	mock_bot.rescore.assert_not_called()
+
+
+async def test_scoringprofile_lists_and_selects(mock_bot, ctx, engine):
+	cog = ConfigCog(mock_bot)
+	await cog.scoringprofile.callback(cog, ctx, "league")
+	mock_bot.rescore.assert_called_once()
+	await cog.scoringprofile.callback(cog, ctx)
+	sent = ctx.send.call_args[0][0]
+	assert "default v1\n" in sent
+	assert "league v1 (selected)" in sent
+
+
+async def test_untrackevent_removes_points_of_its_results(mock_bot, ctx, engine):
+	_seed_league(engine, 1)
+	mock_bot.queries.fetch(("rankplayers",), (POINTS,), lambda: "cached")
+	cog = FantasyCog(mock_bot)
+	await cog.standings.callback(cog, ctx)
+	assert "F0 / Fantasy0 - 0.0" not in ctx.send.call_args[0][0]
+
+	config = ConfigCog(mock_bot)
+	await config.untrackevent.callback(config, ctx, "League")
+
+	with SASession(engine) as s:
+		assert s.scalar(select(func.count()).select_from(db.Result)) == 0
+		assert s.scalar(select(func.count()).select_from(db.PlayerScore)) == 0
+		assert s.scalar(select(func.count()).select_from(db.PlayerTotal)) == 0
+	await cog.standings.callback(cog, ctx)
+	assert "F0 / Fantasy0 - 0.0" in ctx.send.call_args[0][0]
+	assert mock_bot.queries.stats()["entries"] == 0
+
+
 # ── FantasyCog.draft() ────────────────────────────────────────────────────────
 
 async def test_draft_not_started(mock_bot, ctx):
@@ -210,12 +267,58 @@ async def test_standings_shows_team(mock_bot, ctx, engine):
 	assert "MyTeam" in sent
 
 
+async def test_standings_kept_current_by_roster_changes(mock_bot, ctx, engine):
+	cog = FantasyCog(mock_bot)
+	await cog.standings.callback(cog, ctx)
+
+	config = ConfigCog(mock_bot)
+	await config.register.callback(config, ctx, "NEW", "New Team")
+	selects = list()
+	event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *_: selects.append(statement))
+	await cog.standings.callback(cog, ctx)
+	assert "NEW / New Team - 0.0" in ctx.send.call_args[0][0]
+	assert selects == []
+
+
+# ── FantasyCog.history() ──────────────────────────────────────────────────────
+
+async def test_history_lists_match_range(mock_bot, ctx, engine):
+	from datetime import datetime
+	with SASession(engine) as s:
+		fteam = db.FantasyTeam(name="MyTeam", abbrev="MYT")
+		s.add(fteam)
+		s.flush()
+		for match_id, points in ((100, 10.0), (200, 25.5), (300, 40.0)):
+			s.add(db.PointsHistory(fantasy_team_id=fteam.id, match_id=match_id, recorded_at=datetime(2024, 3, match_id // 100),
+				points=points, optimal=points, rank=1))
+		s.commit()
+
+	cog = FantasyCog(mock_bot)
+	await cog.history.callback(cog, ctx, "MyTeam", "200", "2024-03-03")
+	sent = ctx.send.call_args[0][0]
+	assert "MYT / MyTeam History" in sent
+	assert "2024-03-02" in sent and "25.5" in sent and "40.0" in sent
+	assert "10.0" not in sent
+
+
+async def test_history_bad_bound(mock_bot, ctx):
+	cog = FantasyCog(mock_bot)
+	await cog.history.callback(cog, ctx, "MYT", "last week")
+	assert "YYYY-MM-DD" in ctx.send.call_args[0][0]
+
+
+async def test_history_unknown_team(mock_bot, ctx):
+	cog = FantasyCog(mock_bot)
+	await cog.history.callback(cog, ctx, "NOPE")
+	assert ctx.send.call_args[0][0] == "No fantasy team found for NOPE"
+
+
 # ── StatsCog.rankplayers() ────────────────────────────────────────────────────
 
 async def test_rankplayers_picks_up_new_games_after_stale_total(mock_bot, ctx, engine):
 	# Regression: get_fantasy_points used `if not total` guard, so new games
 	# added after a stale total was cached were never fetched from the DB.
-	from fantasyVCT.scoring import Cache
+	from fantasyVCT.scoring import Cache, PointCalculator
 	from fantasyVCT.database import Result
 
 	def _result(pid, eid, game_id, kills):
@@ -235,6 +338,8 @@ async def test_rankplayers_picks_up_new_games_after_stale_total(mock_bot, ctx, e
 		s.flush()
 		s.add(_result(player.id, event.id, game_id=1, kills=10))
 		s.add(_result(player.id, event.id, game_id=2, kills=5))
+		s.flush()
+		PointCalculator.rebuild_scores(s)
 		s.commit()
 		pid, eid = player.id, event.id
 
@@ -249,6 +354,7 @@ async def test_rankplayers_picks_up_new_games_after_stale_total(mock_bot, ctx, e
 	# New game added to DB (simulating an upload)
 	with SASession(engine) as s:
 		s.add(_result(pid, eid, game_id=3, kills=20))
+		PointCalculator.record_scores(s, {pid: {3: 40.0}})
 		s.commit()
 
 	mock_bot.cache = cache
@@ -259,7 +365,7 @@ async def test_rankplayers_picks_up_new_games_after_stale_total(mock_bot, ctx, e
 	assert "70.0" in sent
 
 
-# ── _optimal_score ────────────────────────────────────────────────────────────
+# ── team_lineup ───────────────────────────────────────────────────────────────
 
 def _make_fp(player_id, team_id):
 	"""Build a mock FantasyPlayer with a player stub."""
@@ -275,23 +381,16 @@ def _make_fteam(fps):
 	return ft
 
 
-def _make_cache(scores: dict):
-	cache = MagicMock()
-	cache.retrieve_total.side_effect = lambda pid: scores.get(pid, 0)
-	return cache
-
-
-class TestOptimalScore:
+class TestTeamLineup:
 	def test_empty_team(self):
 		ft = _make_fteam([])
-		assert _optimal_score(ft, _make_cache({})) == 0.0
+		assert team_lineup(ft, {})[0] == 0.0
 
 	def test_all_distinct_teams_best_captain(self):
 		# 6 players, each on different pro teams; best scorer should become captain
 		fps = [_make_fp(i, i) for i in range(6)]
 		scores = {0: 100, 1: 80, 2: 60, 3: 40, 4: 20, 5: 10}
-		cache = _make_cache(scores)
-		result = _optimal_score(_make_fteam(fps), cache)
+		result = team_lineup(_make_fteam(fps), scores)[0]
 		# captain=100×1.2 + 80+60+40+20+10 = 120+210 = 330
 		assert result == 330.0
 
@@ -300,8 +399,7 @@ class TestOptimalScore:
 		fps = [_make_fp(i, i) for i in range(6)]
 		scores = {0: 10, 1: 80, 2: 60, 3: 40, 4: 20, 5: 100}
 		# optimal: captain=player5(100) → 100×1.2 + 80+60+40+20+10 = 120+210 = 330
-		cache = _make_cache(scores)
-		result = _optimal_score(_make_fteam(fps), cache)
+		result = team_lineup(_make_fteam(fps), scores)[0]
 		assert result == 330.0
 
 	def test_captain_can_share_team_with_active(self):
@@ -316,10 +414,9 @@ class TestOptimalScore:
 			_make_fp(6, 6),   # score 40
 		]
 		scores = {0: 100, 1: 90, 2: 80, 3: 70, 4: 60, 5: 50, 6: 40}
-		cache = _make_cache(scores)
 		# captain=0(100,T99), active: 1(90,T99)✓, 2(80,T2)✓, 3(70,T3)✓, 4(60,T4)✓, 5(50,T5)✓
 		# total = 100×1.2 + 90+80+70+60+50 = 120+350 = 470
-		result = _optimal_score(_make_fteam(fps), cache)
+		result = team_lineup(_make_fteam(fps), scores)[0]
 		assert result == 470.0
 
 	def test_two_same_team_active_not_both_chosen(self):
@@ -335,10 +432,9 @@ class TestOptimalScore:
 			_make_fp(6, 5),   # score 10
 		]
 		scores = {0: 1000, 1: 80, 2: 70, 3: 60, 4: 50, 5: 40, 6: 10}
-		cache = _make_cache(scores)
 		# captain=0(1000): active=[80,70,60,50(T99),skip 40(T99),10]=[80,70,60,50,10]=270
 		# total = 1000×1.2 + 270 = 1200+270 = 1470
-		result = _optimal_score(_make_fteam(fps), cache)
+		result = team_lineup(_make_fteam(fps), scores)[0]
 		assert result == 1470.0
 
 	def test_sub_considered_for_optimal(self):
@@ -355,12 +451,27 @@ class TestOptimalScore:
 			_make_fp(6, 7),  # score 90 — strong sub, should replace player 5
 		]
 		scores = {0: 100, 1: 80, 2: 70, 3: 60, 4: 50, 5: 10, 6: 90}
-		cache = _make_cache(scores)
 		# Without sub: captain=0(100), active=[80,70,60,50,10]=270, total=120+270=390
 		# With sub:    captain=0(100), active=[90,80,70,60,50]=350, total=120+350=470
-		result = _optimal_score(_make_fteam(fps), cache)
+		result = team_lineup(_make_fteam(fps), scores)[0]
 		assert result == 470.0
 
+	def test_negative_player_left_out(self):
+		# An empty active slot beats fielding a player with negative points
+		fps = [_make_fp(i, i) for i in range(6)]
+		scores = {0: 100, 1: 80, 2: 60, 3: 40, 4: 20, 5: -10}
+		result = team_lineup(_make_fteam(fps), scores)[0]
+		assert result == 320.0
+
+	def test_lineup_returned(self):
+		fps = [_make_fp(i, i % 3) for i in range(7)]
+		scores = {0: 10, 1: 20, 2: 30, 3: 40, 4: 50, 5: 60, 6: 70}
+		points, captain, actives = team_lineup(_make_fteam(fps), scores)
+		# captain 6 (team 0), then the best of each team: 6 is exempt, so 3 plays for team 0
+		assert captain is fps[6]
+		assert actives == [fps[5], fps[4], fps[3]]
+		assert points == 70 * 1.2 + 60 + 50 + 40
+
 
 # ── Unicode / non-ASCII handling ──────────────────────────────────────────────
 
@@ -428,6 +539,36 @@ class TestUnicodeHandling:
 		sent = ctx.send.call_args[0][0]
 		assert "not found" in sent
 
+	async def test_info_matches_case_insensitively_and_by_abbreviation(self, mock_bot, ctx, engine):
+		"""!info rosé and !info bbl resolve through the name index."""
+		_seed_unicode_player(engine)
+		mock_bot.cache.retrieve_total.return_value = 0
+		mock_bot.cache.retrieve.return_value = None
+
+		cog = StatsCog(mock_bot)
+		await cog.info.callback(cog, ctx, "rosé")
+		assert "Rosé" in ctx.send.call_args[0][0]
+		await cog.info.callback(cog, ctx, "bbl")
+		assert "BBL Esports" in ctx.send.call_args[0][0]
+
+	async def test_unknown_name_costs_no_query(self, mock_bot, ctx, engine):
+		"""Once the name index is loaded, a name it does not know is rejected without a SELECT."""
+		_seed_unicode_player(engine)
+		mock_bot.draft_state.is_draft_started.return_value = True
+		mock_bot.draft_state.can_draft.return_value = True
+		with SASession(engine) as s:
+			mock_bot.names.load(s)
+
+		selects = list()
+		event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *_: selects.append(statement))
+		cog = FantasyCog(mock_bot)
+		await cog.draft.callback(cog, ctx, "Shroud")
+		assert "No player was found" in ctx.send.call_args[0][0]
+		stats = StatsCog(mock_bot)
+		await stats.info.callback(stats, ctx, "Shroud")
+		assert "not found" in ctx.send.call_args[0][0]
+		assert selects == []
+
 	async def test_draft_with_non_ascii_player_name(self, mock_bot, ctx, engine):
 		"""!draft Rosé picks up the player correctly when it is their turn."""
 		_seed_unicode_player(engine)
@@ -452,3 +593,269 @@ class TestUnicodeHandling:
 		# draft succeeded: completion message sent, no error about player not found
 		assert "Initial draft is complete!" in sent
 		assert "No player was found" not in sent
+
+
+# ── Name search ───────────────────────────────────────────────────────────────
+
+async def test_not_found_suggests_close_names(mock_bot, ctx, engine):
+	_seed_unicode_player(engine)
+	mock_bot.draft_state.is_draft_started.return_value = True
+	mock_bot.draft_state.can_draft.return_value = True
+
+	cog = FantasyCog(mock_bot)
+	await cog.draft.callback(cog, ctx, "Rosa")
+	assert ctx.send.call_args[0][0] == 'No player was found for "Rosa". Did you mean "Rosé"?'
+	stats = StatsCog(mock_bot)
+	await stats.info.callback(stats, ctx, "BBL Esport")
+	assert ctx.send.call_args[0][0] == 'A team or player was not found for BBL Esport. Did you mean "BBL Esports"?'
+	await stats.info.callback(stats, ctx, "Shroud")
+	assert ctx.send.call_args[0][0] == "A team or player was not found for Shroud."
+
+
+async def test_autocomplete_ranks_names(mock_bot, engine):
+	_seed_unicode_player(engine)
+	with SASession(engine) as s:
+		mock_bot.names.load(s)
+
+	cog = FantasyCog(mock_bot)
+	choices = await cog.player_autocomplete(MagicMock(), "ros")
+	assert [(choice.name, choice.value) for choice in choices] == [("Rosé", "Rosé")]
+	# players only, even where a team matches
+	assert await cog.player_autocomplete(MagicMock(), "bbl") == []
+	stats = StatsCog(mock_bot)
+	assert [choice.value for choice in await stats.info_autocomplete(MagicMock(), "bbl")] == ["BBL Esports"]
+
+
+# ── Query counts ──────────────────────────────────────────────────────────────
+
+def _seed_league(engine, fantasy_teams, games=3):
+	"""Seed fantasy_teams fantasy teams, each owning six pro players with results,
+	plus as many undrafted players again. The first team belongs to AUTHOR_ID.
+	"""
+	with SASession(engine) as s:
+		event = db.Event(name="League")
+		s.add(event)
+		s.flush()
+		for t in range(fantasy_teams):
+			fteam = db.FantasyTeam(name=f"Fantasy{t}", abbrev=f"F{t}")
+			s.add(fteam)
+			s.add(db.User(discord_id=AUTHOR_ID if t == 0 else str(t), fantasyteam=fteam))
+			for p in range(12):
+				team = db.Team(name=f"Pro{t}-{p}", abbrev=f"P{t}{p}", region="na")
+				player = db.Player(name=f"player{t}-{p}", team=team)
+				s.add(player)
+				for g in range(games):
+					s.add(db.Result(player=player, game_id=g, match_id=g, map="Haven", event_id=event.id, agent="Jett",
+						player_acs=200, player_kills=10, player_deaths=5, player_assists=3,
+						player_2k=1, player_3k=0, player_4k=0, player_5k=0,
+						player_clutch_v2=0, player_clutch_v3=0, player_clutch_v4=0, player_clutch_v5=0))
+				if p < 6:
+					s.add(db.FantasyPlayer(player=player, fantasyteam=fteam, position=p))
+		s.flush()
+		PointCalculator.rebuild_scores(s)
+		backfill(s)
+		s.commit()
+
+
+async def test_roster_changes_are_logged(mock_bot, ctx, engine):
+	_seed_league(engine, 1)
+	mock_bot.draft_state.is_draft_started.return_value = True
+	mock_bot.draft_state.can_draft.return_value = True
+	mock_bot.draft_state.is_draft_complete.return_value = True
+	cog = FantasyCog(mock_bot)
+
+	await cog.set.callback(cog, ctx, "player0-1", "captain")
+	await cog.drop.callback(cog, ctx, "player0-2")
+	await cog.draft.callback(cog, ctx, "player0-6")
+
+	with SASession(engine) as s:
+		ids = {name: player_id for player_id, name in s.execute(select(db.Player.id, db.Player.name))}
+		log = [
+			(action, player_id, position) for action, player_id, position in s.execute(
+				select(db.RosterTransaction.action, db.RosterTransaction.player_id, db.RosterTransaction.position)
+				.where(db.RosterTransaction.action != "draft").order_by(db.RosterTransaction.id)
+			)
+		]
+		drafted = s.execute(select(db.RosterTransaction.after_result_id).filter_by(player_id=ids["player0-6"])).scalar_one()
+		assert drafted == s.scalar(select(func.max(db.Result.id)))
+	assert log == [("set", ids["player0-1"], 0), ("set", ids["player0-0"], 1), ("drop", ids["player0-2"], None)]
+	# the pickup has played three games, but none since joining the roster
+	await cog.roster.callback(cog, ctx)
+	roster = ctx.send.call_args[0][0]
+	assert "P06 player0-6" in roster
+	assert roster.split("P06 player0-6")[1].split()[0] == "0.0"
+
+
+async def test_roster_shows_captain_points_before_multiplier(mock_bot, ctx, engine):
+	_seed_league(engine, 1)
+	cog = FantasyCog(mock_bot)
+	await cog.roster.callback(cog, ctx)
+	roster = ctx.send.call_args[0][0]
+	with SASession(engine) as s:
+		captain = s.scalars(select(db.Player.id).filter_by(name="player0-0")).one()
+		points = PointCalculator.stored_totals(s)[captain]
+	assert roster.split("P00 player0-0")[1].split()[:2] == [str(points), "(1.2x)"]
+
+
+async def _count_selects(engine, command, *args):
+	statements = list()
+
+	def record(conn, cursor, statement, *_):
+		if statement.lstrip().upper().startswith("SELECT"):
+			statements.append(statement)
+
+	event.listen(engine, "before_cursor_execute", record)
+	try:
+		await command(*args)
+	finally:
+		event.remove(engine, "before_cursor_execute", record)
+	return len(statements)
+
+
+@pytest.mark.parametrize("command", ["roster", "standings", "freeagents", "rankplayers"])
+async def test_query_count_does_not_grow_with_league(command, mock_bot, ctx):
+	from fantasyVCT.scoring import Cache, PointCalculator
+
+	counts = list()
+	for fantasy_teams in (1, 4):
+		eng = create_engine("sqlite:///:memory:")
+		Base.metadata.create_all(eng)
+		with SASession(eng) as s:
+			s.add_all([db.Position(id=pos_id, position=pos_name) for pos_id, pos_name in POSITIONS.items()])
+			s.commit()
+		_seed_league(eng, fantasy_teams)
+
+		@contextmanager
+		def make_session():
+			with SASession(eng) as s:
+				yield s
+
+		mock_bot.db_manager.create_session = make_session
+		mock_bot.cache = Cache()
+		mock_bot.standings = Standings()
+		mock_bot.queries = QueryCache()
+		cog = StatsCog(mock_bot) if command == "rankplayers" else FantasyCog(mock_bot)
+		callback = getattr(cog, command).callback
+		counts.append(await _count_selects(eng, callback, cog, ctx))
+		eng.dispose()
+
+	assert counts[0] == counts[1]
+	assert counts[0] <= 5
+
+
+async def test_cachestats_reports_counters(mock_bot, ctx):
+	from fantasyVCT.scoring import Cache, PointCalculator
+
+	mock_bot.cache = Cache(max_entries=10)
+	mock_bot.cache.store(1, 101, 2.0)
+	mock_bot.cache.retrieve_total(1)
+	cog = StatsCog(mock_bot)
+	await cog.cachestats.callback(cog, ctx)
+	sent = ctx.send.call_args[0][0]
+	assert "1/10 entries" in sent
+	assert "0 hits, 1 misses" in sent
+	assert "query cache: 0/256 results" in sent
+
+
+# ── Query cache ───────────────────────────────────────────────────────────────
+
+@pytest.mark.parametrize("command", ["roster", "freeagents", "rankplayers"])
+async def test_repeated_reads_are_served_from_query_cache(command, mock_bot, ctx, engine):
+	_seed_league(engine, 2)
+	cog = StatsCog(mock_bot) if command == "rankplayers" else FantasyCog(mock_bot)
+	callback = getattr(cog, command).callback
+	assert await _count_selects(engine, callback, cog, ctx) > 0
+	first = ctx.send.call_args_list[:]
+	ctx.send.reset_mock()
+	assert await _count_selects(engine, callback, cog, ctx) == 0
+	assert ctx.send.call_args_list == first
+	assert mock_bot.queries.stats()["hits"] == 1
+
+
+async def test_roster_changes_invalidate_cached_replies(mock_bot, ctx, engine):
+	_seed_league(engine, 1)
+	mock_bot.draft_state.is_draft_complete.return_value = True
+	cog = FantasyCog(mock_bot)
+	stats = StatsCog(mock_bot)
+	await cog.roster.callback(cog, ctx)
+	await stats.info.callback(stats, ctx, "player0-0")
+	info = ctx.send.call_args[0][0]
+
+	await cog.drop.callback(cog, ctx, "player0-0")
+	await cog.roster.callback(cog, ctx)
+	assert "player0-0" not in ctx.send.call_args[0][0]
+	# a player's results and team are unchanged by a drop, so info stays cached
+	assert await _count_selects(engine, stats.info.callback, stats, ctx, "player0-0") == 0
+	assert ctx.send.call_args[0][0] == info
+
+
+async def test_cached_replies_expire(mock_bot, ctx, engine):
+	now = [0.0]
+	mock_bot.queries = QueryCache(ttl=60.0, clock=lambda: now[0])
+	_seed_league(engine, 1)
+	cog = StatsCog(mock_bot)
+	await cog.rankplayers.callback(cog, ctx)
+	now[0] = 61.0
+	assert await _count_selects(engine, cog.rankplayers.callback, cog, ctx) > 0
+	assert mock_bot.queries.stats()["expirations"] == 1
+
+
+# ── Zero-point scores ─────────────────────────────────────────────────────────
+
+def _seed_bench_roster(engine, players=6, games=3):
+	"""Seed AUTHOR_ID's fantasy team with players whose every game scores 0."""
+	with SASession(engine) as s:
+		event = db.Event(name="League")
+		fteam = db.FantasyTeam(name="Bench", abbrev="BEN")
+		s.add_all([event, fteam, db.User(discord_id=AUTHOR_ID, fantasyteam=fteam)])
+		s.flush()
+		for p in range(players):
+			team = db.Team(name=f"Pro{p}", abbrev=f"P{p}", region="na")
+			player = db.Player(name=f"bench{p}", team=team)
+			s.add(db.FantasyPlayer(player=player, fantasyteam=fteam, position=p))
+			for g in range(games):
+				s.add(db.Result(player=player, game_id=g, match_id=g, map="Haven", event_id=event.id, agent="Jett",
+					player_acs=0, player_kills=0, player_deaths=0, player_assists=0,
+					player_2k=0, player_3k=0, player_4k=0, player_5k=0,
+					player_clutch_v2=0, player_clutch_v3=0, player_clutch_v4=0, player_clutch_v5=0))
+		s.commit()
+
+
+@pytest.mark.parametrize("command", ["roster", "info"])
+async def test_zero_point_games_scored_once(command, mock_bot, ctx, engine, monkeypatch):
+	from fantasyVCT.scoring import Cache, PointCalculator
+
+	_seed_bench_roster(engine)
+	calls = list()
+	score = PointCalculator.score
+	monkeypatch.setattr(PointCalculator, "score", staticmethod(lambda row, profile=None: calls.append(row.id) or score(row, profile)))
+	mock_bot.cache = Cache()
+
+	if command == "roster":
+		# roster sums the materialized scores of each stint, so the zero-point
+		# games are scored when materialized and never again by the command
+		with SASession(engine) as s:
+			PointCalculator.ensure_scores(s)
+			backfill(s)
+			s.commit()
+		calls.clear()
+		cog = FantasyCog(mock_bot)
+		run = lambda: cog.roster.callback(cog, ctx)
+		expected = 0
+	else:
+		cog = StatsCog(mock_bot)
+		run = lambda: cog.info.callback(cog, ctx, "bench0")
+		expected = 3
+
+	await run()
+	assert len(calls) == expected
+	# drop the cached replies so every run reads the score cache again
+	mock_bot.queries.invalidate()
+	await run()
+	mock_bot.queries.invalidate()
+	await run()
+	assert len(calls) == expected
+	if command == "roster":
+		roster = ctx.send.call_args[0][0]
+		assert roster.split("P0 bench0")[1].split()[:2] == ["0.0", "(1.2x)"]
+		assert all(roster.split(f"P{p} bench{p}")[1].split()[0] == "0.0" for p in range(1, 6))
@@ -0,0 +1,67 @@
+"""optimal_lineup tests, checked against a brute-force search over every lineup."""
+import itertools
+import random
+
+import pytest
+
+from fantasyVCT.lineup import ACTIVE_SLOTS, CAPTAIN_MULTIPLIER, optimal_lineup
+
+
+def brute_force(players):
+	"""Best lineup points by trying every captain and every set of actives."""
+	best = 0.0
+	for captain in [None] + list(range(len(players))):
+		rest = [i for i in range(len(players)) if i != captain]
+		captain_points = 0.0 if captain is None else players[captain][1] * CAPTAIN_MULTIPLIER
+		for size in range(ACTIVE_SLOTS + 1):
+			for actives in itertools.combinations(rest, size):
+				teams = [players[i][2] for i in actives]
+				if len(set(teams)) != len(teams):
+					continue
+				best = max(best, captain_points + sum(players[i][1] for i in actives))
+	return round(best, 1)
+
+
+def lineup_points(players, captain, actives):
+	points = {key: points for key, points, _ in players}
+	return round((points[captain] * CAPTAIN_MULTIPLIER if captain is not None else 0.0) + sum(points[key] for key in actives), 1)
+
+
+def random_roster(rng, size):
+	teams = rng.randint(1, max(size, 1))
+	return [(f"p{i}", round(rng.uniform(-20, 120), 1), rng.randrange(teams)) for i in range(size)]
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_matches_brute_force(seed):
+	rng = random.Random(seed)
+	players = random_roster(rng, rng.randint(0, 10))
+	points, captain, actives = optimal_lineup(players)
+	assert points == brute_force(players)
+
+	# the returned lineup is legal and scores what was reported
+	teams = {key: team_id for key, _, team_id in players}
+	assert captain not in actives
+	assert len(actives) <= ACTIVE_SLOTS
+	assert len({teams[key] for key in actives}) == len(actives)
+	assert lineup_points(players, captain, actives) == points
+
+
+def test_empty_roster():
+	assert optimal_lineup([]) == (0.0, None, [])
+
+
+def test_returns_lineup():
+	players = [("a", 50, 1), ("b", 100, 1), ("c", 40, 2), ("d", 30, 2), ("e", 10, 3)]
+	# b captains, a still plays for team 1 since the captain is exempt
+	assert optimal_lineup(players) == (220.0, "b", ["a", "c", "e"])
+
+
+def test_negative_players_benched():
+	players = [("a", 10, 1), ("b", -5, 2), ("c", -1, 3)]
+	assert optimal_lineup(players) == (12.0, "a", [])
+
+
+def test_team_none_is_one_team():
+	players = [("a", 10, None), ("b", 8, None), ("c", 6, None)]
+	assert optimal_lineup(players) == (20.0, "a", ["b"])
@@ -0,0 +1,145 @@
+"""Schema migration tests: upgrading a database created before the results
+indexes, rerunning, and the query plans of the hot results lookups.
+"""
+import pytest
+from sqlalchemy import create_engine, event, inspect, select, text
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import Session as SASession
+
+import fantasyVCT.database as db
+from fantasyVCT.database import Base
+import fantasyVCT.migrations as migrations
+from fantasyVCT.migrations import MIGRATIONS, DuplicateResults, MissingPrivilege, migrate
+from fantasyVCT.transactions import rostered_points
+
+RESULTS_INDEXES = {"uq_results_player_game", "ix_results_match", "ix_results_event"}
+
+
+def _result(result_id, player_id, game_id, match_id=1, event_id=1):
+	return db.Result(id=result_id, player_id=player_id, game_id=game_id, match_id=match_id, event_id=event_id, map="Haven",
+		agent="Jett", player_acs=0, player_kills=1, player_deaths=0, player_assists=0,
+		player_2k=0, player_3k=0, player_4k=0, player_5k=0,
+		player_clutch_v2=0, player_clutch_v3=0, player_clutch_v4=0, player_clutch_v5=0)
+
+
+@pytest.fixture
+def legacy_engine():
+	"""A database as init_db.sql created it before migrations: results without
+	indexes, holding a duplicated game, and none of the newer tables.
+	"""
+	eng = create_engine("sqlite:///:memory:")
+	Base.metadata.create_all(eng)
+	with eng.begin() as conn:
+		for name in RESULTS_INDEXES:
+			conn.execute(text(f"DROP INDEX {name}"))
+		conn.execute(text("DROP TABLE roster_transactions"))
+		conn.execute(text("DROP TABLE schema_migrations"))
+	with SASession(eng) as s:
+		s.add(db.Player(id=1, name="p1"))
+		s.add_all([_result(1, 1, 100), _result(2, 1, 101), _result(3, 1, 100)])
+		s.commit()
+	yield eng
+	eng.dispose()
+
+
+def _plan(session, stmt):
+	query = stmt.compile(session.get_bind(), compile_kwargs={"literal_binds": True})
+	return " ".join(str(row) for row in session.execute(text(f"EXPLAIN QUERY PLAN {query}")))
+
+
+def test_migrate_upgrades_legacy_database(legacy_engine):
+	assert migrate(legacy_engine, delete_duplicates=True) == [version for version, _, _ in MIGRATIONS]
+
+	inspector = inspect(legacy_engine)
+	assert "roster_transactions" in inspector.get_table_names()
+	assert RESULTS_INDEXES <= {index["name"] for index in inspector.get_indexes("results")}
+	with SASession(legacy_engine) as s:
+		# the later copy of the duplicated game is dropped
+		assert list(s.scalars(select(db.Result.id).order_by(db.Result.id))) == [1, 2]
+		assert list(s.scalars(select(db.SchemaMigration.version))) == [version for version, _, _ in MIGRATIONS]
+
+
+def test_duplicate_results_abort_migration(legacy_engine, capsys):
+	with pytest.raises(DuplicateResults) as excinfo:
+		migrate(legacy_engine)
+	assert excinfo.value.duplicates == {(1, 100): [1, 3]}
+	assert "player 1, game 100: results 1, 3" in str(excinfo.value)
+
+	inspector = inspect(legacy_engine)
+	assert not RESULTS_INDEXES & {index["name"] for index in inspector.get_indexes("results")}
+	with SASession(legacy_engine) as s:
+		assert list(s.scalars(select(db.Result.id).order_by(db.Result.id))) == [1, 2, 3]
+		# migrations before the results indexes stay applied
+		assert list(s.scalars(select(db.SchemaMigration.version))) == [1]
+
+	# the opt-in picks up where the aborted run stopped, logging each deleted row
+	assert migrate(legacy_engine, delete_duplicates=True) == [version for version, _, _ in MIGRATIONS[1:]]
+	assert "deleting result 3 duplicating result 1 of player 1 game 100" in capsys.readouterr().out
+
+
+def test_missing_privilege_names_the_grant(monkeypatch):
+	eng = create_engine("sqlite:///:memory:")
+	monkeypatch.setattr(eng, "url", eng.url.set(username="discord", database="FantasyValProd"))
+
+	def denied(conn):
+		# as pymysql reports a statement the user may not run
+		orig = Exception(1142, "INDEX command denied to user 'discord'@'172.18.0.3' for table 'results'")
+		raise OperationalError("CREATE INDEX ix_results_match ON results (match_id)", {}, orig)
+
+	monkeypatch.setattr(migrations, "MIGRATIONS", [(1, "index results", denied)])
+	with pytest.raises(MissingPrivilege) as excinfo:
+		migrate(eng)
+	assert excinfo.value.privilege == "INDEX"
+	assert excinfo.value.grant == "GRANT CREATE, ALTER, INDEX, REFERENCES ON FantasyValProd.* TO 'discord'@'%';"
+	assert excinfo.value.grant in str(excinfo.value)
+	eng.dispose()
+
+
+def test_migrate_is_a_no_op_once_applied(legacy_engine):
+	migrate(legacy_engine, delete_duplicates=True)
+	assert migrate(legacy_engine) == list()
+
+
+def test_migrate_fresh_database_records_versions():
+	eng = create_engine("sqlite:///:memory:")
+	Base.metadata.create_all(eng)
+	assert migrate(eng) == [version for version, _, _ in MIGRATIONS]
+	eng.dispose()
+
+
+def test_unique_player_game(legacy_engine):
+	migrate(legacy_engine, delete_duplicates=True)
+	with SASession(legacy_engine) as s:
+		s.add(_result(4, 1, 101))
+		with pytest.raises(IntegrityError):
+			s.flush()
+
+
+@pytest.mark.parametrize("stmt, index", [
+	# FetchCog.upload's dedupe check
+	(select(db.Result).filter_by(match_id=25206), "ix_results_match"),
+	# a player's results, as info and the scoring paths read them
+	(select(db.Result).where(db.Result.player_id.in_([1, 2])), "uq_results_player_game"),
+	(select(db.Result.id).where(db.Result.player_id == 1, db.Result.game_id == 100), "uq_results_player_game"),
+	(select(db.Result.player_id).where(db.Result.event_id == 3), "ix_results_event"),
+])
+def test_hot_queries_use_results_indexes(legacy_engine, stmt, index):
+	migrate(legacy_engine, delete_duplicates=True)
+	with SASession(legacy_engine) as s:
+		assert index in _plan(s, stmt)
+
+
+def test_rostered_points_joins_results_by_index(legacy_engine):
+	migrate(legacy_engine, delete_duplicates=True)
+	statements = list()
+	with SASession(legacy_engine) as s:
+		conn = s.connection()
+
+		@event.listens_for(conn, "before_cursor_execute")
+		def record(conn, cursor, statement, parameters, *_):
+			statements.append((statement, parameters))
+
+		rostered_points(s, [1])
+		statement, parameters = statements[-1]
+		plan = " ".join(str(row) for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters))
+	assert "uq_results_player_game" in plan
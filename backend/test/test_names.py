@@ -0,0 +1,140 @@
+"""Name index tests: exact and case-insensitive lookups of pro players and
+teams, extending the index without rereading it, and fuzzy search.
+"""
+import random
+import string
+import time
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session as SASession
+
+import fantasyVCT.database as db
+from fantasyVCT.database import Base
+from fantasyVCT.names import PLAYER, TEAM, NameIndex
+
+
+@pytest.fixture
+def engine():
+	eng = create_engine("sqlite:///:memory:")
+	Base.metadata.create_all(eng)
+	with SASession(eng) as s:
+		s.add_all([
+			db.Team(id=1, name="Sentinels", abbrev="SEN"),
+			db.Team(id=2, name="BBL Esports", abbrev="BBL"),
+			db.Player(id=1, name="TenZ", team_id=1),
+			db.Player(id=2, name="Rosé", team_id=2),
+			db.Player(id=3, name="ana", team_id=1),
+			db.Player(id=4, name="Ana", team_id=2),
+		])
+		s.commit()
+	yield eng
+	eng.dispose()
+
+
+@pytest.fixture
+def names(engine):
+	index = NameIndex()
+	with SASession(engine) as s:
+		index.load(s)
+	return index
+
+
+def _count_statements(engine):
+	statements = list()
+	event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *_: statements.append(statement))
+	return statements
+
+
+def test_player_exact_and_case_insensitive(names):
+	assert names.player_id("TenZ") == 1
+	assert names.player_id("tenz") == 1
+	assert names.player_id("ROSÉ") == 2
+	assert names.player_id("Shroud") is None
+
+
+def test_ambiguous_case_insensitive_match_needs_exact_name(names):
+	assert names.player_id("ana") == 3
+	assert names.player_id("Ana") == 4
+	assert names.player_id("ANA") is None
+
+
+def test_team_by_name_or_abbreviation(names):
+	assert names.team_id("Sentinels") == 1
+	assert names.team_id("sen") == 1
+	assert names.team_id("BBL") == 2
+	assert names.team_id("bbl esports") == 2
+	assert names.team_id("Fnatic") is None
+
+
+def test_ensure_loaded_reads_once(engine):
+	index = NameIndex()
+	statements = _count_statements(engine)
+	with SASession(engine) as s:
+		index.ensure_loaded(s)
+		loaded = len(statements)
+		index.ensure_loaded(s)
+	assert loaded == 2
+	assert len(statements) == 2
+
+
+def test_refresh_only_reads_unknown_names(engine, names):
+	with SASession(engine) as s:
+		s.add_all([db.Team(id=3, name="Fnatic", abbrev="FNC"), db.Player(id=5, name="Boaster", team_id=3)])
+		s.commit()
+
+	statements = _count_statements(engine)
+	with SASession(engine) as s:
+		names.refresh(s, ["TenZ", "Rosé"], ["Sentinels"])
+		assert statements == []
+		names.refresh(s, ["TenZ", "Boaster"], ["Fnatic"])
+	assert len(statements) == 2
+	assert names.player_id("boaster") == 5
+	assert names.team_id("FNC") == 3
+
+
+def test_add_players_and_teams(names):
+	names.add_teams([(3, "Fnatic", "FNC")])
+	names.add_players([(5, "Boaster")])
+	assert names.team_id("fnc") == 3
+	assert names.player_id("Boaster") == 5
+
+
+def _search(names, query, **kwargs):
+	return [(candidate.kind, candidate.id) for candidate in names.search(query, **kwargs)]
+
+
+@pytest.mark.parametrize("query, expected", [
+	("tenx", [(PLAYER, 1)]),
+	("Rose", [(PLAYER, 2)]),
+	("sentinals", [(TEAM, 1)]),
+	("sen", [(TEAM, 1)]),
+	("bbl esport", [(TEAM, 2)]),
+	("shroud", []),
+	("", []),
+])
+def test_search_tolerates_typos(names, query, expected):
+	assert _search(names, query) == expected
+
+
+def test_search_ranks_prefixes_first_and_filters_kinds(names):
+	# both Anas start with the query; ties are broken by name
+	assert _search(names, "an") == [(PLAYER, 3), (PLAYER, 4)]
+	assert _search(names, "an", limit=1) == [(PLAYER, 3)]
+	assert _search(names, "sen", kinds=(PLAYER,)) == []
+	# a team matching by name and by abbreviation is listed once, under its name
+	assert [candidate.name for candidate in names.search("bbl")] == ["BBL Esports"]
+
+
+def test_search_sees_added_names(names):
+	names.add_players([(5, "Boaster")])
+	assert _search(names, "boster") == [(PLAYER, 5)]
+
+
+def test_search_is_fast(names):
+	rng = random.Random(0)
+	names.add_players((player_id, "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10)))) for player_id in range(10, 5010))
+	start = time.perf_counter()
+	for _ in range(100):
+		names.search("tenx")
+	assert (time.perf_counter() - start) / 100 < 0.001
@@ -0,0 +1,128 @@
+"""Parser backend parity tests.
+Every backend must turn the saved vlr.gg pages in test/fixtures into
+identical Map/Team/Result objects.
+"""
+import pathlib
+
+import pytest
+
+import fantasyVCT.scraper as scraper
+from fantasyVCT.scraper import Scraper, PARSER_BACKENDS
+import fantasyVCT.database as db
+
+FIXTURES = pathlib.Path(__file__).parent / "fixtures"
+MATCH_IDS = ("25206", "301000")
+RESULT_FIELDS = (
+    "agent", "player_acs", "player_kills", "player_deaths", "player_assists",
+    "player_2k", "player_3k", "player_4k", "player_5k",
+    "player_clutch_v2", "player_clutch_v3", "player_clutch_v4", "player_clutch_v5",
+)
+
+BACKENDS = [
+    pytest.param(b, marks=pytest.mark.skipif(not scraper._backend_available(b), reason=f"{b} not installed"))
+    for b in PARSER_BACKENDS
+]
+
+
+@pytest.fixture
+def backend(request):
+    previous = scraper.get_parser()
+    scraper.set_parser(request.param)
+    yield request.param
+    scraper.set_parser(previous)
+
+
+def _page(match_id, tab):
+    return (FIXTURES / f"match_{match_id}_{tab}.html").read_text()
+
+
+def _snapshot_map(map_):
+    """Flatten a parsed db.Map into comparable tuples."""
+    rows = [(map_.game_id, map_.name)]
+    for team in (map_.team1, map_.team2):
+        rows.append((team.name, team.abbrev, team.score, team.won, team.map_pick))
+        for player in team.players:
+            result = player.results[0]
+            rows.append((player.name,) + tuple(getattr(result, f) for f in RESULT_FIELDS))
+    return rows
+
+
+def _parse_maps_directly(match_id):
+    """Run _parse_map_summary/_parse_map_performance on every map div."""
+    summary = scraper.make_soup(_page(match_id, "summary"))
+    performance = scraper.make_soup(_page(match_id, "performance"))
+    maps = list()
+    for div in summary.find_all("div", {"class": "vm-stats-game"}):
+        if div["data-game-id"] == "all" or "not available" in div.get_text():
+            continue
+        map_ = db.Map(game_id=int(div["data-game-id"]))
+        Scraper._parse_map_summary(div, map_)
+        maps.append(map_)
+    for div in performance.find_all("div", {"class": "vm-stats-game"}):
+        if div["data-game-id"] == "all" or "not available" in div.get_text():
+            continue
+        map_ = next(m for m in maps if m.game_id == int(div["data-game-id"]))
+        Scraper._parse_map_performance(div, map_)
+    return [_snapshot_map(m) for m in maps]
+
+
+def _reference(match_id):
+    previous = scraper.get_parser()
+    scraper.set_parser("html.parser")
+    try:
+        return _parse_maps_directly(match_id)
+    finally:
+        scraper.set_parser(previous)
+
+
+@pytest.mark.parametrize("backend", BACKENDS, indirect=True)
+@pytest.mark.parametrize("match_id", MATCH_IDS)
+def test_map_parsers_match_reference(backend, match_id):
+    assert _parse_maps_directly(match_id) == _reference(match_id)
+
+
+@pytest.mark.parametrize("backend", BACKENDS, indirect=True)
+@pytest.mark.parametrize("match_id", MATCH_IDS)
+def test_build_match_matches_reference(backend, match_id):
+    match = Scraper._build_match(match_id, _page(match_id, "summary"), _page(match_id, "performance"))
+    assert [_snapshot_map(m) for m in match.maps] == _reference(match_id)
+    for map_ in match.maps:
+        for player in map_.team1.players + map_.team2.players:
+            assert player.results[0].game_id == map_.game_id
+            assert player.results[0].map == map_.name
+
+
+@pytest.mark.parametrize("backend", BACKENDS, indirect=True)
+def test_team_page(backend):
+    html = (FIXTURES / "team_188.html").read_text()
+    assert Scraper._build_team(html) == ("Cloud9 Blue", "C9", ["TenZ", "xeta", "mitch", "vanity", "leaf"])
+
+
+def test_reference_is_populated():
+    maps = _reference("301000")
+    assert [m[0] for m in maps] == [(150001, "Ascent"), (150002, "Lotus"), (150003, "Sunset")]
+    assert all(len(m) == 13 for m in maps)
+
+
+@pytest.mark.skipif(not scraper._backend_available("lxml"), reason="lxml not installed")
+def test_lxml_is_default():
+    assert scraper._parser == PARSER_BACKENDS[0] == "lxml"
+
+
+def test_set_parser_rejects_unknown_backend():
+    with pytest.raises(ValueError):
+        scraper.set_parser("html5lib")
+
+
+@pytest.mark.parametrize("backend", BACKENDS, indirect=True)
+def test_match_soup_keeps_only_stats_blocks(backend):
+    soup = scraper.make_match_soup(_page("301000", "summary"))
+    blocks = soup.find_all("div", recursive=False)
+    assert [b["data-game-id"] for b in blocks] == ["all", "150001", "150002", "150003", "150004", "150005"]
+    assert soup.find(id="comments") is None
+    assert soup.find("nav") is None
+
+
+def test_match_soup_without_stats_blocks_is_empty():
+    soup = scraper.make_match_soup("<html><body><div class='post'>hi</div></body></html>")
+    assert soup.find_all("div", {"class": "vm-stats-game"}) == []
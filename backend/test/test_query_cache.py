@@ -0,0 +1,94 @@
+"""Query cache tests: read-through, invalidation by tag, expiry, eviction and
+results read while a write was invalidating them.
+"""
+from fantasyVCT.query_cache import POINTS, PLAYERS, ROSTERS, QueryCache
+
+
+class Loader:
+	def __init__(self, value="reply"):
+		self.value = value
+		self.calls = 0
+
+	def __call__(self):
+		self.calls += 1
+		return self.value
+
+
+def test_read_through():
+	cache = QueryCache()
+	load = Loader()
+	assert cache.fetch(("info", "TenZ"), (POINTS,), load) == "reply"
+	assert cache.fetch(("info", "TenZ"), (POINTS,), load) == "reply"
+	assert load.calls == 1
+	# other parameters are another query
+	cache.fetch(("info", "Zekken"), (POINTS,), load)
+	assert load.calls == 2
+	stats = cache.stats()
+	assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 2, 0.333)
+
+
+def test_invalidate_drops_results_with_any_tag():
+	cache = QueryCache()
+	roster, info = Loader(), Loader()
+	cache.fetch(("roster", 1), (POINTS, ROSTERS), roster)
+	cache.fetch(("info", "TenZ"), (POINTS, PLAYERS), info)
+	cache.invalidate(ROSTERS)
+	cache.fetch(("roster", 1), (POINTS, ROSTERS), roster)
+	cache.fetch(("info", "TenZ"), (POINTS, PLAYERS), info)
+	assert (roster.calls, info.calls) == (2, 1)
+	cache.invalidate()
+	cache.fetch(("info", "TenZ"), (POINTS, PLAYERS), info)
+	assert info.calls == 2
+	assert cache.stats()["invalidations"] == 3
+
+
+def test_results_expire():
+	now = [0.0]
+	cache = QueryCache(ttl=10.0, clock=lambda: now[0])
+	load = Loader()
+	cache.fetch(("rankplayers",), (POINTS,), load)
+	now[0] = 9.9
+	cache.fetch(("rankplayers",), (POINTS,), load)
+	now[0] = 10.0
+	cache.fetch(("rankplayers",), (POINTS,), load)
+	assert load.calls == 2
+	assert cache.stats()["expirations"] == 1
+
+
+def test_least_recently_used_evicted():
+	cache = QueryCache(max_entries=2)
+	loads = {name: Loader() for name in ("a", "b", "c")}
+	cache.fetch(("a",), (POINTS,), loads["a"])
+	cache.fetch(("b",), (POINTS,), loads["b"])
+	cache.fetch(("a",), (POINTS,), loads["a"])
+	cache.fetch(("c",), (POINTS,), loads["c"])
+	cache.fetch(("a",), (POINTS,), loads["a"])
+	cache.fetch(("b",), (POINTS,), loads["b"])
+	assert [loads[name].calls for name in "abc"] == [1, 2, 1]
+	assert cache.stats()["evictions"] == 2
+
+
+def test_result_read_during_invalidation_is_not_stored():
+	cache = QueryCache()
+
+	def load():
+		# an upload commits and invalidates while the reply is being read
+		cache.invalidate(POINTS)
+		return "stale"
+
+	assert cache.fetch(("freeagents",), (POINTS, ROSTERS), load) == "stale"
+	assert cache.fetch(("freeagents",), (POINTS, ROSTERS), Loader("fresh")) == "fresh"
+	# an unrelated write does not stop a result from being stored
+	other = Loader()
+	cache.fetch(("info", "TenZ"), (PLAYERS,), lambda: (cache.invalidate(ROSTERS), other())[1])
+	cache.fetch(("info", "TenZ"), (PLAYERS,), other)
+	assert other.calls == 1
+
+
+def test_str_reports_counters():
+	cache = QueryCache(ttl=300.0, max_entries=8)
+	cache.fetch(("rankplayers",), (POINTS,), Loader())
+	assert str(cache) == (
+		"query cache: 1/8 results, 300s ttl, 0 hits, 1 misses (0.0% hit rate), "
+		"0 expired, 0 invalidated, 0 evictions"
+	)
@@ -0,0 +1,164 @@
+"""Rate limiter / backoff tests, and Fetcher/Scraper retry behaviour.
+No live network required; uses a local stub server and mocks.
+"""
+import email.utils
+import time
+from unittest.mock import patch, MagicMock
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+import fantasyVCT.scraper as scraper
+from fantasyVCT.fetch import Fetcher
+from fantasyVCT.ratelimit import TokenBucket, RateLimiter, parse_retry_after
+from fantasyVCT.scraper import Scraper
+
+
+# ── parse_retry_after ─────────────────────────────────────────────────────────
+
+class TestParseRetryAfter:
+    def test_seconds(self):
+        assert parse_retry_after("7") == 7.0
+
+    def test_http_date(self):
+        value = email.utils.formatdate(time.time() + 30, usegmt=True)
+        assert 25 < parse_retry_after(value) <= 30
+
+    def test_past_date_is_zero(self):
+        assert parse_retry_after("Sat, 10 Apr 2021 18:00:00 GMT") == 0.0
+
+    def test_missing_or_garbage(self):
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("soon") is None
+
+
+# ── TokenBucket ───────────────────────────────────────────────────────────────
+
+class TestTokenBucket:
+    def test_burst_then_paced(self):
+        with patch("fantasyVCT.ratelimit.time.monotonic", return_value=100.0):
+            bucket = TokenBucket(rate=2.0, capacity=2)
+            assert bucket.reserve() == 0.0
+            assert bucket.reserve() == 0.0
+            # callers queue behind each other at 2 requests/sec
+            assert bucket.reserve() == 0.5
+            assert bucket.reserve() == 1.0
+
+    def test_refills_over_time(self):
+        with patch("fantasyVCT.ratelimit.time.monotonic") as clock:
+            clock.return_value = 100.0
+            bucket = TokenBucket(rate=1.0)
+            assert bucket.reserve() == 0.0
+            clock.return_value = 101.0
+            assert bucket.reserve() == 0.0
+
+    def test_capacity_caps_refill(self):
+        with patch("fantasyVCT.ratelimit.time.monotonic") as clock:
+            clock.return_value = 100.0
+            bucket = TokenBucket(rate=1.0, capacity=1)
+            clock.return_value = 1000.0
+            assert bucket.reserve() == 0.0
+            assert bucket.reserve() == 1.0
+
+
+# ── RateLimiter.retry_delay ───────────────────────────────────────────────────
+
+class TestRetryDelay:
+    def test_client_errors_not_retried(self):
+        assert RateLimiter().retry_delay(0, 404) is None
+
+    def test_retries_exhausted(self):
+        assert RateLimiter(retries=2).retry_delay(2, 503) is None
+
+    def test_retry_after_honoured(self):
+        assert RateLimiter().retry_delay(0, 429, "3") == 3.0
+
+    def test_retry_after_capped(self):
+        assert RateLimiter(max_delay=10).retry_delay(0, 429, "600") == 10
+
+    def test_jittered_exponential(self):
+        limiter = RateLimiter(retries=10, base_delay=1.0, max_delay=5.0)
+        for attempt in range(6):
+            delay = limiter.retry_delay(attempt, 503)
+            assert 0 <= delay <= min(5.0, 2 ** attempt)
+
+    def test_connection_error_retried(self):
+        assert RateLimiter().retry_delay(0) is not None
+
+    def test_buckets_are_per_host(self):
+        limiter = RateLimiter(rate=1.0)
+        assert limiter._bucket("https://vlr.gg/1/") is limiter._bucket("https://vlr.gg/2/")
+        assert limiter._bucket("https://vlr.gg/1/") is not limiter._bucket("https://vlrggapi.vercel.app/x")
+
+
+# ── Fetcher retries ───────────────────────────────────────────────────────────
+
+@pytest.fixture
+async def flaky_server():
+    """/throttled answers 429 twice before succeeding; /down is always 503."""
+    calls = {"throttled": 0, "down": 0}
+
+    async def throttled(request):
+        calls["throttled"] += 1
+        if calls["throttled"] <= 2:
+            return web.Response(status=429, headers={"Retry-After": "0"})
+        return web.Response(text="ok")
+
+    async def down(request):
+        calls["down"] += 1
+        return web.Response(status=503)
+
+    app = web.Application()
+    app.router.add_get("/throttled", throttled)
+    app.router.add_get("/down", down)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}", calls
+    await runner.cleanup()
+
+
+async def test_fetcher_retries_429(flaky_server):
+    base, calls = flaky_server
+    async with Fetcher(limiter=RateLimiter(rate=100)) as fetcher:
+        assert await fetcher.fetch_text(base + "/throttled") == "ok"
+    assert calls["throttled"] == 3
+
+
+async def test_fetcher_gives_up(flaky_server):
+    base, calls = flaky_server
+    limiter = RateLimiter(rate=100, retries=2, base_delay=0.01)
+    async with Fetcher(limiter=limiter) as fetcher:
+        with pytest.raises(aiohttp.ClientResponseError) as e:
+            await fetcher.fetch_text(base + "/down")
+    assert e.value.status == 503
+    assert calls["down"] == 3
+
+
+async def test_fetcher_without_limiter_does_not_retry(flaky_server):
+    base, calls = flaky_server
+    async with Fetcher() as fetcher:
+        with pytest.raises(aiohttp.ClientResponseError):
+            await fetcher.fetch_text(base + "/throttled")
+    assert calls["throttled"] == 1
+
+
+# ── blocking path ─────────────────────────────────────────────────────────────
+
+def test_blocking_fetch_retries_with_limiter():
+    limiter = RateLimiter(rate=100)
+    throttled = MagicMock(status_code=429, headers={"Retry-After": "0"})
+    ok = MagicMock(status_code=200, text="ok")
+    scraper.set_rate_limiter(limiter)
+    try:
+        with patch.object(scraper, "_session") as mock_session, \
+             patch.object(limiter, "acquire_sync", wraps=limiter.acquire_sync) as acquire:
+            mock_session.get.side_effect = [throttled, ok]
+            assert Scraper._get_text("https://vlr.gg/1/") == "ok"
+        assert mock_session.get.call_count == 2
+        assert acquire.call_count == 2
+    finally:
+        scraper.set_rate_limiter(None)
@@ -0,0 +1,161 @@
+"""Rescorer tests: background recomputation of a new scoring profile version
+in batches, while commands keep reading the version in use.
+"""
+import random
+from contextlib import contextmanager
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session as SASession
+from sqlalchemy.pool import StaticPool
+
+import fantasyVCT.database as db
+from fantasyVCT.database import Base
+from fantasyVCT.rescore import Rescorer
+from fantasyVCT.scoring import PointCalculator
+
+
+def _result(rng, player_id, game_id):
+	return db.Result(
+		player_id=player_id, game_id=game_id, match_id=game_id, event_id=1, map="Bind", agent="Sova",
+		player_acs=float(rng.randint(50, 400)), player_kills=rng.randint(0, 35),
+		player_deaths=rng.randint(0, 25), player_assists=rng.randint(0, 15),
+		player_2k=rng.randint(0, 8), player_3k=rng.randint(0, 4), player_4k=rng.randint(0, 2),
+		player_5k=rng.randint(0, 1), player_clutch_v2=rng.randint(0, 2), player_clutch_v3=rng.randint(0, 1),
+		player_clutch_v4=rng.randint(0, 1), player_clutch_v5=rng.randint(0, 1),
+	)
+
+
+@pytest.fixture
+def engine():
+	eng = create_engine(
+		"sqlite:///:memory:",
+		connect_args={"check_same_thread": False},
+		poolclass=StaticPool,
+	)
+	Base.metadata.create_all(eng)
+	rng = random.Random(3)
+	with SASession(eng) as s:
+		s.add_all([db.Player(id=pid, name=f"p{pid}") for pid in range(1, 8)])
+		s.add_all([_result(rng, pid, game) for pid in range(1, 8) for game in range(4)])
+		s.flush()
+		PointCalculator.ensure_scores(s)
+		s.commit()
+	yield eng
+	eng.dispose()
+
+
+@pytest.fixture
+def bot(engine):
+	b = MagicMock()
+
+	@contextmanager
+	def make_session():
+		with SASession(engine) as s:
+			yield s
+
+	b.db_manager.create_session = make_session
+	return b
+
+
+def _revise(engine, **weights):
+	with SASession(engine) as s:
+		old = PointCalculator.selected_profile(s).id
+		new = PointCalculator.revise_profile(s, **weights).id
+		s.commit()
+	return old, new
+
+
+def _per_row_totals(session, profile):
+	totals = dict()
+	for result in session.scalars(select(db.Result)):
+		totals[result.player_id] = totals.get(result.player_id, 0) + PointCalculator.score(result, profile)
+	return {pid: round(points, 1) for pid, points in totals.items()}
+
+
+def _stored(engine, profile_id):
+	with SASession(engine) as s:
+		return PointCalculator.stored_totals(s, profile=s.get(db.ScoringProfile, profile_id))
+
+
+async def test_rescore_switches_to_new_version(bot, engine):
+	old, new = _revise(engine, kills=3)
+
+	assert await Rescorer(bot, batch_size=2).run(new)
+
+	profile = bot.set_scoring.call_args[0][0]
+	assert (profile.id, profile.kills, profile.ready) == (new, 3, True)
+	with SASession(engine) as s:
+		assert PointCalculator.stored_totals(s, profile=profile) == _per_row_totals(s, profile)
+		assert s.get(db.ScoringProfile, old).ready is False
+	assert _stored(engine, old) == dict()
+
+
+async def test_switches_before_recomputing_standings(bot, engine):
+	_, new = _revise(engine, kills=3)
+
+	assert await Rescorer(bot).run(new)
+
+	calls = [(name, kwargs.get("profile", args[0] if args else None)) for name, args, kwargs in bot.mock_calls
+		if name in ("set_scoring", "standings.refresh")]
+	assert [name for name, _ in calls] == ["set_scoring", "standings.refresh"]
+	assert all(profile.id == new for _, profile in calls)
+
+
+async def test_old_totals_served_until_done(bot, engine):
+	old, new = _revise(engine, kills=3)
+	before = _stored(engine, old)
+	seen = list()
+	rescorer = Rescorer(bot, batch_size=1)
+	rescore = rescorer._rescore
+
+	def observe(profile_id, player_ids):
+		seen.append(_stored(engine, old))
+		return rescore(profile_id, player_ids)
+
+	rescorer._rescore = observe
+	assert await rescorer.run(new)
+	assert len(seen) == 7
+	assert all(totals == before for totals in seen)
+
+
+async def test_results_added_during_rescore(bot, engine):
+	old, new = _revise(engine, kills=3)
+	rescorer = Rescorer(bot, batch_size=3)
+	rescore = rescorer._rescore
+
+	def upload_between_batches(profile_id, player_ids):
+		done = rescore(profile_id, player_ids)
+		with SASession(engine) as s:
+			result = _result(random.Random(player_ids[0]), 1, 100 + player_ids[0])
+			s.add(result)
+			s.flush()
+			for live in PointCalculator.live_profiles(s):
+				PointCalculator.record_scores(s, {1: {result.game_id: PointCalculator.score(result, live)}}, live)
+			s.commit()
+		return done
+
+	rescorer._rescore = upload_between_batches
+	assert await rescorer.run(new)
+	with SASession(engine) as s:
+		profile = s.get(db.ScoringProfile, new)
+		assert PointCalculator.stored_totals(s, profile=profile) == _per_row_totals(s, profile)
+
+
+async def test_deselected_version_stops(bot, engine):
+	old, new = _revise(engine, kills=3)
+	rescorer = Rescorer(bot, batch_size=2)
+	rescore = rescorer._rescore
+
+	def reselect(profile_id, player_ids):
+		done = rescore(profile_id, player_ids)
+		with SASession(engine) as s:
+			PointCalculator.select_profile(s, "other")
+			s.commit()
+		return done
+
+	rescorer._rescore = reselect
+	assert not await rescorer.run(new)
+	bot.set_scoring.assert_not_called()
+	assert _stored(engine, old) != dict()
@@ -0,0 +1,68 @@
+"""Schema tests: the checked-in init_db.sql is generated from the models, and
+the drift check reports databases that do not match them.
+"""
+import pathlib
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from fantasyVCT.database import Base
+from fantasyVCT.migrations import migrate
+from fantasyVCT.schema import DATABASES, check_schema, generate_ddl
+
+INIT_DB = pathlib.Path(__file__).parents[2] / "db" / "scripts" / "init_db.sql"
+
+
+@pytest.fixture
+def engine():
+	eng = create_engine("sqlite:///:memory:")
+	Base.metadata.create_all(eng)
+	yield eng
+	eng.dispose()
+
+
+def test_init_db_is_generated_from_models():
+	assert INIT_DB.read_text() == generate_ddl(), "regenerate with: python -m fantasyVCT.schema > ../db/scripts/init_db.sql"
+
+
+def test_ddl_creates_every_table_index_and_constraint():
+	ddl = generate_ddl()
+	for database in DATABASES:
+		assert f"USE {database};" in ddl
+	for table in Base.metadata.sorted_tables:
+		assert ddl.count(f"CREATE TABLE IF NOT EXISTS {table.name} (") == len(DATABASES)
+		for index in table.indexes:
+			assert ddl.count(f" INDEX {index.name} ON {table.name} ") == len(DATABASES)
+	assert "\tname VARCHAR(50) NOT NULL,\n\tteam_id INTEGER,\n\tPRIMARY KEY (id),\n\tUNIQUE (name)," in ddl
+	assert "INSERT IGNORE INTO positions" in ddl
+
+
+def test_check_schema_matches_models(engine):
+	assert check_schema(engine) == list()
+
+
+def test_check_schema_reports_drift(engine):
+	with engine.begin() as conn:
+		conn.execute(text("DROP INDEX ix_results_match"))
+		conn.execute(text("DROP TABLE standings"))
+		# players without its unique name constraint
+		conn.execute(text("CREATE TABLE players_old (id INTEGER PRIMARY KEY, name VARCHAR(20) NOT NULL)"))
+		conn.execute(text("DROP TABLE players"))
+		conn.execute(text("ALTER TABLE players_old RENAME TO players"))
+	assert sorted(check_schema(engine)) == [
+		"missing column players.team_id",
+		"missing index on results (match_id)",
+		"missing table standings",
+		"missing unique index on players (name)",
+		"players.name holds 20 characters, the model 50",
+	]
+
+
+def test_migrate_restores_missing_constraints(engine):
+	with engine.begin() as conn:
+		conn.execute(text("CREATE TABLE teams_old (id INTEGER PRIMARY KEY, name VARCHAR(50) NOT NULL, abbrev VARCHAR(10) NOT NULL, region VARCHAR(10))"))
+		conn.execute(text("DROP TABLE teams"))
+		conn.execute(text("ALTER TABLE teams_old RENAME TO teams"))
+	assert check_schema(engine) == ["missing unique index on teams (abbrev)", "missing unique index on teams (name)"]
+	migrate(engine)
+	assert check_schema(engine) == list()
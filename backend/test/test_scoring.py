@@ -1,6 +1,13 @@
+import random
+import sys
+
+import numpy as np
 import pytest
-from fantasyVCT.scoring import PointCalculator, Cache
-from fantasyVCT.database import Result
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from fantasyVCT.scoring import PointCalculator, Cache, DEFAULT_PROFILE, MISSING, STAT_COLUMNS, round_points
+from fantasyVCT.database import Base, Player, PlayerScore, PlayerTotal, Result, ScoringProfile
 
 
 def make_result(**kwargs):
@@ -62,6 +69,19 @@ class TestPointCalculator:
         assert base == 26.0
         assert round(base * 1.2, 1) == 31.2
 
+    @pytest.mark.parametrize("points,expected", [
+        (87.25, 87.3),
+        (9.55, 9.6),
+        (0.15, 0.2),
+        (0.05, 0.1),
+        (-0.05, -0.1),
+        (-2.25, -2.3),
+        (-0.04, 0.0),
+        (12.34, 12.3),
+    ])
+    def test_round_points_ties_away_from_zero(self, points, expected):
+        assert round_points(points) == expected
+
     def test_score_rounds_to_one_decimal(self):
         # 1 assist = 0.5, ensures rounding is applied
         r = make_result(player_assists=1)
@@ -69,6 +89,167 @@ class TestPointCalculator:
         assert result == round(result, 1)
 
 
+# --- SQL aggregation ---
+
+def random_result(rng, player_id, game_id):
+    return make_result(
+        player_id=player_id, game_id=game_id, match_id=game_id, event_id=1, map="Bind", agent="Sova",
+        player_acs=float(rng.randint(50, 400)), player_kills=rng.randint(0, 35),
+        player_deaths=rng.randint(0, 25), player_assists=rng.randint(0, 15),
+        player_2k=rng.randint(0, 8), player_3k=rng.randint(0, 4), player_4k=rng.randint(0, 2),
+        player_5k=rng.randint(0, 1), player_clutch_v2=rng.randint(0, 2), player_clutch_v3=rng.randint(0, 1),
+        player_clutch_v4=rng.randint(0, 1), player_clutch_v5=rng.randint(0, 1),
+    )
+
+
+@pytest.fixture
+def scored_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    rng = random.Random(7)
+    with Session(engine) as session:
+        session.add_all([Player(id=pid, name=f"p{pid}") for pid in range(1, 21)])
+        session.add_all([random_result(rng, pid, game) for pid in range(1, 21) for game in range(15)])
+        session.commit()
+        yield session
+    engine.dispose()
+
+
+def per_row_totals(session, *criteria, profile=None):
+    """Each player's total points, summed from score() of every result row."""
+    totals = dict()
+    for result in session.scalars(select(Result).where(*criteria)):
+        totals[result.player_id] = totals.get(result.player_id, 0) + PointCalculator.score(result, profile)
+    return {pid: round(points, 1) for pid, points in totals.items()}
+
+
+class TestMaterializedScores:
+
+    def test_rebuild_matches_per_row_scoring(self, scored_session):
+        assert PointCalculator.rebuild_scores(scored_session) == 300
+        assert PointCalculator.stored_totals(scored_session) == per_row_totals(scored_session)
+
+    def test_players_without_results_absent(self, scored_session):
+        scored_session.add(Player(id=99, name="benched"))
+        scored_session.flush()
+        PointCalculator.rebuild_scores(scored_session)
+        assert 99 not in PointCalculator.stored_totals(scored_session)
+
+    def test_rebuild_per_game_scores(self, scored_session):
+        PointCalculator.rebuild_scores(scored_session)
+        expected = {(r.player_id, r.game_id): PointCalculator.score(r) for r in scored_session.scalars(select(Result))}
+        stored = {(s.player_id, s.game_id): s.points for s in scored_session.scalars(select(PlayerScore))}
+        assert stored == expected
+
+    def test_record_adds_to_running_totals(self, scored_session):
+        PointCalculator.rebuild_scores(scored_session)
+        before = PointCalculator.stored_totals(scored_session)
+        scored_session.add(Player(id=21, name="rookie"))
+        scored_session.add_all([random_result(random.Random(1), pid, 100) for pid in (3, 21)])
+        scored_session.flush()
+        new_results = scored_session.scalars(select(Result).where(Result.game_id == 100)).all()
+        new_scores = {r.player_id: {r.game_id: PointCalculator.score(r)} for r in new_results}
+
+        assert PointCalculator.record_scores(scored_session, new_scores) == 2
+        after = PointCalculator.stored_totals(scored_session)
+        assert after[3] == round(before[3] + new_scores[3][100], 1)
+        assert after[21] == new_scores[21][100]
+        assert after == per_row_totals(scored_session)
+        assert scored_session.scalars(select(PlayerTotal.games).where(PlayerTotal.player_id == 3)).one() == 16
+
+    def test_record_nothing(self, scored_session):
+        assert PointCalculator.record_scores(scored_session, dict()) == 0
+        assert PointCalculator.stored_totals(scored_session) == dict()
+
+    def test_ensure_rebuilds_only_when_stale(self, scored_session):
+        assert PointCalculator.ensure_scores(scored_session)
+        assert not PointCalculator.ensure_scores(scored_session)
+        scored_session.add(random_result(random.Random(2), 1, 200))
+        scored_session.flush()
+        assert PointCalculator.ensure_scores(scored_session)
+        assert PointCalculator.stored_totals(scored_session) == per_row_totals(scored_session)
+
+    def test_totals_survive_new_session(self, scored_session):
+        PointCalculator.rebuild_scores(scored_session)
+        scored_session.commit()
+        expected = PointCalculator.stored_totals(scored_session)
+        with Session(scored_session.get_bind()) as restarted:
+            assert PointCalculator.stored_totals(restarted) == expected
+
+    def test_stored_totals_criteria(self, scored_session):
+        PointCalculator.rebuild_scores(scored_session)
+        assert set(PointCalculator.stored_totals(scored_session, PlayerTotal.player_id.in_([3, 4]))) == {3, 4}
+
+
+class TestScoringProfiles:
+
+    def test_default_profile_uses_module_weights(self, scored_session):
+        profile = PointCalculator.selected_profile(scored_session)
+        assert (profile.name, profile.version, profile.selected) == (DEFAULT_PROFILE, 1, True)
+        result = scored_session.scalars(select(Result)).first()
+        assert PointCalculator.score(result, profile) == PointCalculator.score(result)
+        assert PointCalculator.selected_profile(scored_session) is profile
+
+    def test_profile_scoring_paths_agree(self, scored_session):
+        PointCalculator.selected_profile(scored_session)
+        profile = PointCalculator.revise_profile(scored_session, kills=3, acs=0.1, clutch_v5=10)
+        results = scored_session.scalars(select(Result).order_by(Result.id)).all()
+        scalar = [PointCalculator.score(r, profile) for r in results]
+        assert scalar != [PointCalculator.score(r) for r in results]
+        assert PointCalculator.score_batch(PointCalculator.stats_block(results), profile).tolist() == scalar
+
+    def test_revise_creates_selected_version(self, scored_session):
+        first = PointCalculator.selected_profile(scored_session)
+        second = PointCalculator.revise_profile(scored_session, kills=3)
+        assert (second.name, second.version, second.kills) == (DEFAULT_PROFILE, 2, 3)
+        assert second.deaths == first.deaths
+        assert first.kills == 2
+        assert (first.selected, second.selected) == (False, True)
+        assert PointCalculator.selected_profile(scored_session) is second
+
+    def test_revise_unknown_weight(self, scored_session):
+        with pytest.raises(ValueError):
+            PointCalculator.revise_profile(scored_session, headshots=1)
+
+    def test_select_new_name_copies_weights(self, scored_session):
+        PointCalculator.revise_profile(scored_session, kills=3)
+        profile = PointCalculator.select_profile(scored_session, "league")
+        assert (profile.name, profile.version, profile.kills, profile.selected) == ("league", 1, 3, True)
+        assert PointCalculator.select_profile(scored_session, DEFAULT_PROFILE).version == 2
+
+    def test_versions_materialized_separately(self, scored_session):
+        old = PointCalculator.selected_profile(scored_session)
+        PointCalculator.rebuild_scores(scored_session, old)
+        new = PointCalculator.revise_profile(scored_session, kills=3)
+        PointCalculator.rebuild_scores(scored_session, new)
+        assert PointCalculator.stored_totals(scored_session, profile=old) == per_row_totals(scored_session)
+        assert PointCalculator.stored_totals(scored_session, profile=new) == per_row_totals(scored_session, profile=new)
+        assert PointCalculator.stored_totals(scored_session) == PointCalculator.stored_totals(scored_session, profile=new)
+
+        PointCalculator.prune_scores(scored_session, new)
+        assert PointCalculator.stored_totals(scored_session, profile=old) == dict()
+        assert scored_session.get(ScoringProfile, old.id).ready is False
+
+    def test_rebuild_selected_players(self, scored_session):
+        old = PointCalculator.selected_profile(scored_session)
+        PointCalculator.rebuild_scores(scored_session, old)
+        new = PointCalculator.revise_profile(scored_session, kills=3)
+        PointCalculator.rebuild_scores(scored_session, new)
+        new.kills = 4
+        assert PointCalculator.rebuild_scores(scored_session, new, [1, 2]) == 30
+        totals = PointCalculator.stored_totals(scored_session, profile=new)
+        expected = per_row_totals(scored_session, profile=new)
+        assert {pid: totals[pid] for pid in (1, 2)} == {pid: expected[pid] for pid in (1, 2)}
+        assert totals[3] != expected[3]
+        assert PointCalculator.stored_totals(scored_session, profile=old) == per_row_totals(scored_session)
+
+    def test_live_profiles(self, scored_session):
+        old = PointCalculator.selected_profile(scored_session)
+        PointCalculator.ensure_scores(scored_session, old)
+        new = PointCalculator.revise_profile(scored_session, kills=3)
+        assert {p.id for p in PointCalculator.live_profiles(scored_session)} == {old.id, new.id}
+
+
 # --- Cache ---
 
 class TestCache:
@@ -139,6 +320,98 @@ class TestCache:
         # total must reflect all three games, not the stale 18.0
         assert cache.retrieve_total(1) == 60.0
 
+    def test_invalidate_selected_players(self):
+        cache = Cache()
+        cache.store(1, 101, 10.0)
+        cache.store(2, 101, 20.0)
+        cache.retrieve_total(1)
+        cache.retrieve_total(2)
+        cache.invalidate([2, 99])
+        assert cache.retrieve(1)[-1] == 10.0
+        assert cache.retrieve(2)[-1] is None
+
+    def test_forget_drops_players_and_their_budget(self):
+        cache = Cache()
+        cache.store(1, 101, 10.0)
+        cache.store(2, 101, 20.0)
+        cache.forget([1, 99])
+        assert not cache.contains(1, 101)
+        assert cache.retrieve_total(2) == 20.0
+        stats = cache.stats()
+        assert (stats["players"], stats["entries"]) == (1, 1)
+
+    def test_update_adds_to_current_total(self):
+        cache = Cache()
+        cache.store(1, 101, 11.2)
+        cache.store(1, 102, 8.1)
+        cache.retrieve_total(1)
+        assert cache.update({1: {103: 42.4, 104: 23.9}}) == 1
+        # total is kept current, not cleared
+        assert cache.retrieve(1)[-1] == 85.6
+        assert cache.retrieve(1, 103) == 42.4
+        assert cache.retrieve_total(1) == 85.6
+
+    def test_update_replaces_existing_game(self):
+        cache = Cache()
+        cache.store(1, 101, 10.0)
+        cache.store(1, 102, 5.0)
+        cache.retrieve_total(1)
+        cache.update({1: {102: 7.5}})
+        assert cache.retrieve_total(1) == 17.5
+
+    def test_update_with_stale_total_recalculates(self):
+        cache = Cache()
+        cache.store(1, 101, 10.0)
+        cache.update({1: {102: 5.0}})
+        assert cache.retrieve(1)[-1] is None
+        assert cache.retrieve_total(1) == 15.0
+
+    def test_update_skips_uncached_players(self):
+        cache = Cache()
+        cache.store(1, 101, 10.0)
+        assert cache.update({1: {102: 1.0}, 2: {102: 3.0}}) == 1
+        assert cache.retrieve(2) is None
+
+    def test_update_leaves_other_players_alone(self):
+        cache = Cache()
+        cache.store(1, 101, 10.0)
+        cache.store(2, 101, 20.0)
+        cache.retrieve_total(1)
+        cache.retrieve_total(2)
+        cache.update({1: {102: 1.0}})
+        assert cache.retrieve(2)[-1] == 20.0
+
+    def test_zero_score_is_a_hit(self):
+        cache = Cache()
+        cache.store(1, 101, 0.0)
+        assert cache.contains(1, 101)
+        assert cache.retrieve(1, 101) == 0.0
+        assert cache.retrieve(1, 101, MISSING) == 0.0
+        assert cache.misses == 0
+
+    def test_contains_miss(self):
+        cache = Cache()
+        assert not cache.contains(1, 101)
+        cache.store(1, 101, 2.0)
+        assert not cache.contains(1, 102)
+        assert cache.retrieve(1, 102, MISSING) is MISSING
+
+    def test_game_id_zero_is_a_key(self):
+        cache = Cache()
+        cache.store(1, 0, 3.0)
+        assert cache.contains(1, 0)
+        assert cache.retrieve(1, 0) == 3.0
+
+    def test_zero_total_not_recalculated(self):
+        cache = Cache()
+        cache.store(1, 101, 1.5)
+        cache.store(1, 102, -1.5)
+        assert cache.retrieve_total(1) == 0.0
+        misses = cache.misses
+        assert cache.retrieve_total(1) == 0.0
+        assert cache.misses == misses
+        assert cache.hits == 1
+
     def test_stale_total_not_returned_after_new_game(self):
         # Simulates the upload → retrieve_total → store new game → retrieve_total
         # sequence that triggered the !info and !standings stale total bug.
@@ -153,3 +426,138 @@ class TestCache:
         cache.store(1, 104, 23.9)
         # must return full total, not the stale 19.3
         assert cache.retrieve_total(1) == 85.6
+
+
+# --- Batch scoring ---
+
+class TestScoreBatch:
+
+    def test_matches_score_on_every_row(self):
+        rng = random.Random(11)
+        results = [random_result(rng, 1, game) for game in range(2000)]
+        scores = PointCalculator.score_batch(PointCalculator.stats_block(results))
+        assert scores.tolist() == [PointCalculator.score(r) for r in results]
+
+    def test_ties_round_like_score(self):
+        # 87.25 and 9.55 are ties that round() would send different ways
+        results = [
+            make_result(player_acs=5),                                        # 0.25 -> 0.3
+            make_result(player_acs=191),                                      # 9.55 -> 9.6
+            make_result(player_acs=1745),                                     # 87.25 -> 87.3
+            make_result(player_acs=1, player_deaths=1),                       # -0.95 -> -1.0
+            make_result(player_acs=19, player_deaths=1),                      # -0.05 -> -0.1
+        ]
+        scores = PointCalculator.score_batch(PointCalculator.stats_block(results))
+        assert scores.tolist() == [PointCalculator.score(r) for r in results] == [0.3, 9.6, 87.3, -1.0, -0.1]
+
+    def test_columnar_dict(self):
+        rng = random.Random(3)
+        results = [random_result(rng, 1, game) for game in range(50)]
+        columns = {key: [getattr(r, key) for r in results] for key in STAT_COLUMNS}
+        assert PointCalculator.score_batch(columns).tolist() == [PointCalculator.score(r) for r in results]
+
+    def test_empty_block(self):
+        assert PointCalculator.score_batch(PointCalculator.stats_block([])).shape == (0,)
+
+    def test_wrong_shape_raises(self):
+        with pytest.raises(ValueError):
+            PointCalculator.score_batch(np.zeros((3, 5)))
+
+
+# --- Cache budget ---
+
+class TestCacheVersion:
+
+    def test_set_version_drops_scores(self):
+        cache = Cache()
+        cache.set_version(1)
+        cache.store(1, 101, 4.0)
+        cache.set_version(1)
+        assert cache.contains(1, 101)
+        cache.set_version(2)
+        assert not cache.contains(1, 101)
+        assert cache.stats()["entries"] == 0
+
+    def test_update_ignores_other_versions(self):
+        cache = Cache()
+        cache.set_version(2)
+        cache.store(1, 101, 4.0)
+        cache.retrieve_total(1)
+        assert cache.update({1: {102: 1.0}}, version=1) == 0
+        assert cache.update({1: {102: 1.0}}, version=2) == 1
+        assert cache.retrieve_total(1) == 5.0
+
+
+class TestCacheBudget:
+
+    def test_evicts_least_recently_used_player(self):
+        cache = Cache(max_entries=4)
+        for pid in (1, 2):
+            cache.store(pid, 101, 1.0)
+            cache.store(pid, 102, 2.0)
+        cache.retrieve_total(1)           # player 1 is now most recently used
+        cache.store(3, 101, 3.0)
+        assert cache.retrieve(2) is None
+        assert cache.retrieve_total(1) == 3.0
+        assert cache.retrieve(3, 101) == 3.0
+        assert cache.evictions == 1
+
+    def test_evicts_whole_players(self):
+        cache = Cache(max_entries=3)
+        cache.store(1, 101, 1.0)
+        cache.store(1, 102, 2.0)
+        cache.store(2, 101, 5.0)
+        cache.store(2, 102, 5.0)
+        # player 1 is dropped entirely rather than left with a partial total
+        assert cache.retrieve(1) is None
+        assert cache.stats()["entries"] == 2
+
+    def test_keeps_most_recent_player_over_budget(self):
+        cache = Cache(max_entries=1)
+        cache.store(1, 101, 1.0)
+        cache.store(1, 102, 2.0)
+        assert cache.retrieve_total(1) == 3.0
+
+    def test_byte_budget(self):
+        cache = Cache(max_bytes=4096)
+        for pid in range(100):
+            cache.store(pid, 101, 1.0)
+        stats = cache.stats()
+        assert 0 < stats["bytes"] <= 4096
+        assert stats["players"] < 100
+        assert stats["evictions"] == 100 - stats["players"]
+
+    def test_accounting_follows_updates(self):
+        cache = Cache()
+        cache.store(1, 101, 1.0)
+        cache.retrieve_total(1)
+        cache.update({1: {102: 2.0, 103: 3.0}})
+        assert cache.stats()["entries"] == 3
+
+    def test_running_size_matches_recount(self):
+        cache = Cache()
+        for game in range(100, 140):
+            cache.store(1, game, game / 10)
+        cache.store(2, 101, 1)
+        cache.retrieve_total(1)
+        cache.update({1: {100: 0.5, 200: 3.0}, 2: {102: 2.0}})
+        cache.invalidate([2])
+        recount = sum(
+            sys.getsizeof(scores) + sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in scores.items())
+            for scores in cache._store.values()
+        )
+        assert cache.stats()["bytes"] == recount
+        assert cache.stats()["entries"] == 41 + 2
+
+    def test_hit_miss_counters(self):
+        cache = Cache()
+        cache.retrieve(1, 101)            # miss: unknown player
+        cache.store(1, 101, 4.0)
+        cache.retrieve(1, 101)            # hit
+        cache.retrieve(1, 102)            # miss: unknown game
+        cache.retrieve_total(1)           # miss: total recalculated
+        cache.retrieve_total(1)           # hit
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"]) == (2, 3)
+        assert stats["hit_rate"] == 0.4
+        assert "2 hits, 3 misses" in str(cache)
@@ -1,6 +1,8 @@
 """P3 — Scraper unit/edge-case tests.
 No live network required; uses crafted HTML and mocks.
 """
+import pathlib
+
 import pytest
 from unittest.mock import patch
 from bs4 import BeautifulSoup
@@ -9,6 +11,9 @@ from fantasyVCT.scraper import Scraper
 import fantasyVCT.database as db
 
 
+FIXTURES = pathlib.Path(__file__).parent / "fixtures"
+
+
 # ── Helpers ───────────────────────────────────────────────────────────────────
 
 def _perf_row(name, abbrev="SEN", stats=None):
@@ -59,6 +64,23 @@ class TestInvalidMatchId:
             Scraper.parse_match("123abc")
 
 
+# ── parse_match ───────────────────────────────────────────────────────────────
+
+class TestParseMatch:
+    def test_merges_both_tabs(self):
+        def get_text(url):
+            tab = "performance" if "tab=performance" in url else "summary"
+            return (FIXTURES / f"match_25206_{tab}.html").read_text()
+
+        with patch.object(Scraper, "_get_text", side_effect=get_text) as mock_get:
+            match = Scraper.parse_match("25206")
+        assert mock_get.call_count == 2
+        hiko = match.maps[1].team1.get_player("Hiko")
+        assert hiko.results[0].agent == "viper"
+        assert hiko.results[0].game_id == 47002
+        assert hiko.results[0].map == "Breeze"
+
+
 # ── _parse_player_performance ─────────────────────────────────────────────────
 
 class TestParsePlayerPerformance:
@@ -0,0 +1,230 @@
+"""Standings snapshot tests: refreshing only affected teams, ranking,
+persistence across restarts and the rendered output.
+"""
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import create_engine, event, select, text
+from sqlalchemy.orm import Session as SASession
+
+import fantasyVCT.database as db
+from fantasyVCT.database import Base
+from fantasyVCT.interactions import POSITIONS
+from fantasyVCT.scoring import PointCalculator
+from fantasyVCT.standings import Standings, select_history, team_points
+from fantasyVCT.transactions import backfill
+
+
+def _result(player, game_id, kills):
+	return db.Result(player=player, game_id=game_id, match_id=game_id, map="Haven", event_id=1, agent="Jett",
+		player_acs=0, player_kills=kills, player_deaths=0, player_assists=0,
+		player_2k=0, player_3k=0, player_4k=0, player_5k=0,
+		player_clutch_v2=0, player_clutch_v3=0, player_clutch_v4=0, player_clutch_v5=0)
+
+
+@pytest.fixture
+def engine():
+	"""Three fantasy teams of two players each. Player kills (points / 2):
+	A: captain 10, active 5    B: captain 1, active 20    C: captain 5, active 10
+	"""
+	eng = create_engine("sqlite:///:memory:")
+	Base.metadata.create_all(eng)
+	with SASession(eng) as s:
+		s.add_all([db.Position(id=pos_id, position=pos_name) for pos_id, pos_name in POSITIONS.items()])
+		for abbrev, kills in (("A", (10, 5)), ("B", (1, 20)), ("C", (5, 10))):
+			fteam = db.FantasyTeam(name=f"Team{abbrev}", abbrev=abbrev)
+			for position, player_kills in enumerate(kills):
+				player = db.Player(name=f"{abbrev}{position}", team=db.Team(name=f"Pro{abbrev}{position}", abbrev=f"P{abbrev}{position}", region="na"))
+				s.add(_result(player, len(abbrev) * 100 + position, player_kills))
+				s.add(db.FantasyPlayer(player=player, fantasyteam=fteam, position=position))
+		s.flush()
+		PointCalculator.rebuild_scores(s)
+		backfill(s)
+		s.commit()
+	yield eng
+	eng.dispose()
+
+
+def _team_id(session, abbrev):
+	return session.scalars(select(db.FantasyTeam.id).filter_by(abbrev=abbrev)).one()
+
+
+def _selects(engine):
+	statements = list()
+
+	def record(conn, cursor, statement, *_):
+		if statement.lstrip().upper().startswith("SELECT"):
+			statements.append(statement)
+
+	event.listen(engine, "before_cursor_execute", record)
+	return statements
+
+
+def test_refresh_ranks_and_renders(engine):
+	standings = Standings()
+	with SASession(engine) as s:
+		standings.refresh(s)
+		s.commit()
+		ids = {abbrev: _team_id(s, abbrev) for abbrev in "ABC"}
+		rows = {row.fantasy_team_id: row for row in s.scalars(select(db.Standing))}
+
+	# A: 20*1.2 + 10 = 34; B: 2*1.2 + 40 = 42.4, optimal 40*1.2 + 2 = 50; C: 10*1.2 + 20 = 32, optimal 20*1.2 + 10 = 34
+	assert {abbrev: (rows[i].points, rows[i].optimal, rows[i].rank) for abbrev, i in ids.items()} == {
+		"A": (34.0, 34.0, 2), "B": (42.4, 50.0, 1), "C": (32.0, 34.0, 2),
+	}
+	text = standings.render()
+	assert text.index("B / TeamB - 50.0*") < text.index("A / TeamA - 34.0\n") < text.index("C / TeamC - 34.0*")
+	assert "Optimized score shown" in text
+
+
+def test_players_changed_refreshes_only_owning_teams(engine):
+	standings = Standings()
+	with SASession(engine) as s:
+		standings.refresh(s)
+		s.commit()
+		a, b = _team_id(s, "A"), _team_id(s, "B")
+		a1 = s.scalars(select(db.Player.id).filter_by(name="A1")).one()
+		c1 = s.scalars(select(db.Player.id).filter_by(name="C1")).one()
+
+		# new games for A1 and C1, but only A1's is materialized: C is not
+		# refreshed, so its stale total must not show up
+		s.add(_result(s.get(db.Player, a1), 900, 30))
+		s.add(_result(s.get(db.Player, c1), 901, 30))
+		s.flush()
+		PointCalculator.record_scores(s, {a1: {900: 60.0}})
+		assert standings.players_changed(s, [a1]) == [a]
+		s.commit()
+
+		rows = {row.fantasy_team_id: row for row in s.scalars(select(db.Standing))}
+	# A: 20*1.2 + 70 = 94, optimal 70*1.2 + 20 = 104
+	assert (rows[a].points, rows[a].optimal, rows[a].rank) == (94.0, 104.0, 1)
+	assert rows[b].rank == 2
+	assert standings.render().startswith("```\nStandings\n\n\tA / TeamA - 104.0*")
+
+
+def test_snapshot_changes_only_when_session_commits(engine):
+	standings = Standings()
+	with SASession(engine) as s:
+		standings.refresh(s)
+		s.commit()
+		before = standings.render()
+		a1 = s.scalars(select(db.Player.id).filter_by(name="A1")).one()
+		s.add(_result(s.get(db.Player, a1), 900, 30))
+		s.flush()
+		PointCalculator.record_scores(s, {a1: {900: 60.0}})
+		standings.players_changed(s, [a1], match_id=900)
+		# written to the session, but not to the shared snapshot until it commits
+		assert standings.render() == before
+		s.rollback()
+	assert standings.render() == before
+
+	with SASession(engine) as s:
+		s.add(_result(s.get(db.Player, a1), 900, 30))
+		s.flush()
+		PointCalculator.record_scores(s, {a1: {900: 60.0}})
+		standings.players_changed(s, [a1], match_id=900)
+		assert standings.render() == before
+		s.commit()
+	assert standings.render().startswith("```\nStandings\n\n\tA / TeamA - 104.0*")
+
+
+def test_players_changed_without_fantasy_team(engine):
+	standings = Standings()
+	with SASession(engine) as s:
+		standings.refresh(s)
+		free = db.Player(name="free")
+		s.add(free)
+		s.flush()
+		statements = _selects(engine)
+		assert standings.players_changed(s, [free.id]) == list()
+		assert len(statements) == 1
+
+
+def test_players_changed_appends_history(engine):
+	standings = Standings()
+	with SASession(engine) as s:
+		standings.refresh(s)
+		a, b = _team_id(s, "A"), _team_id(s, "B")
+		a1 = s.scalars(select(db.Player.id).filter_by(name="A1")).one()
+		b1 = s.scalars(select(db.Player.id).filter_by(name="B1")).one()
+
+		s.add(_result(s.get(db.Player, a1), 900, 30))
+		s.flush()
+		PointCalculator.record_scores(s, {a1: {900: 60.0}})
+		standings.players_changed(s, [a1], match_id=900)
+		# without a match id nothing is recorded
+		standings.players_changed(s, [b1])
+		s.add(_result(s.get(db.Player, b1), 901, 1))
+		s.flush()
+		PointCalculator.record_scores(s, {b1: {901: 2.0}})
+		standings.players_changed(s, [b1], match_id=901)
+		s.commit()
+
+		rows = list(s.scalars(select(db.PointsHistory).order_by(db.PointsHistory.id)))
+	assert [(row.fantasy_team_id, row.match_id, row.points, row.optimal, row.rank) for row in rows] == [
+		(a, 900, 94.0, 104.0, 1),
+		(b, 901, 44.4, 52.4, 2),
+	]
+
+
+def test_select_history_by_match_and_date(engine):
+	with SASession(engine) as s:
+		a, b = _team_id(s, "A"), _team_id(s, "B")
+		for team_id in (a, b):
+			for day, match_id in ((1, 10), (2, 20), (2, 30), (5, 40)):
+				s.add(db.PointsHistory(fantasy_team_id=team_id, match_id=match_id, recorded_at=datetime(2024, 6, day, 23, 30),
+					points=match_id, optimal=match_id, rank=1))
+		s.commit()
+
+		def matches(since=None, until=None):
+			return [row.match_id for row in s.scalars(select_history(a, since, until))]
+
+		assert matches() == [10, 20, 30, 40]
+		assert matches(20, 30) == [20, 30]
+		assert matches(since=25) == [30, 40]
+		assert matches(date(2024, 6, 2), date(2024, 6, 2)) == [20, 30]
+		assert matches(until=date(2024, 6, 1)) == [10]
+		assert matches(date(2024, 6, 2), 30) == [20, 30]
+
+		plan = " ".join(str(row) for row in s.execute(text("EXPLAIN QUERY PLAN " + str(
+			select_history(a, 20, 30).compile(compile_kwargs={"literal_binds": True})
+		))))
+	assert "ix_points_history_team_match" in plan
+
+
+def test_load_reads_persisted_snapshot(engine):
+	with SASession(engine) as s:
+		Standings().refresh(s)
+		s.commit()
+		expected = Standings()
+		expected.refresh(s)
+		s.commit()
+
+	restarted = Standings()
+	statements = _selects(engine)
+	with SASession(engine) as s:
+		restarted.load(s)
+		s.commit()
+	assert len(statements) == 1
+	assert restarted.loaded
+	assert restarted.render() == expected.render()
+
+
+def test_load_computes_missing_teams(engine):
+	with SASession(engine) as s:
+		Standings().refresh(s)
+		s.add(db.FantasyTeam(name="Late", abbrev="L"))
+		s.commit()
+
+	standings = Standings()
+	with SASession(engine) as s:
+		standings.load(s)
+		s.commit()
+		assert s.scalars(select(db.Standing.rank).join(db.FantasyTeam).filter_by(abbrev="L")).one() == 4
+	assert "L / Late - 0.0" in standings.render()
+
+
+def test_team_points_sums_counted_points():
+	# dropped players keep what they earned, subs count nothing
+	assert team_points({1: (10.0, 12.0), 2: (10.0, 10.0), 3: (7.0, 0.0)}) == 22.0
+	assert team_points(dict()) == 0.0
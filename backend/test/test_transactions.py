@@ -0,0 +1,103 @@
+"""Roster transaction log tests: stints opened by draft, set and drop, and team
+points counting only results uploaded while a player held an active slot.
+"""
+import pytest
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import Session as SASession
+
+import fantasyVCT.database as db
+from fantasyVCT.database import Base
+from fantasyVCT.interactions import POSITIONS
+from fantasyVCT.scoring import PointCalculator
+from fantasyVCT.standings import Standings
+from fantasyVCT.transactions import DRAFT, DROP, SET, backfill, log_moves, rostered_points, select_stints
+
+
+@pytest.fixture
+def session():
+	eng = create_engine("sqlite:///:memory:")
+	Base.metadata.create_all(eng)
+	with SASession(eng) as s:
+		s.add_all([db.Position(id=pos_id, position=pos_name) for pos_id, pos_name in POSITIONS.items()])
+		s.add_all([db.FantasyTeam(id=1, name="TeamA", abbrev="A"), db.FantasyTeam(id=2, name="TeamB", abbrev="B")])
+		s.add_all([db.Player(id=player_id, name=f"p{player_id}") for player_id in (1, 2)])
+		s.commit()
+		yield s
+	eng.dispose()
+
+
+def _upload(session, player_id, game_id, kills):
+	"""Store one game for a player, 2 points per kill."""
+	session.add(db.Result(player_id=player_id, game_id=game_id, match_id=game_id, map="Haven", event_id=1, agent="Jett",
+		player_acs=0, player_kills=kills, player_deaths=0, player_assists=0,
+		player_2k=0, player_3k=0, player_4k=0, player_5k=0,
+		player_clutch_v2=0, player_clutch_v3=0, player_clutch_v4=0, player_clutch_v5=0))
+	session.flush()
+	PointCalculator.record_scores(session, {player_id: {game_id: kills * 2.0}})
+
+
+def test_pickup_does_not_count_earlier_games(session):
+	_upload(session, 1, 100, 10)
+	log_moves(session, [(DRAFT, 1, 1, 1)])
+	_upload(session, 1, 101, 5)
+	assert rostered_points(session) == {1: {1: (10.0, 10.0)}}
+
+
+def test_slots_apply_to_later_games_only(session):
+	log_moves(session, [(DRAFT, 1, 1, 6)])
+	_upload(session, 1, 100, 10)
+	log_moves(session, [(SET, 1, 1, 0)])
+	_upload(session, 1, 101, 5)
+	log_moves(session, [(SET, 1, 1, 3)])
+	_upload(session, 1, 102, 1)
+	# 20 as a sub, 10 as captain, 2 as an active player
+	assert rostered_points(session) == {1: {1: (32.0, 14.0)}}
+
+
+def test_drop_keeps_earned_points_and_stops_counting(session):
+	log_moves(session, [(DRAFT, 1, 1, 1)])
+	_upload(session, 1, 100, 10)
+	log_moves(session, [(DROP, 1, 1, None)])
+	_upload(session, 1, 101, 5)
+	log_moves(session, [(DRAFT, 2, 1, 0)])
+	_upload(session, 1, 102, 1)
+	assert rostered_points(session) == {1: {1: (20.0, 20.0)}, 2: {1: (2.0, 2.4)}}
+	assert rostered_points(session, [2]) == {2: {1: (2.0, 2.4)}}
+
+
+def test_standings_count_dropped_players(session):
+	dropped = db.FantasyPlayer(player_id=1, fantasy_team_id=1, position=1)
+	session.add_all([dropped, db.FantasyPlayer(player_id=2, fantasy_team_id=1, position=2)])
+	log_moves(session, [(DRAFT, 1, 1, 1), (DRAFT, 1, 2, 2)])
+	_upload(session, 1, 100, 10)
+	_upload(session, 2, 101, 5)
+	session.delete(dropped)
+	session.flush()
+	log_moves(session, [(DROP, 1, 1, None)])
+
+	standings = Standings()
+	standings.refresh(session, [1])
+	rows = {row.fantasy_team_id: row for row in session.scalars(select(db.Standing))}
+	# p1 keeps its 20 points; p2 would be worth 12 as captain
+	assert (rows[1].points, rows[1].optimal) == (30.0, 32.0)
+
+
+def test_backfill_logs_rosters_without_transactions_once(session):
+	_upload(session, 1, 100, 10)
+	session.add_all([
+		db.FantasyPlayer(player_id=1, fantasy_team_id=1, position=0),
+		db.FantasyPlayer(player_id=2, fantasy_team_id=1, position=6),
+	])
+	session.flush()
+	log_moves(session, [(DRAFT, 1, 2, 6)])
+
+	assert backfill(session) == 1
+	assert backfill(session) == 0
+	# players rostered before the log existed keep every result
+	assert rostered_points(session) == {1: {1: (20.0, 24.0)}}
+
+
+def test_team_stints_use_log_index(session):
+	query = select_stints(db.RosterTransaction.fantasy_team_id.in_([1])).compile(compile_kwargs={"literal_binds": True})
+	plan = " ".join(str(row) for row in session.execute(text(f"EXPLAIN QUERY PLAN {query}")))
+	assert "ix_roster_transactions_team_player" in plan
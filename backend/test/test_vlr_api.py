@@ -1,15 +1,21 @@
 """P4 — FetchCog tests: upload deduplication and HTTP error handling.
 No live network or Discord token required; uses SQLite in-memory + mocks.
 """
+import os
+
+import aiohttp
 import pytest
-from unittest.mock import MagicMock, AsyncMock, patch
+from unittest.mock import MagicMock, AsyncMock
 from contextlib import contextmanager
 
 from sqlalchemy import create_engine, event, select
 from sqlalchemy.orm import Session as SASession
+from sqlalchemy.pool import StaticPool
 
 import fantasyVCT.database as db
 from fantasyVCT.database import Base
+from fantasyVCT.names import NameIndex
+from fantasyVCT.query_cache import POINTS, PLAYERS, ROSTERS, QueryCache
 from fantasyVCT.vlr_api import FetchCog
 
 
@@ -18,7 +24,12 @@ AUTHOR_ID = "111111111111111111"
 
 @pytest.fixture
 def engine():
-	eng = create_engine("sqlite:///:memory:")
+	# the ingestion pipeline queries from worker threads, so share one connection
+	eng = create_engine(
+		"sqlite:///:memory:",
+		connect_args={"check_same_thread": False},
+		poolclass=StaticPool,
+	)
 
 	@event.listens_for(eng, "connect")
 	def set_fk(dbapi_conn, _):
@@ -35,6 +46,9 @@ def engine():
 def mock_bot(engine):
 	bot = MagicMock()
 	bot.cache = MagicMock()
+	bot.scoring = None
+	bot.names = NameIndex()
+	bot.queries = QueryCache()
 
 	@contextmanager
 	def make_session():
@@ -73,7 +87,7 @@ async def test_upload_invalid_id_float(mock_bot, ctx):
 async def test_upload_duplicate(mock_bot, ctx, engine):
 	with SASession(engine) as s:
 		player = db.Player(name="dup_player")
-		s.add(player)
+		s.add_all([db.Event(id=1, name="Event"), player])
 		s.flush()
 		s.add(db.Result(
 			map="Ascent", game_id=1, match_id=12345, event_id=1,
@@ -91,14 +105,15 @@ async def test_upload_duplicate(mock_bot, ctx, engine):
 
 
 async def test_upload_success_inserts_results(mock_bot, ctx, engine):
-	"""Valid new match with existing teams/players: results inserted, cache invalidated.
+	"""Valid new match with existing teams/players: results inserted, cache updated
+	with the new game of each affected player.
 	Note: upload() doesn't set Team.region (pre-existing omission), so teams must be
 	pre-seeded to avoid the NOT NULL constraint on that column.
 	"""
 	with SASession(engine) as s:
 		t_a = db.Team(name="TeamA", abbrev="TMA", region="na")
 		t_b = db.Team(name="TeamB", abbrev="TMB", region="eu")
-		s.add_all([t_a, t_b])
+		s.add_all([db.Event(id=1, name="Event"), t_a, t_b])
 		s.flush()
 		p_a = db.Player(name="PlayerA", team_id=t_a.id)
 		p_b = db.Player(name="PlayerB", team_id=t_b.id)
@@ -129,54 +144,151 @@ async def test_upload_success_inserts_results(mock_bot, ctx, engine):
 	map_mock.team2 = _scraped_team("TeamB", "TMB", "PlayerB", 99002)
 	match_mock = MagicMock()
 	match_mock.maps = [map_mock]
-	mock_bot.scraper.parse_match.return_value = match_mock
+	mock_bot.scraper.parse_match_async = AsyncMock(return_value=match_mock)
+
+	mock_bot.queries.fetch(("info", "PlayerA"), (POINTS, PLAYERS), lambda: "cached")
+	mock_bot.queries.fetch(("roster", None, "FT", None), (ROSTERS,), lambda: "cached")
 
 	cog = FetchCog(mock_bot)
 	await cog.upload.callback(cog, ctx, "99999")
 
+	# replies read from results or players are dropped, rosters are unchanged
+	assert mock_bot.queries.stats()["entries"] == 1
 	with SASession(engine) as s:
 		results = list(s.scalars(select(db.Result).filter_by(match_id=99999)))
 		assert len(results) == 2
+		player_ids = {r.player_id for r in results}
 
-	mock_bot.cache.invalidate.assert_called_once()
+	# 150*0.05 + 12*2 - 7 + 4*0.5 + 1 = 27.5
+	mock_bot.cache.update.assert_called_once()
+	new_scores = mock_bot.cache.update.call_args[0][0]
+	assert set(new_scores) == player_ids
+	assert sorted(games for scores in new_scores.values() for games in scores.items()) == [(99001, 27.5), (99002, 27.5)]
+	mock_bot.cache.invalidate.assert_not_called()
 
 
 # ── get_results() ─────────────────────────────────────────────────────────────
 
-async def test_get_results_http_error(mock_bot):
-	with patch("fantasyVCT.vlr_api.requests.get") as mock_get:
-		mock_get.return_value.status_code = 503
-		cog = FetchCog(mock_bot)
-		await cog.get_results()
-	mock_bot.db_manager.query_events_from_name.assert_not_called()
-
-
-async def test_get_results_untracked_tournament(mock_bot):
-	mock_bot.db_manager.query_events_from_name.return_value = None
-	with patch("fantasyVCT.vlr_api.requests.get") as mock_get, \
-	     patch("fantasyVCT.vlr_api.asyncio.sleep"):
-		mock_get.return_value.status_code = 200
-		mock_get.return_value.json.return_value = {
-			"data": {"segments": [
-				{"tournament_name": "Unknown Event", "match_page": "12345/team-a-vs-team-b"}
-			]}
-		}
-		cog = FetchCog(mock_bot)
-		await cog.get_results()
-	mock_bot.db_manager.query_results_all_from_match_id.assert_not_called()
-
-
-async def test_get_results_duplicate_skipped(mock_bot):
-	mock_bot.db_manager.query_events_from_name.return_value = (1, "VCT Masters")
-	mock_bot.db_manager.query_results_all_from_match_id.return_value = [(1, "12345")]
-	with patch("fantasyVCT.vlr_api.requests.get") as mock_get, \
-	     patch("fantasyVCT.vlr_api.asyncio.sleep"):
-		mock_get.return_value.status_code = 200
-		mock_get.return_value.json.return_value = {
-			"data": {"segments": [
-				{"tournament_name": "VCT Masters", "match_page": "12345/team-a-vs-team-b"}
-			]}
-		}
-		cog = FetchCog(mock_bot)
-		await cog.get_results()
-	mock_bot.scraper.parse_match.assert_not_called()
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def _match_pages(match_id):
+	pages = list()
+	for tab in ("summary", "performance"):
+		with open(os.path.join(FIXTURES, f"match_{match_id}_{tab}.html"), encoding="utf-8") as f:
+			pages.append(f.read())
+	return tuple(pages)
+
+
+def _feed(*segments):
+	return {"data": {"segments": [
+		{"tournament_name": name, "match_page": page} for name, page in segments
+	]}}
+
+
+@pytest.fixture
+def tracked_event(engine):
+	with SASession(engine) as s:
+		s.add(db.Event(id=7, name="VCT Masters"))
+		s.add_all([
+			db.Team(name="100 Thieves", abbrev="100T", region="na"),
+			db.Team(name="Sentinels", abbrev="SEN", region="na"),
+		])
+		s.commit()
+
+
+async def test_get_results_http_error(mock_bot, engine, tracked_event):
+	mock_bot.fetcher.fetch_json = AsyncMock(
+		side_effect=aiohttp.ClientResponseError(MagicMock(), (), status=503)
+	)
+	mock_bot.scraper.fetch_match_pages = AsyncMock()
+	cog = FetchCog(mock_bot)
+	await cog.get_results()
+	mock_bot.scraper.fetch_match_pages.assert_not_called()
+	with SASession(engine) as s:
+		assert s.scalars(select(db.Result)).first() is None
+
+
+async def test_get_results_untracked_tournament(mock_bot, tracked_event):
+	mock_bot.fetcher.fetch_json = AsyncMock(return_value=_feed(("Unknown Event", "/25206/team-a-vs-team-b")))
+	mock_bot.scraper.fetch_match_pages = AsyncMock()
+	cog = FetchCog(mock_bot)
+	await cog.get_results()
+	mock_bot.scraper.fetch_match_pages.assert_not_called()
+
+
+async def test_get_results_duplicate_skipped(mock_bot, engine, tracked_event):
+	with SASession(engine) as s:
+		player = db.Player(name="dup_player")
+		s.add_all([db.Event(id=1, name="Event"), player])
+		s.flush()
+		s.add(db.Result(
+			map="Ascent", game_id=1, match_id=25206, event_id=7,
+			player_id=player.id,
+			player_acs=200.0, player_kills=10, player_deaths=5, player_assists=2,
+			player_2k=0, player_3k=0, player_4k=0, player_5k=0,
+			player_clutch_v2=0, player_clutch_v3=0, player_clutch_v4=0, player_clutch_v5=0,
+			agent="Jett",
+		))
+		s.commit()
+
+	mock_bot.fetcher.fetch_json = AsyncMock(return_value=_feed(("VCT Masters", "/25206/team-a-vs-team-b")))
+	mock_bot.scraper.fetch_match_pages = AsyncMock()
+	cog = FetchCog(mock_bot)
+	await cog.get_results()
+	mock_bot.scraper.fetch_match_pages.assert_not_called()
+
+
+async def test_get_results_invalid_match_page(mock_bot, tracked_event):
+	mock_bot.fetcher.fetch_json = AsyncMock(return_value=_feed(("VCT Masters", "/event/team-a-vs-team-b")))
+	mock_bot.scraper.fetch_match_pages = AsyncMock()
+	cog = FetchCog(mock_bot)
+	await cog.get_results()
+	mock_bot.scraper.fetch_match_pages.assert_not_called()
+
+
+async def test_get_results_stores_new_match(mock_bot, engine, tracked_event):
+	mock_bot.fetcher.fetch_json = AsyncMock(return_value=_feed(
+		("VCT Masters", "/25206/100-thieves-vs-sentinels"),
+		("Unknown Event", "/301000/fnatic-vs-team-heretics"),
+	))
+	mock_bot.scraper.fetch_match_pages = AsyncMock(side_effect=_match_pages)
+	cog = FetchCog(mock_bot)
+	await cog.get_results()
+
+	mock_bot.scraper.fetch_match_pages.assert_awaited_once_with("25206")
+	with SASession(engine) as s:
+		results = list(s.scalars(select(db.Result).filter_by(match_id=25206)))
+		assert len(results) == 20
+		assert {r.event_id for r in results} == {7}
+		asuna = s.scalars(select(db.Player).filter_by(name="Asuna")).one()
+		assert asuna.team.name == "100 Thieves"
+		# players and teams created by the match are in the name index
+		assert mock_bot.names.player_id("asuna") == asuna.id
+		assert mock_bot.names.team_id("100 Thieves") == asuna.team_id
+	mock_bot.cache.update.assert_called_once()
+	assert len(mock_bot.cache.update.call_args[0][0]) == 10
+
+
+async def test_get_results_failed_fetch_skipped(mock_bot, engine, tracked_event):
+	mock_bot.fetcher.fetch_json = AsyncMock(return_value=_feed(("VCT Masters", "/25206/100-thieves-vs-sentinels")))
+	mock_bot.scraper.fetch_match_pages = AsyncMock(
+		side_effect=aiohttp.ClientResponseError(MagicMock(), (), status=404)
+	)
+	cog = FetchCog(mock_bot)
+	await cog.get_results()
+	with SASession(engine) as s:
+		assert s.scalars(select(db.Result)).first() is None
+	mock_bot.cache.update.assert_not_called()
+
+
+async def test_update_reports_written_matches(mock_bot, ctx, tracked_event):
+	mock_bot.fetcher.fetch_json = AsyncMock(return_value=_feed(("VCT Masters", "/25206/100-thieves-vs-sentinels")))
+	mock_bot.scraper.fetch_match_pages = AsyncMock(side_effect=_match_pages)
+	cog = FetchCog(mock_bot)
+	await cog.update(ctx)
+	ctx.send.assert_awaited_once_with("Uploaded 1 new match(es): 25206")
+
+	ctx.send.reset_mock()
+	await cog.update(ctx)
+	ctx.send.assert_awaited_once_with("No new match results.")
@@ -1,185 +1,380 @@
-CREATE DATABASE FantasyValDev;
-CREATE DATABASE FantasyValProd;
+-- Generated from the models in backend/fantasyVCT/database.py. Do not edit;
+-- from backend/, run: python -m fantasyVCT.schema > ../db/scripts/init_db.sql
 
-CREATE TABLE IF NOT EXISTS FantasyValDev.teams
-(
-	id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
-	name VARCHAR(50) NOT NULL UNIQUE,
-	abbrev VARCHAR(10) NOT NULL UNIQUE,
-	region VARCHAR(10)
+CREATE DATABASE IF NOT EXISTS FantasyValDev;
+
+CREATE DATABASE IF NOT EXISTS FantasyValProd;
+
+USE FantasyValDev;
+
+CREATE TABLE IF NOT EXISTS events (
+	id INTEGER NOT NULL AUTO_INCREMENT,
+	name VARCHAR(80) NOT NULL,
+	PRIMARY KEY (id)
+);
+
+CREATE TABLE IF NOT EXISTS fantasy_teams (
+	id INTEGER NOT NULL AUTO_INCREMENT,
+	name VARCHAR(50) NOT NULL,
+	abbrev VARCHAR(10) NOT NULL,
+	PRIMARY KEY (id),
+	UNIQUE (name),
+	UNIQUE (abbrev)
+);
+
+CREATE TABLE IF NOT EXISTS positions (
+	id INTEGER NOT NULL,
+	position VARCHAR(20) NOT NULL,
+	PRIMARY KEY (id),
+	UNIQUE (position)
+);
+
+CREATE TABLE IF NOT EXISTS schema_migrations (
+	version INTEGER NOT NULL,
+	description VARCHAR(100) NOT NULL,
+	applied_at DATETIME NOT NULL,
+	PRIMARY KEY (version)
+);
+
+CREATE TABLE IF NOT EXISTS scoring_profiles (
+	id INTEGER NOT NULL AUTO_INCREMENT,
+	name VARCHAR(50) NOT NULL,
+	version INTEGER NOT NULL,
+	selected BOOL NOT NULL DEFAULT false,
+	ready BOOL NOT NULL DEFAULT false,
+	acs DOUBLE NOT NULL,
+	kills DOUBLE NOT NULL,
+	deaths DOUBLE NOT NULL,
+	assists DOUBLE NOT NULL,
+	kills2 DOUBLE NOT NULL,
+	kills3 DOUBLE NOT NULL,
+	kills4 DOUBLE NOT NULL,
+	kills5 DOUBLE NOT NULL,
+	clutch_v2 DOUBLE NOT NULL,
+	clutch_v3 DOUBLE NOT NULL,
+	clutch_v4 DOUBLE NOT NULL,
+	clutch_v5 DOUBLE NOT NULL,
+	PRIMARY KEY (id),
+	UNIQUE (name, version)
+);
+
+CREATE TABLE IF NOT EXISTS teams (
+	id INTEGER NOT NULL AUTO_INCREMENT,
+	name VARCHAR(50) NOT NULL,
+	abbrev VARCHAR(10) NOT NULL,
+	region VARCHAR(10),
+	PRIMARY KEY (id),
+	UNIQUE (name),
+	UNIQUE (abbrev)
 );
 
-CREATE TABLE IF NOT EXISTS FantasyValProd.teams
-(
-	id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
-	name VARCHAR(50) NOT NULL UNIQUE,
-	abbrev VARCHAR(10) NOT NULL UNIQUE,
-	region VARCHAR(10)
+CREATE TABLE IF NOT EXISTS players (
+	id INTEGER NOT NULL AUTO_INCREMENT,
+	name VARCHAR(50) NOT NULL,
+	team_id INTEGER,
+	PRIMARY KEY (id),
+	UNIQUE (name),
+	FOREIGN KEY(team_id) REFERENCES teams (id) ON DELETE SET NULL ON UPDATE CASCADE
 );
 
-CREATE TABLE IF NOT EXISTS FantasyValDev.players
-(
-	id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
-	name VARCHAR(20) NOT NULL UNIQUE,
-	team_id INT,
-	CONSTRAINT fk_team FOREIGN KEY (team_id) REFERENCES teams(id) ON DELETE SET NULL ON UPDATE CASCADE
+CREATE TABLE IF NOT EXISTS points_history (
+	id INTEGER NOT NULL AUTO_INCREMENT,
+	fantasy_team_id INTEGER NOT NULL,
+	match_id INTEGER NOT NULL,
+	recorded_at DATETIME NOT NULL,
+	points DOUBLE NOT NULL,
+	optimal DOUBLE NOT NULL,
+	`rank` INTEGER NOT NULL,
+	PRIMARY KEY (id),
+	FOREIGN KEY(fantasy_team_id) REFERENCES fantasy_teams (id) ON DELETE CASCADE ON UPDATE CASCADE
 );
 
-CREATE TABLE IF NOT EXISTS FantasyValProd.players
-(
-	id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
-	name VARCHAR(20) NOT NULL UNIQUE,
-	team_id INT,
-	CONSTRAINT fk_team FOREIGN KEY (team_id) REFERENCES teams(id) ON DELETE SET NULL ON UPDATE CASCADE
+CREATE INDEX ix_points_history_team_match ON points_history (fantasy_team_id, match_id);
+
+CREATE INDEX ix_points_history_team_recorded ON points_history (fantasy_team_id, recorded_at);
+
+CREATE TABLE IF NOT EXISTS standings (
+	fantasy_team_id INTEGER NOT NULL,
+	points DOUBLE NOT NULL,
+	optimal DOUBLE NOT NULL,
+	`rank` INTEGER NOT NULL,
+	PRIMARY KEY (fantasy_team_id),
+	FOREIGN KEY(fantasy_team_id) REFERENCES fantasy_teams (id) ON DELETE CASCADE ON UPDATE CASCADE
 );
 
-CREATE TABLE IF NOT EXISTS FantasyValDev.events
-(
-	id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
-	name VARCHAR(80) NOT NULL
+CREATE TABLE IF NOT EXISTS users (
+	discord_id VARCHAR(18) NOT NULL,
+	fantasy_team_id INTEGER,
+	PRIMARY KEY (discord_id),
+	UNIQUE (fantasy_team_id),
+	FOREIGN KEY(fantasy_team_id) REFERENCES fantasy_teams (id) ON DELETE SET NULL ON UPDATE CASCADE
 );
 
-CREATE TABLE IF NOT EXISTS FantasyValProd.events
-(
-	id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
-	name VARCHAR(80) NOT NULL
+CREATE TABLE IF NOT EXISTS fantasy_players (
+	id INTEGER NOT NULL AUTO_INCREMENT,
+	player_id INTEGER NOT NULL,
+	fantasy_team_id INTEGER,
+	position INTEGER,
+	PRIMARY KEY (id),
+	UNIQUE (player_id),
+	FOREIGN KEY(player_id) REFERENCES players (id) ON DELETE CASCADE ON UPDATE CASCADE,
+	FOREIGN KEY(fantasy_team_id) REFERENCES fantasy_teams (id) ON DELETE SET NULL ON UPDATE CASCADE,
+	FOREIGN KEY(position) REFERENCES positions (id) ON DELETE SET NULL ON UPDATE CASCADE
 );
 
-CREATE TABLE IF NOT EXISTS FantasyValDev.results
-(
-	id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+CREATE TABLE IF NOT EXISTS player_scores (
+	id INTEGER NOT NULL AUTO_INCREMENT,
+	profile_id INTEGER NOT NULL,
+	player_id INTEGER NOT NULL,
+	game_id INTEGER NOT NULL,
+	points DOUBLE NOT NULL,
+	PRIMARY KEY (id),
+	UNIQUE (profile_id, player_id, game_id),
+	FOREIGN KEY(profile_id) REFERENCES scoring_profiles (id) ON DELETE CASCADE ON UPDATE CASCADE,
+	FOREIGN KEY(player_id) REFERENCES players (id) ON DELETE CASCADE ON UPDATE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS player_totals (
+	profile_id INTEGER NOT NULL,
+	player_id INTEGER NOT NULL,
+	points DOUBLE NOT NULL,
+	games INTEGER NOT NULL,
+	PRIMARY KEY (profile_id, player_id),
+	FOREIGN KEY(profile_id) REFERENCES scoring_profiles (id) ON DELETE CASCADE ON UPDATE CASCADE,
+	FOREIGN KEY(player_id) REFERENCES players (id) ON DELETE CASCADE ON UPDATE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS results (
+	id INTEGER NOT NULL AUTO_INCREMENT,
 	map VARCHAR(20) NOT NULL,
-	game_id INT NOT NULL,
-	match_id INT NOT NULL,
-	event_id INT,
-	player_id INT NOT NULL,
-	player_acs FLOAT,
-	player_kills INT,
-	player_deaths INT,
-	player_assists INT,
-	player_2k INT,
-	player_3k INT,
-	player_4k INT,
-	player_5k INT,
-	player_clutch_v2 INT,
-	player_clutch_v3 INT,
-	player_clutch_v4 INT,
-	player_clutch_v5 INT,
+	game_id INTEGER NOT NULL,
+	match_id INTEGER NOT NULL,
+	event_id INTEGER,
+	player_id INTEGER NOT NULL,
+	player_acs DOUBLE NOT NULL,
+	player_kills INTEGER NOT NULL,
+	player_deaths INTEGER NOT NULL,
+	player_assists INTEGER NOT NULL,
+	player_2k INTEGER NOT NULL,
+	player_3k INTEGER NOT NULL,
+	player_4k INTEGER NOT NULL,
+	player_5k INTEGER NOT NULL,
+	player_clutch_v2 INTEGER NOT NULL,
+	player_clutch_v3 INTEGER NOT NULL,
+	player_clutch_v4 INTEGER NOT NULL,
+	player_clutch_v5 INTEGER NOT NULL,
 	agent VARCHAR(20),
-	FOREIGN KEY (event_id) REFERENCES events(id) ON UPDATE CASCADE ON DELETE CASCADE,
-	FOREIGN KEY (player_id) REFERENCES players(id) ON UPDATE CASCADE ON DELETE CASCADE
+	PRIMARY KEY (id),
+	FOREIGN KEY(event_id) REFERENCES events (id) ON DELETE CASCADE ON UPDATE CASCADE,
+	FOREIGN KEY(player_id) REFERENCES players (id) ON DELETE CASCADE ON UPDATE CASCADE
+);
+
+CREATE INDEX ix_results_event ON results (event_id);
+
+CREATE INDEX ix_results_match ON results (match_id);
+
+CREATE UNIQUE INDEX uq_results_player_game ON results (player_id, game_id);
+
+CREATE TABLE IF NOT EXISTS roster_transactions (
+	id INTEGER NOT NULL AUTO_INCREMENT,
+	fantasy_team_id INTEGER NOT NULL,
+	player_id INTEGER NOT NULL,
+	action VARCHAR(10) NOT NULL,
+	position INTEGER,
+	after_result_id INTEGER NOT NULL,
+	created_at DATETIME NOT NULL,
+	PRIMARY KEY (id),
+	FOREIGN KEY(fantasy_team_id) REFERENCES fantasy_teams (id) ON DELETE CASCADE ON UPDATE CASCADE,
+	FOREIGN KEY(player_id) REFERENCES players (id) ON DELETE CASCADE ON UPDATE CASCADE
+);
+
+CREATE INDEX ix_roster_transactions_team_player ON roster_transactions (fantasy_team_id, player_id, id);
+
+INSERT IGNORE INTO positions (id, position) VALUES (0, 'captain'), (1, 'player1'), (2, 'player2'), (3, 'player3'), (4, 'player4'), (5, 'player5'), (6, 'sub1'), (7, 'sub2'), (8, 'sub3'), (9, 'sub4');
+
+USE FantasyValProd;
+
+CREATE TABLE IF NOT EXISTS events (
+	id INTEGER NOT NULL AUTO_INCREMENT,
+	name VARCHAR(80) NOT NULL,
+	PRIMARY KEY (id)
+);
+
+CREATE TABLE IF NOT EXISTS fantasy_teams (
+	id INTEGER NOT NULL AUTO_INCREMENT,
+	name VARCHAR(50) NOT NULL,
+	abbrev VARCHAR(10) NOT NULL,
+	PRIMARY KEY (id),
+	UNIQUE (name),
+	UNIQUE (abbrev)
 );
 
-CREATE TABLE IF NOT EXISTS FantasyValProd.results
-(
-	id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+CREATE TABLE IF NOT EXISTS positions (
+	id INTEGER NOT NULL,
+	position VARCHAR(20) NOT NULL,
+	PRIMARY KEY (id),
+	UNIQUE (position)
+);
+
+CREATE TABLE IF NOT EXISTS schema_migrations (
+	version INTEGER NOT NULL,
+	description VARCHAR(100) NOT NULL,
+	applied_at DATETIME NOT NULL,
+	PRIMARY KEY (version)
+);
+
+CREATE TABLE IF NOT EXISTS scoring_profiles (
+	id INTEGER NOT NULL AUTO_INCREMENT,
+	name VARCHAR(50) NOT NULL,
+	version INTEGER NOT NULL,
+	selected BOOL NOT NULL DEFAULT false,
+	ready BOOL NOT NULL DEFAULT false,
+	acs DOUBLE NOT NULL,
+	kills DOUBLE NOT NULL,
+	deaths DOUBLE NOT NULL,
+	assists DOUBLE NOT NULL,
+	kills2 DOUBLE NOT NULL,
+	kills3 DOUBLE NOT NULL,
+	kills4 DOUBLE NOT NULL,
+	kills5 DOUBLE NOT NULL,
+	clutch_v2 DOUBLE NOT NULL,
+	clutch_v3 DOUBLE NOT NULL,
+	clutch_v4 DOUBLE NOT NULL,
+	clutch_v5 DOUBLE NOT NULL,
+	PRIMARY KEY (id),
+	UNIQUE (name, version)
+);
+
+CREATE TABLE IF NOT EXISTS teams (
+	id INTEGER NOT NULL AUTO_INCREMENT,
+	name VARCHAR(50) NOT NULL,
+	abbrev VARCHAR(10) NOT NULL,
+	region VARCHAR(10),
+	PRIMARY KEY (id),
+	UNIQUE (name),
+	UNIQUE (abbrev)
+);
+
+CREATE TABLE IF NOT EXISTS players (
+	id INTEGER NOT NULL AUTO_INCREMENT,
+	name VARCHAR(50) NOT NULL,
+	team_id INTEGER,
+	PRIMARY KEY (id),
+	UNIQUE (name),
+	FOREIGN KEY(team_id) REFERENCES teams (id) ON DELETE SET NULL ON UPDATE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS points_history (
+	id INTEGER NOT NULL AUTO_INCREMENT,
+	fantasy_team_id INTEGER NOT NULL,
+	match_id INTEGER NOT NULL,
+	recorded_at DATETIME NOT NULL,
+	points DOUBLE NOT NULL,
+	optimal DOUBLE NOT NULL,
+	`rank` INTEGER NOT NULL,
+	PRIMARY KEY (id),
+	FOREIGN KEY(fantasy_team_id) REFERENCES fantasy_teams (id) ON DELETE CASCADE ON UPDATE CASCADE
+);
+
+CREATE INDEX ix_points_history_team_match ON points_history (fantasy_team_id, match_id);
+
+CREATE INDEX ix_points_history_team_recorded ON points_history (fantasy_team_id, recorded_at);
+
+CREATE TABLE IF NOT EXISTS standings (
+	fantasy_team_id INTEGER NOT NULL,
+	points DOUBLE NOT NULL,
+	optimal DOUBLE NOT NULL,
+	`rank` INTEGER NOT NULL,
+	PRIMARY KEY (fantasy_team_id),
+	FOREIGN KEY(fantasy_team_id) REFERENCES fantasy_teams (id) ON DELETE CASCADE ON UPDATE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS users (
+	discord_id VARCHAR(18) NOT NULL,
+	fantasy_team_id INTEGER,
+	PRIMARY KEY (discord_id),
+	UNIQUE (fantasy_team_id),
+	FOREIGN KEY(fantasy_team_id) REFERENCES fantasy_teams (id) ON DELETE SET NULL ON UPDATE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS fantasy_players (
+	id INTEGER NOT NULL AUTO_INCREMENT,
+	player_id INTEGER NOT NULL,
+	fantasy_team_id INTEGER,
+	position INTEGER,
+	PRIMARY KEY (id),
+	UNIQUE (player_id),
+	FOREIGN KEY(player_id) REFERENCES players (id) ON DELETE CASCADE ON UPDATE CASCADE,
+	FOREIGN KEY(fantasy_team_id) REFERENCES fantasy_teams (id) ON DELETE SET NULL ON UPDATE CASCADE,
+	FOREIGN KEY(position) REFERENCES positions (id) ON DELETE SET NULL ON UPDATE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS player_scores (
+	id INTEGER NOT NULL AUTO_INCREMENT,
+	profile_id INTEGER NOT NULL,
+	player_id INTEGER NOT NULL,
+	game_id INTEGER NOT NULL,
+	points DOUBLE NOT NULL,
+	PRIMARY KEY (id),
+	UNIQUE (profile_id, player_id, game_id),
+	FOREIGN KEY(profile_id) REFERENCES scoring_profiles (id) ON DELETE CASCADE ON UPDATE CASCADE,
+	FOREIGN KEY(player_id) REFERENCES players (id) ON DELETE CASCADE ON UPDATE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS player_totals (
+	profile_id INTEGER NOT NULL,
+	player_id INTEGER NOT NULL,
+	points DOUBLE NOT NULL,
+	games INTEGER NOT NULL,
+	PRIMARY KEY (profile_id, player_id),
+	FOREIGN KEY(profile_id) REFERENCES scoring_profiles (id) ON DELETE CASCADE ON UPDATE CASCADE,
+	FOREIGN KEY(player_id) REFERENCES players (id) ON DELETE CASCADE ON UPDATE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS results (
+	id INTEGER NOT NULL AUTO_INCREMENT,
 	map VARCHAR(20) NOT NULL,
-	game_id INT NOT NULL,
-	match_id INT NOT NULL,
-	event_id INT,
-	player_id INT NOT NULL,
-	player_acs FLOAT,
-	player_kills INT,
-	player_deaths INT,
-	player_assists INT,
-	player_2k INT,
-	player_3k INT,
-	player_4k INT,
-	player_5k INT,
-	player_clutch_v2 INT,
-	player_clutch_v3 INT,
-	player_clutch_v4 INT,
-	player_clutch_v5 INT,
+	game_id INTEGER NOT NULL,
+	match_id INTEGER NOT NULL,
+	event_id INTEGER,
+	player_id INTEGER NOT NULL,
+	player_acs DOUBLE NOT NULL,
+	player_kills INTEGER NOT NULL,
+	player_deaths INTEGER NOT NULL,
+	player_assists INTEGER NOT NULL,
+	player_2k INTEGER NOT NULL,
+	player_3k INTEGER NOT NULL,
+	player_4k INTEGER NOT NULL,
+	player_5k INTEGER NOT NULL,
+	player_clutch_v2 INTEGER NOT NULL,
+	player_clutch_v3 INTEGER NOT NULL,
+	player_clutch_v4 INTEGER NOT NULL,
+	player_clutch_v5 INTEGER NOT NULL,
 	agent VARCHAR(20),
-	FOREIGN KEY (event_id) REFERENCES events(id) ON UPDATE CASCADE ON DELETE CASCADE,
-	FOREIGN KEY (player_id) REFERENCES players(id) ON UPDATE CASCADE ON DELETE CASCADE
-);
-
-CREATE TABLE IF NOT EXISTS FantasyValDev.positions
-(
-	id INT NOT NULL PRIMARY KEY,
-	position VARCHAR(20) NOT NULL UNIQUE
-);
-
-INSERT IGNORE INTO FantasyValDev.positions (id, position)
-VALUES
-	(0, "captain"),
-	(1, "player1"),
-	(2, "player2"),
-	(3, "player3"),
-	(4, "player4"),
-	(5, "player5"),
-	(6, "sub1"),
-	(7, "sub2"),
-	(8, "sub3"),
-	(9, "sub4");
-
-CREATE TABLE IF NOT EXISTS FantasyValProd.positions
-(
-	id INT NOT NULL PRIMARY KEY,
-	position VARCHAR(20) NOT NULL UNIQUE
-);
-
-INSERT IGNORE INTO FantasyValProd.positions (id, position)
-VALUES
-	(0, "captain"),
-	(1, "player1"),
-	(2, "player2"),
-	(3, "player3"),
-	(4, "player4"),
-	(5, "player5"),
-	(6, "sub1"),
-	(7, "sub2"),
-	(8, "sub3"),
-	(9, "sub4");
-
-CREATE TABLE IF NOT EXISTS FantasyValDev.fantasy_teams
-(
-	id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
-	name VARCHAR(50) NOT NULL UNIQUE,
-	abbrev VARCHAR(10) NOT NULL UNIQUE
-);
-
-CREATE TABLE IF NOT EXISTS FantasyValProd.fantasy_teams
-(
-	id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
-	name VARCHAR(50) NOT NULL UNIQUE,
-	abbrev VARCHAR(10) NOT NULL UNIQUE
-);
-
-CREATE TABLE IF NOT EXISTS FantasyValDev.users
-(
-	discord_id VARCHAR(18) NOT NULL PRIMARY KEY,
-	fantasy_team_id INT UNIQUE,
-	CONSTRAINT fk_team_id FOREIGN KEY (fantasy_team_id) REFERENCES fantasy_teams(id) ON DELETE SET NULL ON UPDATE CASCADE
-);
-
-CREATE TABLE IF NOT EXISTS FantasyValProd.users
-(
-	discord_id VARCHAR(18) NOT NULL PRIMARY KEY,
-	fantasy_team_id INT UNIQUE,
-	CONSTRAINT fk_team_id FOREIGN KEY (fantasy_team_id) REFERENCES fantasy_teams(id) ON DELETE SET NULL ON UPDATE CASCADE
-);
-
-CREATE TABLE IF NOT EXISTS FantasyValDev.fantasy_players
-(
-	id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
-	player_id INT NOT NULL UNIQUE,
-	fantasy_team_id INT,
-	position INT,
-	FOREIGN KEY (player_id) REFERENCES players(id) ON DELETE CASCADE ON UPDATE CASCADE,
-	FOREIGN KEY (fantasy_team_id) REFERENCES fantasy_teams(id) ON DELETE SET NULL ON UPDATE CASCADE,
-	FOREIGN KEY (position) REFERENCES positions(id) ON DELETE SET NULL ON UPDATE CASCADE
-);
-
-CREATE TABLE IF NOT EXISTS FantasyValProd.fantasy_players
-(
-	id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
-	player_id INT NOT NULL UNIQUE,
-	fantasy_team_id INT,
-	position INT,
-	FOREIGN KEY (player_id) REFERENCES players(id) ON DELETE CASCADE ON UPDATE CASCADE,
-	FOREIGN KEY (fantasy_team_id) REFERENCES fantasy_teams(id) ON DELETE SET NULL ON UPDATE CASCADE,
-	FOREIGN KEY (position) REFERENCES positions(id) ON DELETE SET NULL ON UPDATE CASCADE
+	PRIMARY KEY (id),
+	FOREIGN KEY(event_id) REFERENCES events (id) ON DELETE CASCADE ON UPDATE CASCADE,
+	FOREIGN KEY(player_id) REFERENCES players (id) ON DELETE CASCADE ON UPDATE CASCADE
 );
 
+CREATE INDEX ix_results_event ON results (event_id);
+
+CREATE INDEX ix_results_match ON results (match_id);
+
+CREATE UNIQUE INDEX uq_results_player_game ON results (player_id, game_id);
+
+CREATE TABLE IF NOT EXISTS roster_transactions (
+	id INTEGER NOT NULL AUTO_INCREMENT,
+	fantasy_team_id INTEGER NOT NULL,
+	player_id INTEGER NOT NULL,
+	action VARCHAR(10) NOT NULL,
+	position INTEGER,
+	after_result_id INTEGER NOT NULL,
+	created_at DATETIME NOT NULL,
+	PRIMARY KEY (id),
+	FOREIGN KEY(fantasy_team_id) REFERENCES fantasy_teams (id) ON DELETE CASCADE ON UPDATE CASCADE,
+	FOREIGN KEY(player_id) REFERENCES players (id) ON DELETE CASCADE ON UPDATE CASCADE
+);
+
+CREATE INDEX ix_roster_transactions_team_player ON roster_transactions (fantasy_team_id, player_id, id);
+
+INSERT IGNORE INTO positions (id, position) VALUES (0, 'captain'), (1, 'player1'), (2, 'player2'), (3, 'player3'), (4, 'player4'), (5, 'player5'), (6, 'sub1'), (7, 'sub2'), (8, 'sub3'), (9, 'sub4');
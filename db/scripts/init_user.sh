@@ -7,7 +7,7 @@ DISC_PASSWORD=$(cat /run/secrets/db-discord-password)
 
 mysql -uroot -p"${MYSQL_ROOT_PASSWORD}" <<EOF
 CREATE USER IF NOT EXISTS 'discord'@'%' IDENTIFIED BY '${DISC_PASSWORD}';
-GRANT SELECT, INSERT, UPDATE, DELETE ON FantasyValDev.* TO 'discord'@'%';
-GRANT SELECT, INSERT, UPDATE, DELETE ON FantasyValProd.* TO 'discord'@'%';
+GRANT SELECT, INSERT, UPDATE, DELETE, CREATE, ALTER, INDEX, REFERENCES ON FantasyValDev.* TO 'discord'@'%';
+GRANT SELECT, INSERT, UPDATE, DELETE, CREATE, ALTER, INDEX, REFERENCES ON FantasyValProd.* TO 'discord'@'%';
 FLUSH PRIVILEGES;
 EOF